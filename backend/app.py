@@ -6,6 +6,8 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 
 from config import config
+from database import build_engine_options, configure_engine, upgrade_schema
+from services.json_codec import FastJSONProvider
 
 db = SQLAlchemy()
 migrate = Migrate()
@@ -18,9 +20,16 @@ def create_app(config_name=None):
     
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    app.json = FastJSONProvider(app)
+    
+    # Explicit SQLALCHEMY_ENGINE_OPTIONS take precedence over the pool settings
+    engine_options = build_engine_options(app.config)
+    engine_options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
     
     # Initialize extensions
     db.init_app(app)
+    configure_engine(app, db)
     migrate.init_app(app, db)
     CORS(app, resources={r"/api/*": {"origins": "*"}})
     
@@ -32,6 +41,8 @@ def create_app(config_name=None):
     from routes.post_contents import post_contents_bp
     from routes.logs import logs_bp
     from routes.settings import settings_bp
+    from routes.metrics import metrics_bp
+    from routes.debug import debug_bp
     
     app.register_blueprint(accounts_bp, url_prefix='/api/accounts')
     app.register_blueprint(targets_bp, url_prefix='/api/targets')
@@ -40,9 +51,24 @@ def create_app(config_name=None):
     app.register_blueprint(post_contents_bp, url_prefix='/api/post-contents')
     app.register_blueprint(logs_bp, url_prefix='/api/logs')
     app.register_blueprint(settings_bp, url_prefix='/api/settings')
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(debug_bp, url_prefix='/api/debug')
+    
+    from services.tracing import init_tracing
+    from services.query_stats import init_query_stats
+    from services.http_cache import init_http_cache
+    from services.compression import init_compression
+    init_tracing(app)
+    init_query_stats(app, db)
+    init_http_cache(app)
+    init_compression(app)
     
-    # Create database tables
+    # Create database tables and any columns or indexes added since
     with app.app_context():
         db.create_all()
+        upgrade_schema(db)
+    
+    from commands import register_commands
+    register_commands(app)
     
     return app
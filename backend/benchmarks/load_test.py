@@ -0,0 +1,309 @@
+"""Load test of the REST API with a mix of dashboard reads and writes.
+
+Seeds a temporary SQLite database (accounts, targets, templates and
+execution logs), starts the API under gunicorn with the scheduler disabled
+and drives it from client threads for a fixed duration. The request mix is
+weighted towards the dashboard reads (logs, log stats, accounts, targets)
+with CRUD, toggle-status and reorder writes in between. Reports throughput
+and p50/p99 latency per route.
+
+Pass ``--url`` to load an already running server instead; it is not seeded.
+
+Usage:
+    python -m benchmarks.load_test [--duration 30] [--concurrency 16]
+        [--workers 4] [--threads 1] [--logs 50000] [--url http://host:port]
+"""
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+import requests
+
+from benchmarks.monitor_throughput import percentile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def seed(database_url, args):
+    """Create the accounts, targets, templates and logs used by the mix."""
+    os.environ['DATABASE_URL'] = database_url
+    
+    from app import create_app, db
+    from models import Account, ExecutionLog, MonitorTarget, ReplyTemplate, SystemSetting
+    from models.log_rollup import LogRollup
+    from routes.settings import DEFAULT_SETTINGS
+    
+    app = create_app()
+    with app.app_context():
+        # Seed the settings so the workers do not race to insert them on boot
+        db.session.bulk_insert_mappings(SystemSetting, DEFAULT_SETTINGS)
+        
+        token = Account(name='token')
+        token.set_token('load-test-token')
+        db.session.bulk_insert_mappings(Account, [
+            {'name': f'load{i}', 'encrypted_token': token.encrypted_token, 'status': 'active'}
+            for i in range(args.accounts)
+        ])
+        db.session.bulk_insert_mappings(MonitorTarget, [
+            {'target_user_id': str(1000 + i), 'target_username': f'user{1000 + i}', 'status': 'active'}
+            for i in range(args.targets)
+        ])
+        db.session.bulk_insert_mappings(ReplyTemplate, [
+            {'content': f'Load test reply {i}', 'sort_order': i} for i in range(args.templates)
+        ])
+        
+        now = datetime.utcnow()
+        rows = []
+        for i in range(args.logs):
+            rows.append({
+                'log_type': random.choice(('monitor', 'reply', 'post')),
+                'account_id': random.randint(1, args.accounts),
+                'target_id': random.randint(1, args.targets),
+                'tweet_id': str(10 ** 18 + i),
+                'result': 'success' if random.random() < 0.9 else 'failed',
+                'execution_time_ms': random.randint(50, 2000),
+                'created_at': now - timedelta(seconds=i * 30),
+            })
+            if len(rows) == 5000:
+                db.session.bulk_insert_mappings(ExecutionLog, rows)
+                rows = []
+        db.session.bulk_insert_mappings(ExecutionLog, rows)
+        db.session.commit()
+        LogRollup.rebuild()
+        db.session.commit()
+
+
+def free_port():
+    """Get a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(database_url, args):
+    """Start gunicorn on a free port and wait until it answers.
+    
+    Returns:
+        Tuple of (process, base_url)
+    """
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=database_url, ENABLE_SCHEDULER='false')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}',
+         '--workers', str(args.workers), '--threads', str(args.threads),
+         '--log-level', 'warning', 'run:app'],
+        cwd=BACKEND_DIR, env=env
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'gunicorn exited with status {process.returncode}')
+        try:
+            requests.get(f'{base_url}/', timeout=1)
+            return process, base_url
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('gunicorn did not start within 30 seconds')
+
+
+class Client:
+    """One simulated dashboard user issuing the request mix."""
+    
+    def __init__(self, base_url, results, lock):
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.results = results
+        self.lock = lock
+        self.ids = {}
+    
+    def call(self, route, method, path, **kwargs):
+        """Issue a request and record its latency under the route name.
+        
+        Returns:
+            Decoded JSON body, or None on errors
+        """
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=30, **kwargs)
+            ok = response.status_code < 400
+            body = response.json() if ok else None
+        except (requests.RequestException, ValueError):
+            ok, body = False, None
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self.lock:
+            stats = self.results.setdefault(route, {'latencies': [], 'errors': 0})
+            stats['latencies'].append(elapsed_ms)
+            if not ok:
+                stats['errors'] += 1
+        return body
+    
+    def pick(self, kind):
+        """Pick a random existing ID, refreshing the list from its GET route."""
+        ids = self.ids.get(kind)
+        if not ids:
+            body = self.call(f'GET /api/{kind}', 'GET', f'/api/{kind}')
+            items = (body or {}).get('data') or []
+            ids = self.ids[kind] = [item['id'] for item in items]
+        return random.choice(ids) if ids else None
+    
+    # Reads
+    
+    def list_logs(self):
+        self.call('GET /api/logs', 'GET', '/api/logs',
+                  params={'page': random.randint(1, 5), 'per_page': random.choice((20, 50))})
+    
+    def list_logs_filtered(self):
+        self.call('GET /api/logs?filtered', 'GET', '/api/logs',
+                  params={'log_type': random.choice(('monitor', 'reply', 'post')), 'result': 'failed'})
+    
+    def log_stats(self):
+        self.call('GET /api/logs/stats', 'GET', '/api/logs/stats',
+                  params={'group_by': random.choice(('', 'log_type,result', 'hour'))})
+    
+    def list_accounts(self):
+        self.call('GET /api/accounts', 'GET', '/api/accounts')
+    
+    def list_targets(self):
+        self.call('GET /api/targets', 'GET', '/api/targets')
+    
+    # Writes
+    
+    def target_crud(self):
+        body = self.call('POST /api/targets', 'POST', '/api/targets', json={
+            'target_user_id': str(random.randint(10 ** 9, 10 ** 12)), 'target_username': 'loadtest'
+        })
+        target_id = ((body or {}).get('data') or {}).get('id')
+        if target_id is None:
+            return
+        self.call('PUT /api/targets/<id>', 'PUT', f'/api/targets/{target_id}',
+                  json={'check_interval_minutes': random.choice((15, 30, 60))})
+        self.call('DELETE /api/targets/<id>', 'DELETE', f'/api/targets/{target_id}')
+    
+    def template_crud(self):
+        body = self.call('POST /api/reply-templates', 'POST', '/api/reply-templates',
+                         json={'content': 'Load test reply'})
+        template_id = ((body or {}).get('data') or {}).get('id')
+        if template_id is None:
+            return
+        self.call('PUT /api/reply-templates/<id>', 'PUT', f'/api/reply-templates/{template_id}',
+                  json={'content': 'Load test reply (edited)'})
+        self.call('DELETE /api/reply-templates/<id>', 'DELETE', f'/api/reply-templates/{template_id}')
+    
+    def toggle_target(self):
+        target_id = self.pick('targets')
+        if target_id is not None:
+            self.call('POST /api/targets/<id>/toggle-status', 'POST', f'/api/targets/{target_id}/toggle-status')
+    
+    def toggle_account(self):
+        account_id = self.pick('accounts')
+        if account_id is not None:
+            self.call('POST /api/accounts/<id>/toggle-status', 'POST', f'/api/accounts/{account_id}/toggle-status')
+    
+    def reorder_templates(self):
+        if not self.ids.get('reply-templates'):
+            self.pick('reply-templates')
+        ids = list(self.ids.get('reply-templates') or [])
+        random.shuffle(ids)
+        self.call('POST /api/reply-templates/reorder', 'POST', '/api/reply-templates/reorder', json={'ids': ids})
+
+
+# Relative weight of each action in the mix
+MIX = (
+    ('list_logs', 30),
+    ('list_logs_filtered', 5),
+    ('log_stats', 15),
+    ('list_accounts', 15),
+    ('list_targets', 15),
+    ('target_crud', 4),
+    ('template_crud', 4),
+    ('toggle_target', 5),
+    ('toggle_account', 4),
+    ('reorder_templates', 3),
+)
+
+
+def drive(base_url, duration, concurrency):
+    """Run the request mix from client threads for a number of seconds.
+    
+    Returns:
+        dict of route name to {'latencies': [...], 'errors': n}
+    """
+    results = {}
+    lock = threading.Lock()
+    actions, weights = zip(*MIX)
+    deadline = time.monotonic() + duration
+    
+    def worker():
+        client = Client(base_url, results, lock)
+        while time.monotonic() < deadline:
+            getattr(client, random.choices(actions, weights)[0])()
+    
+    threads = [threading.Thread(target=worker, name=f'load-client-{i}') for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def report(results, elapsed):
+    """Print throughput and latency percentiles per route."""
+    total = sum(len(stats['latencies']) for stats in results.values())
+    errors = sum(stats['errors'] for stats in results.values())
+    print(f"{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s), {errors} errors")
+    print(f"{'route':<44}{'count':>8}{'req/s':>9}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'errors':>8}")
+    for route, stats in sorted(results.items(), key=lambda item: -percentile(item[1]['latencies'], 99)):
+        values = stats['latencies']
+        print(f"{route:<44}{len(values):>8}{len(values) / elapsed:>9.1f}{percentile(values, 50):>10.1f}"
+              f"{percentile(values, 99):>10.1f}{max(values):>10.1f}{stats['errors']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run the mix')
+    parser.add_argument('--concurrency', type=int, default=16, help='Client threads')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=1, help='gunicorn threads per worker')
+    parser.add_argument('--accounts', type=int, default=20)
+    parser.add_argument('--targets', type=int, default=200)
+    parser.add_argument('--templates', type=int, default=30)
+    parser.add_argument('--logs', type=int, default=50000)
+    parser.add_argument('--url', help='Load an already running server instead of starting one')
+    args = parser.parse_args()
+    
+    process = path = None
+    base_url = args.url
+    try:
+        if base_url is None:
+            fd, path = tempfile.mkstemp(suffix='.db')
+            os.close(fd)
+            database_url = f'sqlite:///{path}'
+            print(f"Seeding {args.logs} logs, {args.targets} targets, {args.accounts} accounts...")
+            seed(database_url, args)
+            process, base_url = start_gunicorn(database_url, args)
+            print(f"gunicorn: {args.workers} workers x {args.threads} threads at {base_url}")
+        
+        start = time.monotonic()
+        results = drive(base_url.rstrip('/'), args.duration, args.concurrency)
+        report(results, time.monotonic() - start)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        if path is not None:
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""Micro-benchmarks of selector, dedup and serialization hot paths.
+
+Each case is timed with ``timeit`` (best of several repeats, per call). With
+``--save`` the results are written as a JSON baseline; with ``--compare``
+they are checked against a baseline and the run exits with status 1 when a
+case is slower than the baseline by more than ``--threshold``.
+
+Usage:
+    python -m benchmarks.micro [--sizes 10,1000,100000] [--filter to_dict]
+        [--save benchmarks/baselines/micro.json]
+        [--compare benchmarks/baselines/micro.json] [--threshold 0.2]
+"""
+import argparse
+import json
+import os
+import platform
+import tempfile
+import timeit
+from datetime import datetime
+
+SELECTOR_SIZES = (10, 100, 1000)
+
+
+def measure(func, repeat=5, min_time=0.2):
+    """Time a callable.
+    
+    Returns:
+        Best time per call in seconds
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def build_cases(app, db, sizes):
+    """Build the benchmark cases.
+    
+    Returns:
+        List of (name, callable) tuples
+    """
+    from models import Account, ExecutionLog, MonitorTarget, ReplyTemplate, RepliedTweet
+    from services.account_selector import AccountSelector
+    from services.dedup_index import replied_tweet_index
+    from services.monitor_service import replied_account_ids
+    from services.template_selector import TemplateSelector
+    
+    cases = []
+    
+    # Selectors read the accounts and templates from the database
+    for size in SELECTOR_SIZES:
+        def setup_selectors(size=size):
+            Account.query.delete()
+            ReplyTemplate.query.delete()
+            token = Account(name='token')
+            token.set_token('benchmark-token')
+            for i in range(size):
+                db.session.add(Account(name=f'a{i}', encrypted_token=token.encrypted_token,
+                                       weight=i % 5 + 1, max_concurrent_usage=10 ** 6))
+                db.session.add(ReplyTemplate(content=f'template {i}', sort_order=i))
+            db.session.commit()
+        
+        cases.append((f'setup:selectors[{size}]', setup_selectors))
+        for strategy in ('round_robin', 'random', 'weighted'):
+            cases.append((
+                f'AccountSelector.select_account[{strategy},{size}]',
+                lambda strategy=strategy: AccountSelector.select_account(strategy=strategy, context='bench')
+            ))
+        for strategy in ('round_robin', 'random'):
+            cases.append((
+                f'TemplateSelector.select_template[{strategy},{size}]',
+                lambda strategy=strategy: TemplateSelector.select_template(strategy=strategy)
+            ))
+    
+    # Account state checks on an in-memory instance
+    account = Account(name='bench', status='active', current_usage_count=0, max_concurrent_usage=10 ** 9,
+                      hourly_action_count=0, hourly_reset_at=None)
+    account.set_token('benchmark-token')
+    cases.append(('Account.can_use', account.can_use))
+    cases.append(('Account.acquire+release', lambda: (account.acquire(), account.release())))
+    cases.append(('Account.get_token', account.get_token))
+    
+    # Replied tweet dedup as run by the monitor: the Bloom filter index rules
+    # accounts out, the "maybe" ones are confirmed with one IN lookup
+    account_ids = list(range(1, 6))
+    
+    def setup_dedup():
+        RepliedTweet.query.delete()
+        db.session.bulk_insert_mappings(RepliedTweet, [
+            {'target_user_id': '42', 'tweet_id': str(10 ** 18 + i), 'account_id': 1} for i in range(10000)
+        ])
+        db.session.commit()
+        replied_tweet_index.configure(24, 2, 100000, 0.001)
+        replied_tweet_index.warm()
+    
+    cases.append(('setup:dedup', setup_dedup))
+    cases.append(('replied_account_ids[hit]', lambda: replied_account_ids('42', 10 ** 18 + 5, account_ids)))
+    cases.append(('replied_account_ids[miss]', lambda: replied_account_ids('42', 5, account_ids)))
+    
+    # Serialization of transient rows (no relationship loads)
+    now = datetime.utcnow()
+    for size in sizes:
+        logs = [ExecutionLog(id=i, log_type='reply', account_id=1, target_id=1, tweet_id=str(i),
+                             result='success', content_text='reply text', execution_time_ms=120,
+                             created_at=now) for i in range(size)]
+        targets = [MonitorTarget(id=i, target_user_id=str(i), target_username=f'user{i}', status='active',
+                                 check_interval_minutes=15, fetch_tweet_count=10, max_new_tweets_per_check=3,
+                                 total_tweets_found=0, total_replies_sent=0, created_at=now, updated_at=now)
+                   for i in range(size)]
+        cases.append((f'ExecutionLog.to_dict[{size}]', lambda logs=logs: [log.to_dict() for log in logs]))
+        cases.append((f'MonitorTarget.to_dict[{size}]', lambda targets=targets: [t.to_dict() for t in targets]))
+    
+    return cases
+
+
+def run(sizes, name_filter=None):
+    """Run all benchmark cases against a temporary database.
+    
+    Returns:
+        dict of case name to seconds per call
+    """
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    
+    from app import create_app, db
+    
+    app = create_app()
+    results = {}
+    try:
+        with app.app_context():
+            for name, func in build_cases(app, db, sizes):
+                if name.startswith('setup:'):
+                    func()
+                    continue
+                if name_filter and name_filter not in name:
+                    continue
+                results[name] = measure(func)
+                print(f"{name:<55}{results[name] * 1e6:>14.2f} us")
+    finally:
+        os.remove(path)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Compare results with a baseline.
+    
+    Returns:
+        List of (name, baseline seconds, current seconds) for regressions
+    """
+    regressions = []
+    for name, seconds in results.items():
+        previous = baseline.get(name)
+        if previous and seconds > previous * (1 + threshold):
+            regressions.append((name, previous, seconds))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10,1000,100000', help='List sizes for serialization cases')
+    parser.add_argument('--filter', help='Only run cases whose name contains this text')
+    parser.add_argument('--save', help='Write the results to this baseline file')
+    parser.add_argument('--compare', help='Compare the results with this baseline file')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed slowdown (0.2 = 20%%)')
+    args = parser.parse_args()
+    
+    results = run([int(size) for size in args.sizes.split(',')], args.filter)
+    
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or '.', exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(),
+                       'results': results}, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.save}")
+    
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for name, previous, seconds in regressions:
+            print(f"REGRESSION {name}: {previous * 1e6:.2f} us -> {seconds * 1e6:.2f} us "
+                  f"({seconds / previous - 1:+.0%})")
+        if regressions:
+            raise SystemExit(1)
+        print(f"No regressions over {args.threshold:.0%} against {args.compare}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""Fake Twitter API provider for offline benchmarks.
+
+Implements the endpoints used by ``TwitterAPIClient``:
+``/twitter/user/last_tweets``, ``/twitter/tweet/advanced_search``,
+``/twitter/tweet/reply`` and ``/twitter/tweet``. Every timeline read sees
+``--new-tweets`` new tweets per user, so each monitor check has work to do.
+Latency, the share of failing requests and a global rate limit (answered
+with 429) are configurable.
+
+Usage:
+    python -m benchmarks.mock_twitter_api [--port 5055] [--latency-ms 50]
+        [--jitter-ms 20] [--error-rate 0.01] [--rate-limit 0]
+"""
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class MockTwitterState:
+    """Timelines and behaviour settings shared by all request handlers."""
+    
+    def __init__(self, latency_ms=50, jitter_ms=20, error_rate=0.0, rate_limit=0, new_tweets=1):
+        """Initialize the provider state.
+        
+        Args:
+            latency_ms: Mean added latency per request
+            jitter_ms: Maximum deviation from the mean latency
+            error_rate: Share of requests answered with HTTP 500
+            rate_limit: Requests per second before answering 429 (0 = unlimited)
+            new_tweets: New tweets each user gains per timeline read
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.new_tweets = new_tweets
+        self._ids = itertools.count(10 ** 18)
+        self._timelines = {}  # user id -> list of tweets, newest first
+        self._usernames = {}  # lower-case username -> user id
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self.requests = 0
+    
+    def _new_tweet(self, user_id, username):
+        return {
+            'id': str(next(self._ids)),
+            'text': 'benchmark tweet',
+            'createdAt': datetime.now(timezone.utc).strftime('%a %b %d %H:%M:%S %z %Y'),
+            'author': {'id': user_id, 'userName': username}
+        }
+    
+    def timeline(self, user_id, count, username=None):
+        """Get the newest tweets of a user after adding the new ones."""
+        username = username or f'user{user_id}'
+        with self._lock:
+            self._usernames[username.lower()] = user_id
+            tweets = self._timelines.setdefault(user_id, [])
+            for _ in range(self.new_tweets):
+                tweets.insert(0, self._new_tweet(user_id, username))
+            del tweets[100:]
+            return tweets[:count]
+    
+    def user_for(self, username):
+        """Get the user ID of a username (``user<id>`` if never seen)."""
+        name = username.lower()
+        with self._lock:
+            if name in self._usernames:
+                return self._usernames[name]
+        if name.startswith('user') and name[4:].isdigit():
+            return name[4:]
+        return username
+    
+    def reset_requests(self):
+        """Reset the request count, e.g. after a warm-up."""
+        with self._lock:
+            self.requests = 0
+    
+    def next_id(self):
+        """Allocate a tweet ID for a reply or post."""
+        return str(next(self._ids))
+    
+    def admit(self):
+        """Apply the latency, error and rate limit settings to a request.
+        
+        Returns:
+            HTTP status to answer with instead of a normal response, or None
+        """
+        with self._lock:
+            self.requests += 1
+            if self.rate_limit:
+                now = time.monotonic()
+                if now - self._window_start >= 1:
+                    self._window_start = now
+                    self._window_count = 0
+                self._window_count += 1
+                if self._window_count > self.rate_limit:
+                    return 429
+        
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if self.error_rate and random.random() < self.error_rate:
+            return 500
+        return None
+
+
+def make_handler(state):
+    """Build a request handler class bound to a provider state."""
+    
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def log_message(self, format, *args):
+            pass
+        
+        def _send(self, status, payload, headers=None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def _admit(self):
+            status = state.admit()
+            if status == 429:
+                self._send(429, {'error': 'Too many requests'}, {'Retry-After': '1'})
+            elif status:
+                self._send(status, {'error': 'Internal error'})
+            return status is None
+        
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            if not self._admit():
+                return
+            
+            if url.path == '/twitter/user/last_tweets':
+                tweets = state.timeline(params.get('userId', ''), int(params.get('count', 10)))
+                self._send(200, {'status': 'success', 'tweets': tweets})
+            elif url.path == '/twitter/tweet/advanced_search':
+                tweets = []
+                for username in re.findall(r'from:(\w+)', params.get('query', '')):
+                    tweets.extend(state.timeline(state.user_for(username), 20, username))
+                tweets.sort(key=lambda t: int(t['id']), reverse=True)
+                self._send(200, {'tweets': tweets, 'has_next_page': False, 'next_cursor': ''})
+            else:
+                self._send(404, {'error': 'Not found'})
+        
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            self.rfile.read(length)
+            if not self._admit():
+                return
+            
+            if self.path in ('/twitter/tweet/reply', '/twitter/tweet'):
+                self._send(200, {'status': 'success', 'tweetId': state.next_id()})
+            else:
+                self._send(404, {'error': 'Not found'})
+    
+    return Handler
+
+
+def start_server(state, host='127.0.0.1', port=0):
+    """Start the mock provider in a background thread.
+    
+    Returns:
+        Tuple of (server, base_url); call server.shutdown() to stop it
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='mock-twitter-api', daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--jitter-ms', type=float, default=20)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=int, default=0)
+    parser.add_argument('--new-tweets', type=int, default=1)
+    args = parser.parse_args()
+    
+    state = MockTwitterState(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit, args.new_tweets)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    print(f"Mock Twitter API listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""End-to-end throughput benchmark of monitor checks and post jobs.
+
+Seeds a fresh SQLite database with N targets, M accounts, K reply templates
+and J post jobs, points the app at the mock provider in
+``benchmarks.mock_twitter_api`` and drives ``run_monitor_check`` and
+``run_post_jobs`` for a number of rounds after a warm-up round that sets the
+watermarks. Reports tweets and replies per second, Twitter API latency
+percentiles per endpoint, and SQL queries; the warm-up is reported on its
+own and left out of every other figure.
+
+Usage:
+    python -m benchmarks.monitor_throughput [--targets 50] [--accounts 5]
+        [--templates 10] [--post-jobs 5] [--rounds 3] [--latency-ms 20]
+        [--error-rate 0] [--rate-limit 0] [--batch-size 0]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.mock_twitter_api import MockTwitterState, start_server
+
+
+def percentile(values, pct):
+    """Get a percentile of a list of numbers (nearest rank)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def seed(db, args):
+    """Create the benchmark targets, accounts, templates and post jobs."""
+    from models import Account, MonitorTarget, PostContent, PostJob, ReplyTemplate, SystemSetting
+    
+    for i in range(args.targets):
+        db.session.add(MonitorTarget(
+            target_user_id=str(1000 + i),
+            target_username=f'user{1000 + i}',
+            fetch_tweet_count=10,
+            max_new_tweets_per_check=args.new_tweets
+        ))
+    for i in range(args.accounts):
+        account = Account(name=f'bench{i}', max_concurrent_usage=1000)
+        account.set_token(f'token-{i}')
+        db.session.add(account)
+    for i in range(args.templates):
+        db.session.add(ReplyTemplate(content=f'Benchmark reply {i}', sort_order=i))
+    for i in range(args.post_jobs):
+        db.session.add(PostJob(name=f'bench job {i}'))
+    for i in range(max(args.post_jobs, 1)):
+        db.session.add(PostContent(text=f'Benchmark post {i}', sort_order=i))
+    db.session.add(SystemSetting(key='timeline_batch_size', value=str(args.batch_size), value_type='int'))
+    db.session.commit()
+
+
+def make_due(db):
+    """Make every target and post job due for the next round."""
+    from models import MonitorTarget, PostJob
+    
+    MonitorTarget.query.update({MonitorTarget.next_check_at: None})
+    PostJob.query.update({PostJob.next_run_at: None})
+    db.session.commit()
+
+
+def run(args):
+    """Run the benchmark and return the measurements."""
+    state = MockTwitterState(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit, args.new_tweets)
+    server, base_url = start_server(state)
+    
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    os.environ['TWITTER_API_BASE_URL'] = base_url
+    
+    from app import create_app, db
+    from services.monitor_service import run_monitor_check
+    from services.post_service import run_post_jobs
+    from services.query_stats import query_scope
+    from services.tracing import trace_buffer
+    
+    app = create_app()
+    app.config.update(
+        MIN_RANDOM_DELAY=0,
+        MAX_RANDOM_DELAY=0,
+        DEFAULT_ACCOUNT_HOURLY_LIMIT=10 ** 9,
+        ACCOUNT_FAILURE_THRESHOLD=10 ** 9,
+        TWITTER_API_GET_CACHE_TTL_SECONDS=0,
+    )
+    trace_buffer.resize(10000)
+    
+    measurements = {'tweets': 0, 'replies': 0, 'posts': 0, 'monitor_seconds': 0.0,
+                    'post_seconds': 0.0, 'monitor_queries': 0, 'post_queries': 0,
+                    'warmup_tweets': 0, 'warmup_replies': 0, 'warmup_requests': 0}
+    try:
+        with app.app_context():
+            seed(db, args)
+            
+            for round_number in range(args.rounds + 1):
+                make_due(db)
+                start = time.perf_counter()
+                with query_scope('bench:monitor') as scope:
+                    results = run_monitor_check()
+                elapsed = time.perf_counter() - start
+                
+                # The first round sets the watermarks; its requests and traces
+                # are dropped so every figure covers the measured rounds only
+                prefix = 'warmup_' if round_number == 0 else ''
+                for item in results:
+                    measurements[prefix + 'tweets'] += item['result'].get('new_tweets_found', 0)
+                    measurements[prefix + 'replies'] += item['result'].get('replies_sent', 0)
+                if round_number == 0:
+                    measurements['warmup_requests'] = state.requests
+                    state.reset_requests()
+                    trace_buffer.clear()
+                    continue
+                measurements['monitor_seconds'] += elapsed
+                measurements['monitor_queries'] += scope.count
+                
+                start = time.perf_counter()
+                with query_scope('bench:post') as scope:
+                    results = run_post_jobs()
+                measurements['post_seconds'] += time.perf_counter() - start
+                measurements['post_queries'] += scope.count
+                measurements['posts'] += sum(1 for item in results if item['result'].get('success'))
+    finally:
+        server.shutdown()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    
+    latencies = {}
+    for root in trace_buffer.list(limit=10000):
+        for span in root.walk():
+            if span.name == 'twitter_api.http':
+                endpoint = span.parent.attributes.get('endpoint')
+                latencies.setdefault(endpoint, []).append(span.duration_ms)
+    measurements['latency_ms'] = {
+        endpoint: {'count': len(values), 'p50': percentile(values, 50), 'p99': percentile(values, 99)}
+        for endpoint, values in latencies.items()
+    }
+    measurements['provider_requests'] = state.requests
+    return measurements
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--targets', type=int, default=50)
+    parser.add_argument('--accounts', type=int, default=5)
+    parser.add_argument('--templates', type=int, default=10)
+    parser.add_argument('--post-jobs', type=int, default=5)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--new-tweets', type=int, default=1, help='New tweets per target per round')
+    parser.add_argument('--latency-ms', type=float, default=20)
+    parser.add_argument('--jitter-ms', type=float, default=5)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=int, default=0)
+    parser.add_argument('--batch-size', type=int, default=0, help='timeline_batch_size setting')
+    args = parser.parse_args()
+    
+    m = run(args)
+    monitor_seconds = m['monitor_seconds'] or 1e-9
+    post_seconds = m['post_seconds'] or 1e-9
+    print(f"monitor: {m['tweets']} tweets, {m['replies']} replies in {m['monitor_seconds']:.2f}s "
+          f"({m['tweets'] / monitor_seconds:.1f} tweets/s, {m['replies'] / monitor_seconds:.1f} replies/s), "
+          f"{m['monitor_queries']} queries ({m['monitor_queries'] / max(args.rounds, 1):.0f}/round)")
+    print(f"posts:   {m['posts']} posts in {m['post_seconds']:.2f}s ({m['posts'] / post_seconds:.1f} posts/s), "
+          f"{m['post_queries']} queries")
+    print(f"provider requests: {m['provider_requests']}")
+    print(f"warm-up (not counted above): {m['warmup_tweets']} tweets, {m['warmup_replies']} replies, "
+          f"{m['warmup_requests']} provider requests")
+    print(f"{'endpoint':<34}{'calls':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for endpoint, stats in sorted(m['latency_ms'].items()):
+        print(f"{endpoint:<34}{stats['count']:>8}{stats['p50']:>10.1f}{stats['p99']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark SQLite commit throughput with and without the production profile.
+
+Runs a writer that commits one small log row per transaction (like the
+scheduler) while reader threads keep querying the table (like the API),
+once with SQLite defaults and once with ``ProductionConfig.SQLITE_PRAGMAS``.
+
+Usage:
+    python -m benchmarks.sqlite_commit_throughput [--commits 2000] [--readers 2]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from config import ProductionConfig
+from database import apply_sqlite_pragmas
+
+
+def run_profile(name, pragmas, commits, readers):
+    """Run the mixed workload against a fresh database file.
+    
+    Returns:
+        dict with throughput figures
+    """
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    engine = create_engine(f'sqlite:///{path}')
+    if pragmas:
+        apply_sqlite_pragmas(engine, pragmas)
+    
+    with engine.begin() as conn:
+        conn.execute(text(
+            'CREATE TABLE execution_logs ('
+            'id INTEGER PRIMARY KEY, log_type VARCHAR(20), result VARCHAR(20), '
+            'content_text TEXT, created_at DATETIME DEFAULT CURRENT_TIMESTAMP)'
+        ))
+    
+    stop = threading.Event()
+    reads = [0]
+    read_errors = [0]
+    
+    def reader():
+        while not stop.is_set():
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text(
+                        'SELECT log_type, count(*) FROM execution_logs GROUP BY log_type'
+                    )).all()
+                reads[0] += 1
+            except OperationalError:
+                read_errors[0] += 1
+    
+    threads = [threading.Thread(target=reader, daemon=True) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    
+    write_errors = 0
+    start = time.perf_counter()
+    for i in range(commits):
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    text('INSERT INTO execution_logs (log_type, result, content_text) '
+                         'VALUES (:t, :r, :c)'),
+                    {'t': 'reply', 'r': 'success', 'c': f'reply text {i}'}
+                )
+        except OperationalError:
+            write_errors += 1
+    elapsed = time.perf_counter() - start
+    
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    
+    return {
+        'profile': name,
+        'commits_per_sec': commits / elapsed,
+        'reads_per_sec': reads[0] / elapsed,
+        'write_errors': write_errors,
+        'read_errors': read_errors[0]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--commits', type=int, default=2000)
+    parser.add_argument('--readers', type=int, default=2)
+    args = parser.parse_args()
+    
+    results = [
+        run_profile('default', {}, args.commits, args.readers),
+        run_profile('production', ProductionConfig.SQLITE_PRAGMAS, args.commits, args.readers),
+    ]
+    
+    print(f"{'profile':<12}{'commits/s':>12}{'reads/s':>12}{'w-errors':>10}{'r-errors':>10}")
+    for r in results:
+        print(f"{r['profile']:<12}{r['commits_per_sec']:>12.1f}{r['reads_per_sec']:>12.1f}"
+              f"{r['write_errors']:>10}{r['read_errors']:>10}")
+    print(f"speedup: {results[1]['commits_per_sec'] / results[0]['commits_per_sec']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Flask CLI commands."""
+import click
+
+
+def register_commands(app):
+    """Register the maintenance commands on the app's CLI.
+    
+    Args:
+        app: Flask application instance
+    """
+    
+    @app.cli.command('check-query-plans')
+    def check_query_plans_command():
+        """Fail if a hot-path query is not index-backed."""
+        from app import db
+        from database import check_query_plans
+        
+        results = check_query_plans(db)
+        for result in results:
+            status = 'ok' if result['ok'] else 'FULL SCAN'
+            click.echo(f"{result['name']}: {status}")
+            for line in result['plan']:
+                click.echo(f"    {line}")
+        
+        if not all(result['ok'] for result in results):
+            raise SystemExit(1)
+    
+    @app.cli.command('rebuild-log-rollups')
+    def rebuild_log_rollups_command():
+        """Recompute the log statistics rollups from execution_logs."""
+        from models.log_rollup import LogRollup
+        
+        total = LogRollup.rebuild()
+        click.echo(f"Rolled up {total} logs")
+    
+    @app.cli.command('apply-retention')
+    @click.option('--dry-run', is_flag=True, help='Only count the rows past retention.')
+    @click.option('--compact', is_flag=True, help='Reclaim disk space afterwards (VACUUM).')
+    def apply_retention_command(dry_run, compact):
+        """Archive and delete log rows past their retention period."""
+        from services.log_retention import RetentionPolicyError, compact_database, run_retention
+        
+        try:
+            results = run_retention(dry_run=dry_run)
+        except RetentionPolicyError as e:
+            raise click.ClickException(str(e))
+        for table_name, count in results.items():
+            verb = 'Would archive' if dry_run else 'Archived'
+            click.echo(f"{verb} {count} rows from {table_name}")
+        
+        if compact and not dry_run:
+            compact_database()
+            click.echo("Database compacted")
+    
+    @app.cli.command('query-archive')
+    @click.option('--table', default='execution_logs', type=click.Choice(['execution_logs', 'replied_tweets']))
+    @click.option('--log-type', help='Only logs of this type.')
+    @click.option('--result', help='Only logs with this result.')
+    @click.option('--account-id', type=int, help='Only rows of this account.')
+    @click.option('--target-id', type=int, help='Only logs of this target.')
+    @click.option('--tweet-id', help='Only rows about this tweet.')
+    @click.option('--since', type=click.DateTime(), help='Only rows at or after this time (UTC).')
+    @click.option('--until', type=click.DateTime(), help='Only rows at or before this time (UTC).')
+    def query_archive_command(table, log_type, result, account_id, target_id, tweet_id, since, until):
+        """Print archived rows matching the filters as NDJSON."""
+        import json
+        from services.log_retention import read_archive
+        
+        filters = {
+            'log_type': log_type,
+            'result': result,
+            'account_id': account_id,
+            'target_id': target_id,
+            'tweet_id': tweet_id,
+        }
+        filters = {key: value for key, value in filters.items() if value is not None}
+        
+        for row in read_archive(app.config['LOG_ARCHIVE_DIR'], table, filters, since, until):
+            click.echo(json.dumps(row, ensure_ascii=False))
+    
+    @app.cli.command('check-query-budgets')
+    @click.option('--budget', type=int, help='Budget for endpoints without one in QUERY_BUDGETS.')
+    def check_query_budgets_command(budget):
+        """Fail if a GET list endpoint issues more queries than its budget.
+        
+        Calls every GET endpoint under /api that takes no URL arguments
+        against the configured database and compares its query count with
+        QUERY_BUDGETS (or QUERY_BUDGET_DEFAULT).
+        """
+        from services.query_stats import query_stats
+        
+        default_budget = app.config['QUERY_BUDGET_DEFAULT'] if budget is None else budget
+        rules = sorted(
+            rule.rule for rule in app.url_map.iter_rules()
+            if 'GET' in rule.methods and not rule.arguments and rule.rule.startswith('/api/')
+        )
+        
+        client = app.test_client()
+        failed = False
+        for rule in rules:
+            query_stats.reset()
+            response = client.get(rule)
+            name = f"GET {rule}"
+            stats = {s['name']: s for s in query_stats.snapshot()}.get(name)
+            count = stats['queries'] if stats else 0
+            limit = app.config['QUERY_BUDGETS'].get(name, default_budget)
+            over = bool(limit) and count > limit
+            failed = failed or over
+            status = 'OVER BUDGET' if over else 'ok'
+            click.echo(f"{name}: {count} queries (budget {limit or '-'}, HTTP {response.status_code}) {status}")
+        
+        if failed:
+            raise SystemExit(1)
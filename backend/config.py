@@ -1,4 +1,5 @@
 """Application configuration."""
+import json
 import os
 from cryptography.fernet import Fernet
 
@@ -9,6 +10,22 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///twitter_monitor.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # PRAGMAs applied to each SQLite connection (see ProductionConfig)
+    SQLITE_PRAGMAS = {}
+    
+    # Connection budget: every API worker thread and every scheduler worker
+    # thread may hold one connection at a time
+    WEB_WORKER_THREADS = int(os.environ.get('WEB_WORKER_THREADS', 4))
+    SCHEDULER_MAX_WORKERS = int(os.environ.get('SCHEDULER_MAX_WORKERS', 4))
+    
+    # Connection pool (DB_POOL_SIZE=0 sizes the pool from the budget above)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 0))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 2))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    DB_CONNECT_ARGS = {}
+    
     # Encryption key for token storage
     ENCRYPTION_KEY = os.environ.get('ENCRYPTION_KEY', Fernet.generate_key().decode())
     
@@ -16,6 +33,21 @@ class Config:
     TWITTER_API_BASE_URL = os.environ.get('TWITTER_API_BASE_URL', 'https://api.twitterapi.io')
     TWITTER_API_KEY = os.environ.get('TWITTER_API_KEY', '')
     
+    # Seconds an HTTP request to the API may take; also how long a caller
+    # waits for an identical in-flight GET before sending its own
+    TWITTER_API_TIMEOUT_SECONDS = float(os.environ.get('TWITTER_API_TIMEOUT_SECONDS', 30))
+    
+    # Seconds successful GET responses are reused; concurrent identical GETs
+    # always share one upstream call
+    TWITTER_API_GET_CACHE_TTL_SECONDS = float(os.environ.get('TWITTER_API_GET_CACHE_TTL_SECONDS', 5))
+    
+    # Batch timeline fetch: search endpoint accepting "from:a OR from:b"
+    # queries (empty if the provider has none), pages fetched per batch, and
+    # how far before the last check the search window starts
+    TWITTER_API_BATCH_SEARCH_ENDPOINT = os.environ.get('TWITTER_API_BATCH_SEARCH_ENDPOINT', '/twitter/tweet/advanced_search')
+    TWITTER_API_BATCH_MAX_PAGES = int(os.environ.get('TWITTER_API_BATCH_MAX_PAGES', 5))
+    TWITTER_API_BATCH_SINCE_SLACK_SECONDS = int(os.environ.get('TWITTER_API_BATCH_SINCE_SLACK_SECONDS', 300))
+    
     # Rate limiting defaults
     DEFAULT_ACCOUNT_HOURLY_LIMIT = int(os.environ.get('DEFAULT_ACCOUNT_HOURLY_LIMIT', 10))
     DEFAULT_GLOBAL_RATE_LIMIT = int(os.environ.get('DEFAULT_GLOBAL_RATE_LIMIT', 60))
@@ -31,6 +63,83 @@ class Config:
     
     # Account failure threshold
     ACCOUNT_FAILURE_THRESHOLD = int(os.environ.get('ACCOUNT_FAILURE_THRESHOLD', 3))
+    
+    # Failed reply attempts per commit during a monitor check (0 = one transaction
+    # per check); each sent reply is committed as soon as it succeeds
+    MONITOR_COMMIT_BATCH_SIZE = int(os.environ.get('MONITOR_COMMIT_BATCH_SIZE', 0))
+    
+    # Rows counted at most for the approximate total of cursor-paginated logs
+    LOGS_APPROXIMATE_COUNT_CAP = int(os.environ.get('LOGS_APPROXIMATE_COUNT_CAP', 10000))
+    
+    # Rows fetched from the database per chunk when exporting logs
+    LOGS_EXPORT_CHUNK_SIZE = int(os.environ.get('LOGS_EXPORT_CHUNK_SIZE', 1000))
+    
+    # API responses stored with logs (none, errors, sampled, full); the
+    # api_response_capture setting takes precedence
+    API_RESPONSE_CAPTURE = os.environ.get('API_RESPONSE_CAPTURE', 'full')
+    API_RESPONSE_SAMPLE_PERCENT = int(os.environ.get('API_RESPONSE_SAMPLE_PERCENT', 10))
+    
+    # Hours an unreferenced payload is kept before retention deletes it;
+    # payloads are reused for half of that, so a log written by a running
+    # transaction never points at a deleted payload
+    API_PAYLOAD_GRACE_HOURS = int(os.environ.get('API_PAYLOAD_GRACE_HOURS', 24))
+    
+    # Tracing: number of recent traces kept in memory, and an optional file
+    # that finished traces are appended to as OTLP/JSON lines
+    TRACE_BUFFER_SIZE = int(os.environ.get('TRACE_BUFFER_SIZE', 200))
+    TRACE_EXPORT_PATH = os.environ.get('TRACE_EXPORT_PATH', '')
+    
+    # SQL accounting: queries slower than the threshold are logged with their
+    # call site; QUERY_BUDGET_MODE (off, warn, raise) enforces QUERY_BUDGETS,
+    # a dict of "METHOD /rule" or "job:<function>" to max queries, falling
+    # back to QUERY_BUDGET_DEFAULT (0 = unlimited). The hot paths have
+    # budgets one query above their current count; a JSON object in the
+    # QUERY_BUDGETS variable overrides or adds entries
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200))
+    QUERY_BUDGET_MODE = os.environ.get('QUERY_BUDGET_MODE', 'off')
+    QUERY_BUDGETS = {
+        'GET /api/logs': 3,
+        'GET /api/logs/stats': 4,
+        'GET /api/accounts': 3,
+        'GET /api/accounts/available': 2,
+        'GET /api/targets': 3,
+        'GET /api/reply-templates': 3,
+        'GET /api/post-jobs': 3,
+        'GET /api/post-contents': 3,
+        'GET /api/settings': 3,
+        **json.loads(os.environ.get('QUERY_BUDGETS', '{}')),
+    }
+    QUERY_BUDGET_DEFAULT = int(os.environ.get('QUERY_BUDGET_DEFAULT', 0))
+    
+    # Rendered list responses kept per process for ETag revalidation
+    ETAG_PAYLOAD_CACHE_ENTRIES = int(os.environ.get('ETAG_PAYLOAD_CACHE_ENTRIES', 256))
+    
+    # Response compression: gzip, or brotli when installed, for bodies of at
+    # least COMPRESS_MIN_SIZE bytes
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4))
+    
+    # Sampling profiler (admin endpoints and ?profile=1), output directory and
+    # the longest profiling window that can be requested
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'false').lower() == 'true'
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+    PROFILER_MAX_SECONDS = int(os.environ.get('PROFILER_MAX_SECONDS', 300))
+    
+    # Replied tweet dedup index: rotating Bloom filters over the last
+    # DEDUP_PARTITIONS * DEDUP_PARTITION_HOURS hours, snapshotted to disk
+    DEDUP_PARTITION_HOURS = int(os.environ.get('DEDUP_PARTITION_HOURS', 24))
+    DEDUP_PARTITIONS = int(os.environ.get('DEDUP_PARTITIONS', 7))
+    DEDUP_PARTITION_CAPACITY = int(os.environ.get('DEDUP_PARTITION_CAPACITY', 1000000))
+    DEDUP_ERROR_RATE = float(os.environ.get('DEDUP_ERROR_RATE', 0.001))
+    DEDUP_SNAPSHOT_PATH = os.environ.get('DEDUP_SNAPSHOT_PATH', 'replied_tweets.bloom')
+    DEDUP_SNAPSHOT_INTERVAL_MINUTES = int(os.environ.get('DEDUP_SNAPSHOT_INTERVAL_MINUTES', 10))
+    
+    # Log retention: archived rows are written to compressed segments here
+    LOG_ARCHIVE_DIR = os.environ.get('LOG_ARCHIVE_DIR', 'archives')
+    LOG_RETENTION_BATCH_SIZE = int(os.environ.get('LOG_RETENTION_BATCH_SIZE', 1000))
+    LOG_RETENTION_INTERVAL_MINUTES = int(os.environ.get('LOG_RETENTION_INTERVAL_MINUTES', 60))
 
 
 class DevelopmentConfig(Config):
@@ -41,10 +150,37 @@ class DevelopmentConfig(Config):
 class ProductionConfig(Config):
     """Production configuration."""
     DEBUG = False
+    
+    # SQLite production profile, applied on every new connection. WAL lets the
+    # API threads read while the scheduler writes; NORMAL sync is durable in WAL
+    # mode except for the last commits on power loss.
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE_KB', 65536)) * -1,
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 268435456)),
+        'temp_store': 'MEMORY',
+    }
+
+
+class PostgresConfig(ProductionConfig):
+    """Production configuration for PostgreSQL (requires psycopg2)."""
+    SQLALCHEMY_DATABASE_URI = os.environ.get(
+        'DATABASE_URL', 'postgresql+psycopg2://twitter_monitor@localhost/twitter_monitor'
+    )
+    DB_CONNECT_ARGS = {
+        'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 10)),
+        'application_name': os.environ.get('DB_APPLICATION_NAME', 'twitter-monitor'),
+        'options': f"-c statement_timeout={int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))}",
+        'keepalives': 1,
+        'keepalives_idle': 60,
+    }
 
 
 config = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
+    'postgres': PostgresConfig,
     'default': DevelopmentConfig
 }
@@ -0,0 +1,248 @@
+"""Database engine configuration."""
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, event, inspect, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+
+
+def connection_budget(config):
+    """Get the number of connections one process may hold at the same time.
+    
+    Each API worker thread and each scheduler worker thread uses at most one
+    connection, so the pool must hold at least that many.
+    
+    Args:
+        config: Flask config mapping
+    
+    Returns:
+        Number of pooled connections per process
+    """
+    return config['WEB_WORKER_THREADS'] + config['SCHEDULER_MAX_WORKERS']
+
+
+def build_engine_options(config):
+    """Build SQLAlchemy engine options from the pool settings in the config.
+    
+    In-memory SQLite databases keep SQLAlchemy's single-connection pool and
+    only get the connect args.
+    
+    Args:
+        config: Flask config mapping
+    
+    Returns:
+        dict suitable for SQLALCHEMY_ENGINE_OPTIONS
+    """
+    options = {}
+    if config.get('DB_CONNECT_ARGS'):
+        options['connect_args'] = dict(config['DB_CONNECT_ARGS'])
+    
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return options
+    
+    options.update({
+        'pool_size': config['DB_POOL_SIZE'] or connection_budget(config),
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    })
+    return options
+
+
+def configure_engine(app, db):
+    """Attach engine-level configuration for the app's database.
+    
+    Args:
+        app: Flask application instance
+        db: Flask-SQLAlchemy extension bound to the app
+    """
+    with app.app_context():
+        engine = db.engine
+    
+    if engine.dialect.name == 'sqlite':
+        pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+        if pragmas:
+            apply_sqlite_pragmas(engine, pragmas)
+
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Apply SQLite PRAGMAs on every new connection of an engine.
+    
+    Args:
+        engine: SQLAlchemy engine using the sqlite dialect
+        pragmas: Ordered mapping of pragma name to value
+    """
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+
+def increment_counters(conn, table, key_columns, counter_column, increments):
+    """Atomically add to counter rows, creating them when missing.
+    
+    Uses INSERT ... ON CONFLICT DO UPDATE on SQLite and PostgreSQL, and an
+    UPDATE followed by an INSERT elsewhere. ``key_columns`` must be covered by
+    a unique constraint.
+    
+    Args:
+        conn: SQLAlchemy connection inside the current transaction
+        table: Table holding the counters
+        key_columns: Names of the columns identifying a counter row
+        counter_column: Name of the column to increment
+        increments: Mapping of key tuple to the amount to add
+    """
+    if not increments:
+        return
+    
+    counter = table.c[counter_column]
+    rows = [dict(zip(key_columns, key), **{counter_column: amount})
+            for key, amount in increments.items()]
+    
+    dialect = {'sqlite': sqlite, 'postgresql': postgresql}.get(conn.dialect.name)
+    if dialect is not None:
+        stmt = dialect.insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c[name] for name in key_columns],
+            set_={counter_column: counter + stmt.excluded[counter_column]}
+        )
+        conn.execute(stmt, rows)
+        return
+    
+    for row in rows:
+        where = [table.c[name] == row[name] for name in key_columns]
+        updated = conn.execute(
+            table.update().where(*where).values({counter_column: counter + row[counter_column]})
+        )
+        if updated.rowcount == 0:
+            conn.execute(table.insert().values(row))
+
+
+# Record of the changes applied by upgrade_schema, one row per column or index
+schema_migrations = Table(
+    'schema_migrations', MetaData(),
+    Column('id', Integer, primary_key=True),
+    Column('change', String(255), nullable=False),
+    Column('applied_at', DateTime, nullable=False)
+)
+
+
+def upgrade_schema(db):
+    """Add columns and indexes declared on the models but missing from the database.
+    
+    ``db.create_all()`` only creates new tables, so this brings databases
+    created before a nullable column or an index was declared up to date. It
+    is idempotent and runs at startup; each change is recorded in
+    ``schema_migrations`` in the same transaction.
+    
+    Args:
+        db: Flask-SQLAlchemy extension (inside an app context)
+    
+    Returns:
+        List of created "table.column" and index names
+    """
+    created = []
+    with db.engine.begin() as conn:
+        schema_migrations.create(conn, checkfirst=True)
+        inspector = inspect(conn)
+        for table in db.metadata.sorted_tables:
+            existing_columns = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing_columns and column.nullable:
+                    column_type = column.type.compile(dialect=conn.dialect)
+                    conn.exec_driver_sql(
+                        f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+                    )
+                    created.append(f'{table.name}.{column.name}')
+                    _record_migration(conn, f'add column {table.name}.{column.name} {column_type}')
+            
+            existing_indexes = {ix['name'] for ix in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
+                    created.append(index.name)
+                    _record_migration(conn, f'create index {index.name} on {table.name}')
+    return created
+
+
+def _record_migration(conn, change):
+    """Record a schema change applied by upgrade_schema."""
+    conn.execute(schema_migrations.insert().values(change=change, applied_at=datetime.utcnow()))
+
+
+def hot_queries():
+    """Build the queries on the hot paths that must stay index-backed.
+    
+    Returns:
+        List of (name, select statement) tuples
+    """
+    from models.account import Account
+    from models.execution_log import ExecutionLog
+    from models.monitor_target import MonitorTarget
+    from models.post_job import PostJob
+    from models.replied_tweet import RepliedTweet
+    
+    now = datetime.utcnow()
+    recent_logs = ExecutionLog.query.order_by(ExecutionLog.created_at.desc()).limit(20)
+    queries = [('logs', recent_logs)]
+    for column, value in (('log_type', 'reply'), ('account_id', 1), ('target_id', 1),
+                          ('job_id', 1), ('tweet_id', '1'), ('result', 'failed')):
+        queries.append((f'logs_by_{column}', ExecutionLog.query.filter_by(**{column: value})
+                        .order_by(ExecutionLog.created_at.desc()).limit(20)))
+    queries += [
+        ('due_targets', MonitorTarget.query.filter_by(status='active').filter(
+            or_(MonitorTarget.next_check_at == None, MonitorTarget.next_check_at <= now))),
+        ('due_post_jobs', PostJob.query.filter_by(status='active').filter(
+            or_(PostJob.next_run_at == None, PostJob.next_run_at <= now))),
+        ('active_accounts', Account.query.filter_by(status='active')),
+        ('replied_tweet_dedup', RepliedTweet.query.filter_by(target_user_id='1', tweet_id='1')
+         .filter(RepliedTweet.account_id.in_([1, 2]))),
+    ]
+    return [(name, query.statement) for name, query in queries]
+
+
+def explain(conn, statement):
+    """Return the query plan of a statement as a list of text lines."""
+    compiled = statement.compile(dialect=conn.dialect, compile_kwargs={'render_postcompile': True})
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    
+    if conn.dialect.name == 'sqlite':
+        rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', params).all()
+        return [row[-1] for row in rows]
+    rows = conn.exec_driver_sql(f'EXPLAIN {compiled}', params).all()
+    return [row[0] for row in rows]
+
+
+def check_query_plans(db):
+    """Check that every hot query is answered through an index.
+    
+    SQLite plans must not contain a bare ``SCAN <table>``; on PostgreSQL
+    sequential scans are disabled for the check so a ``Seq Scan`` means no
+    usable index exists.
+    
+    Args:
+        db: Flask-SQLAlchemy extension (inside an app context)
+    
+    Returns:
+        List of dicts with name, plan and ok for each hot query
+    """
+    results = []
+    with db.engine.connect() as conn:
+        if conn.dialect.name == 'postgresql':
+            conn.exec_driver_sql('SET enable_seqscan = off')
+        for name, statement in hot_queries():
+            plan = explain(conn, statement)
+            if conn.dialect.name == 'sqlite':
+                ok = not any(line.startswith('SCAN') and 'USING' not in line for line in plan)
+            else:
+                ok = not any('Seq Scan' in line for line in plan)
+            results.append({'name': name, 'plan': plan, 'ok': ok})
+        conn.rollback()
+    return results
@@ -4,9 +4,12 @@ from models.monitor_target import MonitorTarget
 from models.reply_template import ReplyTemplate
 from models.post_job import PostJob
 from models.post_content import PostContent
+from models.api_payload import ApiPayload
 from models.execution_log import ExecutionLog
+from models.log_rollup import LogRollup
 from models.replied_tweet import RepliedTweet
 from models.system_setting import SystemSetting
+from models.collection_version import CollectionVersion
 
 __all__ = [
     'Account',
@@ -14,7 +17,10 @@ __all__ = [
     'ReplyTemplate',
     'PostJob',
     'PostContent',
+    'ApiPayload',
     'ExecutionLog',
+    'LogRollup',
     'RepliedTweet',
-    'SystemSetting'
+    'SystemSetting',
+    'CollectionVersion'
 ]
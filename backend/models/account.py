@@ -37,6 +37,11 @@ class Account(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Index for the active-account lookup in AccountSelector
+    __table_args__ = (
+        db.Index('ix_accounts_status', 'status'),
+    )
+    
     def set_token(self, token):
         """Encrypt and store the auth token."""
         key = current_app.config['ENCRYPTION_KEY'].encode()
@@ -56,6 +61,13 @@ class Account(db.Model):
             return '*' * len(token)
         return token[:4] + '*' * (len(token) - 8) + token[-4:]
     
+    def get_display_token(self):
+        """Return the masked token, or a placeholder if it cannot be decrypted."""
+        try:
+            return self.get_masked_token()
+        except Exception:
+            return '********'
+    
     def record_success(self):
         """Record a successful API call."""
         self.last_used_at = datetime.utcnow()
@@ -136,8 +148,5 @@ class Account(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
         if include_token_mask:
-            try:
-                data['token_masked'] = self.get_masked_token()
-            except Exception:
-                data['token_masked'] = '********'
+            data['token_masked'] = self.get_display_token()
         return data
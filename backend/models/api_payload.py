@@ -0,0 +1,33 @@
+"""API payload model for compact, deduplicated response storage."""
+import zlib
+from datetime import datetime
+from app import db
+
+
+class ApiPayload(db.Model):
+    """Compressed canonical JSON of a third-party API response.
+    
+    Logs reference payloads by ID, so identical responses are stored once.
+    """
+    __tablename__ = 'api_payloads'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    
+    # SHA-256 of the canonical JSON, used to find an existing copy. Not unique:
+    # concurrent writers may store the same payload twice, which is harmless.
+    content_hash = db.Column(db.String(64), nullable=False, index=True)
+    encoding = db.Column(db.String(10), default='zlib')  # zlib
+    data = db.Column(db.LargeBinary, nullable=False)
+    size = db.Column(db.Integer, nullable=False)  # Uncompressed size in bytes
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @classmethod
+    def from_text(cls, text, content_hash):
+        """Build a payload from canonical JSON text."""
+        raw = text.encode()
+        return cls(content_hash=content_hash, encoding='zlib', data=zlib.compress(raw, 6), size=len(raw))
+    
+    def get_text(self):
+        """Decompress and return the canonical JSON text."""
+        return zlib.decompress(self.data).decode()
@@ -0,0 +1,80 @@
+"""Version stamps of API collections, bumped on every write."""
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+from database import increment_counters
+from models.account import Account
+from models.monitor_target import MonitorTarget
+from models.reply_template import ReplyTemplate
+from models.post_job import PostJob
+from models.post_content import PostContent
+from models.system_setting import SystemSetting
+
+
+class CollectionVersion(db.Model):
+    """Change counter of one collection.
+    
+    Incremented in the transaction that inserts, updates or deletes any of
+    its rows, so a reader that sees an unchanged version also sees unchanged
+    rows. The version is the basis of the collection's ETag.
+    
+    Every column of these rows is serialized by the list endpoints, so the
+    scheduler's bookkeeping updates (counters, last/next run times) bump the
+    version as well.
+    """
+    __tablename__ = 'collection_versions'
+    
+    # Model class -> collection name
+    COLLECTIONS = {
+        Account: 'accounts',
+        MonitorTarget: 'targets',
+        ReplyTemplate: 'reply_templates',
+        PostJob: 'post_jobs',
+        PostContent: 'post_contents',
+        SystemSetting: 'settings',
+    }
+    
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    
+    @classmethod
+    def bump(cls, conn, names):
+        """Increment the versions of collections within the current transaction.
+        
+        Args:
+            conn: Connection of the transaction writing the rows
+            names: Iterable of collection names
+        """
+        increment_counters(conn, cls.__table__, ('name',), 'version', {(name,): 1 for name in set(names)})
+    
+    @classmethod
+    def current(cls, name):
+        """Get the version of a collection (0 if it was never written)."""
+        version = db.session.query(cls.version).filter(cls.name == name).scalar()
+        return version or 0
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_flushed_collections(session, flush_context):
+    """Bump the collections whose rows this flush changed."""
+    collections = CollectionVersion.COLLECTIONS
+    names = set()
+    for obj in session.new | session.deleted:
+        if type(obj) in collections:
+            names.add(collections[type(obj)])
+    for obj in session.dirty:
+        if type(obj) in collections and session.is_modified(obj, include_collections=False):
+            names.add(collections[type(obj)])
+    if names:
+        CollectionVersion.bump(session.connection(), names)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _bump_bulk_collections(orm_execute_state):
+    """Bump the collection of a bulk ``Query.update()`` or ``Query.delete()``."""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    name = CollectionVersion.COLLECTIONS.get(mapper.class_) if mapper is not None else None
+    if name:
+        CollectionVersion.bump(orm_execute_state.session.connection(), [name])
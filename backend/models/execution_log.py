@@ -1,5 +1,6 @@
 """Execution log model for tracking all operations."""
 from datetime import datetime
+from sqlalchemy.orm import joinedload
 from app import db
 
 
@@ -28,16 +29,57 @@ class ExecutionLog(db.Model):
     # Result
     result = db.Column(db.String(20), nullable=False)  # success, failed
     error_message = db.Column(db.Text, nullable=True)
-    api_response = db.Column(db.Text, nullable=True)
+    api_response = db.Column(db.Text, nullable=True)  # Legacy repr of the response
+    api_payload_id = db.Column(db.Integer, db.ForeignKey('api_payloads.id'), nullable=True)
     
     # Timing
     execution_time_ms = db.Column(db.Integer, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Indexes matching the filters and ordering of GET /api/logs
+    __table_args__ = (
+        db.Index('ix_execution_logs_created_at_id', 'created_at', 'id'),
+        db.Index('ix_execution_logs_log_type_created_at', 'log_type', 'created_at'),
+        db.Index('ix_execution_logs_account_id_created_at', 'account_id', 'created_at'),
+        db.Index('ix_execution_logs_target_id_created_at', 'target_id', 'created_at'),
+        db.Index('ix_execution_logs_job_id_created_at', 'job_id', 'created_at'),
+        db.Index('ix_execution_logs_result_created_at', 'result', 'created_at'),
+        db.Index('ix_execution_logs_tweet_id', 'tweet_id'),
+    )
+    
     # Relationships
     account = db.relationship('Account', backref='logs')
     target = db.relationship('MonitorTarget', backref='logs')
     job = db.relationship('PostJob', backref='logs')
+    api_payload = db.relationship('ApiPayload')
+    
+    @classmethod
+    def query_with_related(cls):
+        """Query that loads the related rows used by to_dict in the same SELECT.
+        
+        Without it, to_dict lazy-loads the account, target, job and payload of
+        every row, issuing up to four extra queries per log.
+        """
+        from models.account import Account
+        from models.monitor_target import MonitorTarget
+        from models.post_job import PostJob
+        
+        return cls.query.options(
+            joinedload(cls.account).load_only(Account.name),
+            joinedload(cls.target).load_only(MonitorTarget.target_username),
+            joinedload(cls.job).load_only(PostJob.name),
+            joinedload(cls.api_payload)
+        )
+    
+    def get_api_response(self):
+        """Get the stored API response as text.
+        
+        Falls back to the legacy column when there is no payload, including
+        when the payload row is gone.
+        """
+        if self.api_payload is not None:
+            return self.api_payload.get_text()
+        return self.api_response
     
     def to_dict(self):
         """Convert to dictionary for API response."""
@@ -56,7 +98,7 @@ class ExecutionLog(db.Model):
             'content_text': self.content_text,
             'result': self.result,
             'error_message': self.error_message,
-            'api_response': self.api_response,
+            'api_response': self.get_api_response(),
             'execution_time_ms': self.execution_time_ms,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
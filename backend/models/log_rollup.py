@@ -0,0 +1,92 @@
+"""Hourly rollups of execution log counts."""
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+from database import increment_counters
+from models.execution_log import ExecutionLog
+
+
+class LogRollup(db.Model):
+    """Number of logs per hour, log type, result, account, target and job.
+    
+    Kept up to date as logs are flushed, so statistics can be read without
+    scanning ``execution_logs``. A missing account, target or job is stored as
+    0 so the unique key also matches rows without one.
+    """
+    __tablename__ = 'execution_log_rollups'
+    
+    DIMENSIONS = ('hour', 'log_type', 'result', 'account_id', 'target_id', 'job_id')
+    
+    id = db.Column(db.Integer, primary_key=True)
+    hour = db.Column(db.DateTime, nullable=False)  # Start of the hour (UTC)
+    log_type = db.Column(db.String(20), nullable=False)
+    result = db.Column(db.String(20), nullable=False)
+    account_id = db.Column(db.Integer, nullable=False, default=0)
+    target_id = db.Column(db.Integer, nullable=False, default=0)
+    job_id = db.Column(db.Integer, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        db.UniqueConstraint(*DIMENSIONS, name='unique_log_rollup'),
+    )
+    
+    @staticmethod
+    def rollup_key(log):
+        """Get the rollup key a log is counted under."""
+        created_at = log.created_at or datetime.utcnow()
+        return (
+            created_at.replace(minute=0, second=0, microsecond=0),
+            log.log_type,
+            log.result,
+            log.account_id or 0,
+            log.target_id or 0,
+            log.job_id or 0
+        )
+    
+    @classmethod
+    def record(cls, conn, logs):
+        """Add logs to the rollups within the current transaction.
+        
+        Args:
+            conn: Connection of the transaction writing the logs
+            logs: Iterable of ExecutionLog instances or rows
+        """
+        increments = Counter(cls.rollup_key(log) for log in logs)
+        increment_counters(conn, cls.__table__, cls.DIMENSIONS, 'count', increments)
+    
+    @classmethod
+    def rebuild(cls, chunk_size=5000):
+        """Recompute all rollups from the execution log table.
+        
+        Returns:
+            Number of logs counted
+        """
+        db.session.query(cls).delete()
+        
+        columns = [ExecutionLog.created_at, ExecutionLog.log_type, ExecutionLog.result,
+                   ExecutionLog.account_id, ExecutionLog.target_id, ExecutionLog.job_id]
+        rows = db.session.query(*columns).execution_options(yield_per=chunk_size)
+        
+        total = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                cls.record(db.session.connection(), batch)
+                total += len(batch)
+                batch = []
+        cls.record(db.session.connection(), batch)
+        total += len(batch)
+        
+        db.session.commit()
+        return total
+
+
+@event.listens_for(Session, 'after_flush')
+def _rollup_new_logs(session, flush_context):
+    """Count logs inserted by this flush into the rollups."""
+    logs = [obj for obj in session.new if isinstance(obj, ExecutionLog)]
+    if logs:
+        LogRollup.record(session.connection(), logs)
@@ -32,6 +32,11 @@ class MonitorTarget(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Index for the due-target lookup in run_monitor_check
+    __table_args__ = (
+        db.Index('ix_monitor_targets_status_next_check_at', 'status', 'next_check_at'),
+    )
+    
     def update_after_check(self, success, error=None, tweets_found=0):
         """Update target state after a check."""
         from datetime import timedelta
@@ -31,6 +31,11 @@ class PostJob(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Index for the due-job lookup in run_post_jobs
+    __table_args__ = (
+        db.Index('ix_post_jobs_status_next_run_at', 'status', 'next_run_at'),
+    )
+    
     def update_after_run(self, success, error=None, tweet_id=None, advance_pointer=True):
         """Update job state after a run."""
         self.last_run_at = datetime.utcnow()
@@ -18,9 +18,10 @@ class RepliedTweet(db.Model):
     replied_at = db.Column(db.DateTime, default=datetime.utcnow)
     reply_tweet_id = db.Column(db.String(50), nullable=True)  # The tweet ID of our reply
     
-    # Unique constraint
+    # Unique constraint, and index for dedup index warm-up and retention
     __table_args__ = (
         db.UniqueConstraint('target_user_id', 'tweet_id', 'account_id', name='unique_reply'),
+        db.Index('ix_replied_tweets_replied_at', 'replied_at'),
     )
     
     # Relationship
@@ -2,24 +2,28 @@
 from flask import Blueprint, request, jsonify
 from app import db
 from models.account import Account
+from services.http_cache import conditional_collection
+from services.list_query import ListSpec, list_response
 
 accounts_bp = Blueprint('accounts', __name__)
 
+ACCOUNT_LIST = ListSpec(
+    Account,
+    fields=('id', 'name', 'twitter_user_id', 'twitter_handle', 'status', 'last_used_at', 'last_success_at',
+            'last_failure_at', 'last_failure_reason', 'consecutive_failures', 'hourly_action_count', 'weight',
+            'max_concurrent_usage', 'current_usage_count', 'created_at', 'updated_at', 'token_masked'),
+    default_sort='-created_at',
+    sortable=('name', 'created_at', 'updated_at'),
+    filters=('status',),
+    computed={'token_masked': (('encrypted_token',), Account.get_display_token)}
+)
+
 
 @accounts_bp.route('', methods=['GET'])
+@conditional_collection('accounts')
 def list_accounts():
-    """List all accounts with optional filtering."""
-    status = request.args.get('status')
-    
-    query = Account.query
-    if status:
-        query = query.filter_by(status=status)
-    
-    accounts = query.order_by(Account.created_at.desc()).all()
-    return jsonify({
-        'success': True,
-        'data': [acc.to_dict() for acc in accounts]
-    })
+    """List accounts with optional filtering, sorting, fields and cursor pagination."""
+    return list_response(ACCOUNT_LIST)
 
 
 @accounts_bp.route('/<int:account_id>', methods=['GET'])
@@ -0,0 +1,151 @@
+"""Debug routes for inspecting runtime behaviour."""
+import os
+from flask import Blueprint, request, jsonify, current_app, send_from_directory
+from services.tracing import trace_buffer
+from services import profiler
+from services.query_stats import query_stats
+
+debug_bp = Blueprint('debug', __name__)
+
+
+@debug_bp.route('/traces', methods=['GET'])
+def list_traces():
+    """List recent traces.
+    
+    Query params: ``name`` (root span name, e.g. ``monitor.cycle``),
+    ``sort`` (``recent`` or ``slowest``) and ``limit``.
+    """
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    traces = trace_buffer.list(
+        name=request.args.get('name'),
+        slowest=request.args.get('sort') == 'slowest',
+        limit=limit
+    )
+    
+    return jsonify({
+        'success': True,
+        'data': [{
+            'trace_id': root.trace_id,
+            'name': root.name,
+            'start': root.start_ns / 1e9,
+            'duration_ms': round(root.duration_ms, 3),
+            'status': root.status,
+            'attributes': root.attributes,
+            'span_count': sum(1 for _ in root.walk())
+        } for root in traces]
+    })
+
+
+@debug_bp.route('/traces/<trace_id>', methods=['GET'])
+def get_trace(trace_id):
+    """Get a trace with its nested spans."""
+    root = trace_buffer.get(trace_id)
+    if root is None:
+        return jsonify({'success': False, 'error': 'Trace not found'}), 404
+    
+    return jsonify({
+        'success': True,
+        'data': dict(root.to_dict(), trace_id=root.trace_id)
+    })
+
+
+@debug_bp.route('/queries', methods=['GET'])
+def get_query_stats():
+    """Get SQL query counts and DB time per endpoint and scheduled task."""
+    return jsonify({
+        'success': True,
+        'data': query_stats.snapshot()
+    })
+
+
+@debug_bp.route('/queries', methods=['DELETE'])
+def reset_query_stats():
+    """Reset the SQL query aggregates."""
+    query_stats.reset()
+    return jsonify({'success': True})
+
+
+def _profile_to_dict(active):
+    """Convert a scheduler profile into a dictionary."""
+    return {
+        'running': active.running,
+        'started_at': active.started_at.isoformat() if active.started_at else None,
+        'duration_seconds': active.duration,
+        'interval_ms': active.interval * 1000,
+        'samples': active.sample_count,
+        'path': active.path,
+        'top_functions': active.top_functions()
+    }
+
+
+def _profiler_disabled():
+    """Build the response returned when profiling is not enabled."""
+    return jsonify({'success': False, 'error': 'Profiling is disabled (PROFILER_ENABLED)'}), 403
+
+
+@debug_bp.route('/profile', methods=['GET'])
+def get_profile():
+    """Get the current or last scheduler profile and the saved profile files."""
+    active = profiler.get_scheduler_profile()
+    return jsonify({
+        'success': True,
+        'data': {
+            'enabled': current_app.config['PROFILER_ENABLED'],
+            'current': _profile_to_dict(active) if active else None,
+            'files': profiler.list_profiles(current_app.config['PROFILE_DIR'])
+        }
+    })
+
+
+@debug_bp.route('/profile', methods=['POST'])
+def start_profile():
+    """Start sampling the scheduler jobs for a bounded time window.
+    
+    Body: ``duration_seconds`` (default 60, capped at PROFILER_MAX_SECONDS)
+    and ``interval_ms`` (default 10).
+    """
+    if not current_app.config['PROFILER_ENABLED']:
+        return _profiler_disabled()
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        duration = float(data.get('duration_seconds', 60))
+        interval = float(data.get('interval_ms', 10)) / 1000
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'Invalid duration_seconds or interval_ms'}), 400
+    if duration <= 0 or interval <= 0:
+        return jsonify({'success': False, 'error': 'duration_seconds and interval_ms must be positive'}), 400
+    duration = min(duration, current_app.config['PROFILER_MAX_SECONDS'])
+    
+    try:
+        active = profiler.start_scheduler_profile(current_app.config['PROFILE_DIR'], duration, interval)
+    except RuntimeError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+    
+    return jsonify({
+        'success': True,
+        'data': _profile_to_dict(active)
+    })
+
+
+@debug_bp.route('/profile', methods=['DELETE'])
+def stop_profile():
+    """Stop the running scheduler profile early; its output is still written."""
+    if not current_app.config['PROFILER_ENABLED']:
+        return _profiler_disabled()
+    
+    active = profiler.stop_scheduler_profile()
+    return jsonify({
+        'success': True,
+        'data': _profile_to_dict(active) if active else None
+    })
+
+
+@debug_bp.route('/profile/files/<name>', methods=['GET'])
+def download_profile(name):
+    """Download a collapsed-stack profile file."""
+    if not current_app.config['PROFILER_ENABLED']:
+        return _profiler_disabled()
+    
+    directory = os.path.abspath(current_app.config['PROFILE_DIR'])
+    return send_from_directory(directory, name, mimetype='text/plain')
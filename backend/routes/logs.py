@@ -1,15 +1,58 @@
 """Execution logs routes."""
-from flask import Blueprint, request, jsonify
-from datetime import datetime
+import csv
+import io
+import zlib
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from datetime import datetime, timedelta, timezone
 from app import db
 from models.execution_log import ExecutionLog
+from models.log_rollup import LogRollup
+from services import json_codec
+from services.pagination import keyset_page, approximate_count
 
 logs_bp = Blueprint('logs', __name__)
 
 
 @logs_bp.route('', methods=['GET'])
 def list_logs():
-    """List execution logs with filtering and pagination."""
+    """List execution logs with filtering and pagination.
+    
+    Passing ``cursor`` (empty for the first page) switches from page numbers
+    to keyset pagination on (created_at, id), which skips the COUNT(*) and
+    the OFFSET scan. Add ``total=approximate`` for a capped row count.
+    """
+    # Pagination
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+    per_page = max(1, min(per_page, 100))  # 1 to 100 per page
+    
+    query = _filtered_log_query()
+    
+    if 'cursor' in request.args:
+        return _list_logs_by_cursor(query, per_page)
+    
+    # Order by most recent first
+    query = query.order_by(ExecutionLog.created_at.desc(), ExecutionLog.id.desc())
+    
+    # Paginate
+    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    
+    return jsonify({
+        'success': True,
+        'data': [log.to_dict() for log in pagination.items],
+        'pagination': {
+            'page': pagination.page,
+            'per_page': pagination.per_page,
+            'total': pagination.total,
+            'pages': pagination.pages,
+            'has_next': pagination.has_next,
+            'has_prev': pagination.has_prev
+        }
+    })
+
+
+def _filtered_log_query():
+    """Build the log query with the filters given in the request arguments."""
     # Filters
     log_type = request.args.get('log_type')
     account_id = request.args.get('account_id', type=int)
@@ -20,12 +63,7 @@ def list_logs():
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     
-    # Pagination
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
-    per_page = min(per_page, 100)  # Max 100 per page
-    
-    query = ExecutionLog.query
+    query = ExecutionLog.query_with_related()
     
     if log_type:
         query = query.filter_by(log_type=log_type)
@@ -54,30 +92,134 @@ def list_logs():
         except ValueError:
             pass
     
-    # Order by most recent first
-    query = query.order_by(ExecutionLog.created_at.desc())
+    return query
+
+
+def _list_logs_by_cursor(query, per_page):
+    """Return one keyset-paginated page of logs, most recent first."""
+    try:
+        logs, next_cursor = keyset_page(
+            query,
+            [ExecutionLog.created_at, ExecutionLog.id],
+            cursor=request.args.get('cursor'),
+            limit=per_page
+        )
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid cursor'
+        }), 400
     
-    # Paginate
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    pagination = {
+        'per_page': per_page,
+        'next_cursor': next_cursor,
+        'has_next': next_cursor is not None
+    }
+    
+    if request.args.get('total') == 'approximate':
+        cap = current_app.config.get('LOGS_APPROXIMATE_COUNT_CAP', 10000)
+        total, exact = approximate_count(query, cap)
+        pagination['approximate_total'] = total
+        pagination['total_is_exact'] = exact
     
     return jsonify({
         'success': True,
-        'data': [log.to_dict() for log in pagination.items],
-        'pagination': {
-            'page': pagination.page,
-            'per_page': pagination.per_page,
-            'total': pagination.total,
-            'pages': pagination.pages,
-            'has_next': pagination.has_next,
-            'has_prev': pagination.has_prev
-        }
+        'data': [log.to_dict() for log in logs],
+        'pagination': pagination
     })
 
 
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+@logs_bp.route('/export', methods=['GET'])
+def export_logs():
+    """Stream all logs matching the list filters as NDJSON or CSV.
+    
+    Rows are fetched from the database in chunks and written out as they
+    arrive, so memory use does not grow with the number of exported logs.
+    ``compress=gzip`` gzips the stream.
+    """
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({
+            'success': False,
+            'error': f"Unsupported format: {export_format}"
+        }), 400
+    
+    compress = request.args.get('compress')
+    if compress not in (None, 'gzip'):
+        return jsonify({
+            'success': False,
+            'error': f"Unsupported compression: {compress}"
+        }), 400
+    
+    chunk_size = current_app.config.get('LOGS_EXPORT_CHUNK_SIZE', 1000)
+    query = _filtered_log_query().order_by(ExecutionLog.created_at.desc(), ExecutionLog.id.desc())
+    
+    # Executed as a 2.0-style select: the legacy Query uniquifies joined eager
+    # loads, which rules out yield_per
+    logs = db.session.execute(
+        query.statement.execution_options(yield_per=chunk_size)
+    ).scalars()
+    
+    chunks = _export_chunks(logs, export_format, chunk_size)
+    if compress == 'gzip':
+        chunks = _gzip_chunks(chunks)
+    
+    filename = f"execution_logs.{export_format}" + ('.gz' if compress else '')
+    mimetype = 'application/gzip' if compress else EXPORT_FORMATS[export_format]
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
+def _export_chunks(logs, export_format, chunk_size):
+    """Serialize logs into byte chunks of chunk_size rows."""
+    buffer = io.StringIO()
+    writer = None
+    rows = 0
+    
+    for log in logs:
+        data = log.to_dict()
+        if export_format == 'csv':
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=list(data))
+                writer.writeheader()
+            writer.writerow(data)
+        else:
+            buffer.write(json_codec.dumps(data))
+            buffer.write('\n')
+        
+        rows += 1
+        if rows % chunk_size == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _gzip_chunks(chunks):
+    """Gzip a stream of byte chunks."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
 @logs_bp.route('/<int:log_id>', methods=['GET'])
 def get_log(log_id):
     """Get a single log entry by ID."""
-    log = ExecutionLog.query.get_or_404(log_id)
+    log = ExecutionLog.query_with_related().filter_by(id=log_id).first_or_404()
     return jsonify({
         'success': True,
         'data': log.to_dict()
@@ -86,31 +228,80 @@ def get_log(log_id):
 
 @logs_bp.route('/stats', methods=['GET'])
 def get_stats():
-    """Get log statistics."""
+    """Get log statistics from the hourly rollups.
+    
+    Optional ``start``/``end`` (ISO datetimes) restrict the window, rounded
+    to whole hours. ``group_by`` takes a comma-separated list of log_type,
+    result, account_id, target_id, job_id and hour and adds per-group counts.
+    """
+    query = LogRollup.query
+    
+    start_date = request.args.get('start')
+    end_date = request.args.get('end')
+    try:
+        if start_date:
+            start_dt = _parse_datetime(start_date).replace(minute=0, second=0, microsecond=0)
+            query = query.filter(LogRollup.hour >= start_dt)
+        if end_date:
+            query = query.filter(LogRollup.hour <= _parse_datetime(end_date))
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid start or end date'
+        }), 400
+    
+    group_by = [g for g in request.args.get('group_by', '').split(',') if g]
+    invalid = [g for g in group_by if g not in LogRollup.DIMENSIONS]
+    if invalid:
+        return jsonify({
+            'success': False,
+            'error': f"Invalid group_by: {', '.join(invalid)}"
+        }), 400
+    
+    total = db.func.sum(LogRollup.count)
+    
     # Total counts by type
-    type_counts = db.session.query(
-        ExecutionLog.log_type,
-        db.func.count(ExecutionLog.id)
-    ).group_by(ExecutionLog.log_type).all()
+    type_counts = query.with_entities(LogRollup.log_type, total).group_by(LogRollup.log_type).all()
     
     # Success/failure counts
-    result_counts = db.session.query(
-        ExecutionLog.result,
-        db.func.count(ExecutionLog.id)
-    ).group_by(ExecutionLog.result).all()
-    
-    # Recent activity (last 24 hours)
-    from datetime import timedelta
-    yesterday = datetime.utcnow() - timedelta(hours=24)
-    recent_count = ExecutionLog.query.filter(
-        ExecutionLog.created_at >= yesterday
-    ).count()
+    result_counts = query.with_entities(LogRollup.result, total).group_by(LogRollup.result).all()
+    
+    # Recent activity (the current hour and the 23 before it)
+    since = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=23)
+    recent_count = LogRollup.query.with_entities(total).filter(LogRollup.hour >= since).scalar()
+    
+    data = {
+        'by_type': {t: int(c) for t, c in type_counts},
+        'by_result': {r: int(c) for r, c in result_counts},
+        'recent_24h': int(recent_count or 0)
+    }
+    
+    if group_by:
+        columns = [getattr(LogRollup, g) for g in group_by]
+        rows = query.with_entities(*columns, total).group_by(*columns).order_by(*columns).all()
+        data['groups'] = [
+            dict({g: _group_value(g, v) for g, v in zip(group_by, row)}, count=int(row[-1]))
+            for row in rows
+        ]
     
     return jsonify({
         'success': True,
-        'data': {
-            'by_type': {t: c for t, c in type_counts},
-            'by_result': {r: c for r, c in result_counts},
-            'recent_24h': recent_count
-        }
+        'data': data
     })
+
+
+def _parse_datetime(value):
+    """Parse an ISO datetime from a query parameter into naive UTC."""
+    dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _group_value(dimension, value):
+    """Format a rollup dimension value for the API response."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if dimension.endswith('_id') and value == 0:
+        return None  # Rollups store a missing account/target/job as 0
+    return value
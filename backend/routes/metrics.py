@@ -0,0 +1,11 @@
+"""Metrics routes."""
+from flask import Blueprint, Response
+from services.metrics import registry
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Expose the metrics of this process in the Prometheus text format."""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
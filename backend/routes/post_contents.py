@@ -2,24 +2,26 @@
 from flask import Blueprint, request, jsonify
 from app import db
 from models.post_content import PostContent
+from services.http_cache import conditional_collection
+from services.list_query import ListSpec, list_response
 
 post_contents_bp = Blueprint('post_contents', __name__)
 
+CONTENT_LIST = ListSpec(
+    PostContent,
+    fields=('id', 'text', 'link', 'status', 'sort_order', 'usage_count', 'last_used_at', 'created_at',
+            'updated_at'),
+    default_sort='sort_order',
+    sortable=('created_at', 'updated_at'),
+    filters=('status',)
+)
+
 
 @post_contents_bp.route('', methods=['GET'])
+@conditional_collection('post_contents')
 def list_contents():
-    """List all post contents with optional filtering."""
-    status = request.args.get('status')
-    
-    query = PostContent.query
-    if status:
-        query = query.filter_by(status=status)
-    
-    contents = query.order_by(PostContent.sort_order, PostContent.id).all()
-    return jsonify({
-        'success': True,
-        'data': [c.to_dict() for c in contents]
-    })
+    """List post contents with optional filtering, sorting, fields and cursor pagination."""
+    return list_response(CONTENT_LIST)
 
 
 @post_contents_bp.route('/<int:content_id>', methods=['GET'])
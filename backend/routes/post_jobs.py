@@ -1,25 +1,28 @@
 """Post job management routes."""
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app import db
 from models.post_job import PostJob
+from services.http_cache import conditional_collection
+from services.list_query import ListSpec, list_response
 
 post_jobs_bp = Blueprint('post_jobs', __name__)
 
+JOB_LIST = ListSpec(
+    PostJob,
+    fields=('id', 'name', 'status', 'interval_minutes', 'current_content_index', 'account_strategy',
+            'last_run_at', 'next_run_at', 'last_run_result', 'last_run_error', 'last_tweet_id', 'total_posts',
+            'created_at', 'updated_at'),
+    default_sort='-created_at',
+    sortable=('name', 'created_at', 'updated_at'),
+    filters=('status',)
+)
+
 
 @post_jobs_bp.route('', methods=['GET'])
+@conditional_collection('post_jobs')
 def list_jobs():
-    """List all post jobs with optional filtering."""
-    status = request.args.get('status')
-    
-    query = PostJob.query
-    if status:
-        query = query.filter_by(status=status)
-    
-    jobs = query.order_by(PostJob.created_at.desc()).all()
-    return jsonify({
-        'success': True,
-        'data': [j.to_dict() for j in jobs]
-    })
+    """List post jobs with optional filtering, sorting, fields and cursor pagination."""
+    return list_response(JOB_LIST)
 
 
 @post_jobs_bp.route('/<int:job_id>', methods=['GET'])
@@ -117,12 +120,27 @@ def toggle_job_status(job_id):
 
 @post_jobs_bp.route('/<int:job_id>/run', methods=['POST'])
 def run_job_now(job_id):
-    """Trigger a job to run immediately."""
+    """Trigger a job to run immediately.
+    
+    With ``?profile=1`` (and PROFILER_ENABLED) the run is sampled and the
+    collapsed stacks are written to PROFILE_DIR.
+    """
     job = PostJob.query.get_or_404(job_id)
     
     # Import and run the post service
     from services.post_service import execute_post_job
-    result = execute_post_job(job.id)
+    
+    if request.args.get('profile') == '1' and current_app.config['PROFILER_ENABLED']:
+        from services.profiler import profile_current_thread
+        with profile_current_thread(current_app.config['PROFILE_DIR'], f'post-job-{job.id}') as profiler:
+            result = execute_post_job(job.id)
+        result['profile'] = {
+            'path': profiler.path,
+            'samples': profiler.sample_count,
+            'top_functions': profiler.top_functions()
+        }
+    else:
+        result = execute_post_job(job.id)
     
     return jsonify({
         'success': result.get('success', False),
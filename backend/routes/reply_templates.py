@@ -2,30 +2,26 @@
 from flask import Blueprint, request, jsonify
 from app import db
 from models.reply_template import ReplyTemplate
+from services.http_cache import conditional_collection
+from services.list_query import ListSpec, list_response
 
 reply_templates_bp = Blueprint('reply_templates', __name__)
 
+TEMPLATE_LIST = ListSpec(
+    ReplyTemplate,
+    fields=('id', 'content', 'status', 'scope', 'target_id', 'sort_order', 'usage_count', 'last_used_at',
+            'created_at', 'updated_at'),
+    default_sort='sort_order',
+    sortable=('created_at', 'updated_at'),
+    filters=('status', 'scope', 'target_id')
+)
+
 
 @reply_templates_bp.route('', methods=['GET'])
+@conditional_collection('reply_templates')
 def list_templates():
-    """List all reply templates with optional filtering."""
-    status = request.args.get('status')
-    scope = request.args.get('scope')
-    target_id = request.args.get('target_id', type=int)
-    
-    query = ReplyTemplate.query
-    if status:
-        query = query.filter_by(status=status)
-    if scope:
-        query = query.filter_by(scope=scope)
-    if target_id:
-        query = query.filter_by(target_id=target_id)
-    
-    templates = query.order_by(ReplyTemplate.sort_order, ReplyTemplate.id).all()
-    return jsonify({
-        'success': True,
-        'data': [t.to_dict() for t in templates]
-    })
+    """List reply templates with optional filtering, sorting, fields and cursor pagination."""
+    return list_response(TEMPLATE_LIST)
 
 
 @reply_templates_bp.route('/<int:template_id>', methods=['GET'])
@@ -2,31 +2,55 @@
 from flask import Blueprint, request, jsonify
 from app import db
 from models.system_setting import SystemSetting
+from services.http_cache import conditional_collection
+from services.list_query import ListSpec, list_response
+from services.log_retention import validate_retention_policies
 
 settings_bp = Blueprint('settings', __name__)
 
+SETTING_LIST = ListSpec(
+    SystemSetting,
+    fields=('id', 'key', 'value', 'value_type', 'description', 'created_at', 'updated_at'),
+    default_sort='id',
+    sortable=('key',),
+    filters=('value_type',),
+    computed={'value': (('value', 'value_type'), SystemSetting.get_typed_value)}
+)
+
 # Default settings to initialize
 DEFAULT_SETTINGS = [
     {'key': 'twitter_api_base_url', 'value': 'https://api.twitterapi.io', 'value_type': 'string', 'description': 'Base URL for Twitter API'},
     {'key': 'twitter_api_key', 'value': '', 'value_type': 'string', 'description': 'API key for Twitter API'},
     {'key': 'account_hourly_limit', 'value': '10', 'value_type': 'int', 'description': 'Max actions per account per hour'},
     {'key': 'global_rate_limit', 'value': '60', 'value_type': 'int', 'description': 'Max API calls per minute globally'},
+    {'key': 'timeline_batch_size', 'value': '20', 'value_type': 'int', 'description': 'Monitor targets fetched per batch search call (0 = one call per target)'},
     {'key': 'min_random_delay', 'value': '3', 'value_type': 'int', 'description': 'Minimum random delay in seconds'},
     {'key': 'max_random_delay', 'value': '20', 'value_type': 'int', 'description': 'Maximum random delay in seconds'},
     {'key': 'account_failure_threshold', 'value': '3', 'value_type': 'int', 'description': 'Consecutive failures before marking account as suspect'},
     {'key': 'account_selection_strategy', 'value': 'round_robin', 'value_type': 'string', 'description': 'Account selection strategy (round_robin, random, weighted)'},
     {'key': 'reply_selection_strategy', 'value': 'round_robin', 'value_type': 'string', 'description': 'Reply template selection strategy (round_robin, random)'},
+    {'key': 'api_response_capture', 'value': 'full', 'value_type': 'string', 'description': 'API responses stored with logs (none, errors, sampled, full)'},
+    {'key': 'api_response_sample_percent', 'value': '10', 'value_type': 'int', 'description': 'Percentage of successful responses stored when capture is sampled'},
+    {'key': 'log_retention_policies', 'value': '[]', 'value_type': 'json', 'description': 'Execution log retention policies, first match wins, e.g. [{"log_type": "monitor", "result": "success", "days": 7}, {"log_type": "*", "result": "*", "days": 90}]'},
+    {'key': 'replied_tweet_retention_days', 'value': '0', 'value_type': 'int', 'description': 'Days to keep replied tweet records (0 = forever)'},
 ]
 
 
 @settings_bp.route('', methods=['GET'])
+@conditional_collection('settings')
 def list_settings():
-    """List all settings."""
-    settings = SystemSetting.query.all()
-    return jsonify({
-        'success': True,
-        'data': [s.to_dict() for s in settings]
-    })
+    """List settings with optional filtering, sorting, fields and cursor pagination."""
+    return list_response(SETTING_LIST)
+
+
+def _validate_setting(setting):
+    """Check the value of a setting that is parsed elsewhere.
+    
+    Raises:
+        ValueError: If the value is invalid
+    """
+    if setting.key == 'log_retention_policies':
+        validate_retention_policies(setting.get_typed_value())
 
 
 @settings_bp.route('/<key>', methods=['GET'])
@@ -59,6 +83,15 @@ def update_setting(key):
     if 'description' in data:
         setting.description = data['description']
     
+    try:
+        _validate_setting(setting)
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
     db.session.commit()
     
     return jsonify({
@@ -77,6 +110,14 @@ def update_settings_batch():
         setting = SystemSetting.query.filter_by(key=key).first()
         if setting:
             setting.set_typed_value(value)
+            try:
+                _validate_setting(setting)
+            except ValueError as e:
+                db.session.rollback()
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 400
     
     db.session.commit()
     
@@ -2,24 +2,28 @@
 from flask import Blueprint, request, jsonify
 from app import db
 from models.monitor_target import MonitorTarget
+from services.http_cache import conditional_collection
+from services.list_query import ListSpec, list_response
 
 targets_bp = Blueprint('targets', __name__)
 
+TARGET_LIST = ListSpec(
+    MonitorTarget,
+    fields=('id', 'target_user_id', 'target_username', 'name', 'status', 'check_interval_minutes',
+            'fetch_tweet_count', 'max_new_tweets_per_check', 'last_seen_tweet_id', 'last_check_at',
+            'next_check_at', 'last_check_result', 'last_check_error', 'total_tweets_found',
+            'total_replies_sent', 'created_at', 'updated_at'),
+    default_sort='-created_at',
+    sortable=('target_user_id', 'created_at', 'updated_at'),
+    filters=('status',)
+)
+
 
 @targets_bp.route('', methods=['GET'])
+@conditional_collection('targets')
 def list_targets():
-    """List all monitor targets with optional filtering."""
-    status = request.args.get('status')
-    
-    query = MonitorTarget.query
-    if status:
-        query = query.filter_by(status=status)
-    
-    targets = query.order_by(MonitorTarget.created_at.desc()).all()
-    return jsonify({
-        'success': True,
-        'data': [t.to_dict() for t in targets]
-    })
+    """List monitor targets with optional filtering, sorting, fields and cursor pagination."""
+    return list_response(TARGET_LIST)
 
 
 @targets_bp.route('/<int:target_id>', methods=['GET'])
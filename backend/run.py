@@ -25,6 +25,12 @@ with app.app_context():
             )
             db.session.add(setting)
     db.session.commit()
+    
+    # Backfill log statistics for databases created before rollups existed
+    from models.execution_log import ExecutionLog
+    from models.log_rollup import LogRollup
+    if LogRollup.query.first() is None and ExecutionLog.query.first() is not None:
+        LogRollup.rebuild()
 
 # Initialize scheduler (only in production or when explicitly enabled)
 if os.environ.get('ENABLE_SCHEDULER', 'true').lower() == 'true':
@@ -2,6 +2,7 @@
 import random
 from app import db
 from models.account import Account
+from services.metrics import ACCOUNTS_AVAILABLE
 
 
 class AccountSelector:
@@ -14,7 +15,9 @@ class AccountSelector:
     def get_available_accounts(cls):
         """Get all available accounts that can be used."""
         accounts = Account.query.filter_by(status='active').all()
-        return [acc for acc in accounts if acc.can_use()]
+        available = [acc for acc in accounts if acc.can_use()]
+        ACCOUNTS_AVAILABLE.set(len(available))
+        return available
     
     @classmethod
     def select_account(cls, strategy='round_robin', context='default'):
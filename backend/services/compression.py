@@ -0,0 +1,74 @@
+"""Negotiated gzip/brotli compression of API responses."""
+import gzip
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Optional: only gzip is offered without it
+    brotli = None
+
+# Content types worth compressing
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/')
+
+
+def available_encodings():
+    """Get the supported content codings, preferred first."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def encoded_etag(etag, encoding):
+    """Get the ETag of a compressed representation.
+    
+    Each coding is a different representation, so it gets its own strong tag.
+    """
+    return f'{etag}-{encoding}'
+
+
+def compress(data, encoding, settings):
+    """Compress a body with a content coding."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=settings['brotli_quality'])
+    return gzip.compress(data, compresslevel=settings['gzip_level'], mtime=0)
+
+
+def init_compression(app):
+    """Compress eligible responses in an after_request hook.
+    
+    Streamed, passthrough (files), bodiless and already encoded responses are
+    left alone, as are bodies below ``COMPRESS_MIN_SIZE`` bytes.
+    
+    Args:
+        app: Flask application instance
+    """
+    if not app.config['COMPRESS_ENABLED']:
+        return
+    settings = {
+        'min_size': app.config['COMPRESS_MIN_SIZE'],
+        'gzip_level': app.config['COMPRESS_GZIP_LEVEL'],
+        'brotli_quality': app.config['COMPRESS_BROTLI_QUALITY'],
+    }
+    
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code < 200 or response.status_code in (204, 304)
+                or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or not (response.mimetype or '').startswith(COMPRESSIBLE_TYPES)):
+            return response
+        
+        response.vary.add('Accept-Encoding')
+        if response.content_length is not None and response.content_length < settings['min_size']:
+            return response
+        encoding = request.accept_encodings.best_match(available_encodings())
+        if encoding is None:
+            return response
+        
+        data = response.get_data()
+        if len(data) < settings['min_size']:
+            return response
+        response.set_data(compress(data, encoding, settings))
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(encoded_etag(etag, encoding), weak)
+        return response
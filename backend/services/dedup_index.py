@@ -0,0 +1,286 @@
+"""In-memory Bloom filter index of replied tweets."""
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over byte strings."""
+    __slots__ = ('size', 'hash_count', 'bits')
+    
+    def __init__(self, capacity, error_rate, size=None, hash_count=None, bits=None):
+        """Initialize a filter sized for a capacity and false positive rate."""
+        if size is None:
+            size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+            hash_count = max(1, round(size / capacity * math.log(2)))
+        self.size = size
+        self.hash_count = hash_count
+        self.bits = bits if bits is not None else bytearray((size + 7) // 8)
+    
+    def _positions(self, key):
+        """Yield the bit positions of a key (double hashing)."""
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+    
+    def add(self, key):
+        """Add a key to the filter."""
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+    
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class RepliedTweetIndex:
+    """Rotating, time-partitioned Bloom filters of (target, tweet, account) replies.
+    
+    Each partition holds the replies of ``partition_hours``; only the newest
+    ``partitions`` are kept. A negative answer ("definitely not") lets the
+    monitor reply without a database lookup; a positive answer is only a
+    "maybe" (a reply, or a false positive at ``error_rate``) and is confirmed
+    against ``replied_tweets``, which stays the authority.
+    
+    The index knows the replies committed by this process and those loaded
+    from the database by ``warm``/``refresh``; replies of other processes
+    are picked up by the ``refresh`` at the start of each monitor cycle. Until
+    the index is warmed from a snapshot and/or the database it answers
+    "maybe" for every key.
+    """
+    
+    def __init__(self, partition_hours=24, partitions=7, capacity=1000000, error_rate=0.001):
+        self.partition_hours = partition_hours
+        self.max_partitions = partitions
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.partitions = deque()  # (start datetime, BloomFilter), oldest first
+        self.ready = False
+        self.loaded_at = None
+        self.snapshot_path = None
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(target_user_id, tweet_id, account_id):
+        """Build the filter key of a reply."""
+        return f"{target_user_id}:{tweet_id}:{account_id}".encode()
+    
+    def configure(self, partition_hours, partitions, capacity, error_rate):
+        """Change the sizing; clears the index."""
+        with self._lock:
+            self.partition_hours = partition_hours
+            self.max_partitions = partitions
+            self.capacity = capacity
+            self.error_rate = error_rate
+            self.partitions.clear()
+            self.ready = False
+            self.loaded_at = None
+    
+    @property
+    def window_start(self):
+        """Start of the time window covered by the index."""
+        newest = self._partition_start(datetime.utcnow())
+        return newest - timedelta(hours=self.partition_hours * (self.max_partitions - 1))
+    
+    def _partition_start(self, when):
+        """Align a naive UTC time to the start of its partition."""
+        hours = int((when - EPOCH).total_seconds() // 3600)
+        return EPOCH + timedelta(hours=hours - hours % self.partition_hours)
+    
+    def _partition_for(self, when):
+        """Get the filter of the partition covering a time, rotating as needed.
+        
+        Returns:
+            BloomFilter, or None if the time is older than the window
+        """
+        start = self._partition_start(when)
+        for partition_start, bloom in self.partitions:
+            if partition_start == start:
+                return bloom
+        
+        full = len(self.partitions) >= self.max_partitions
+        if full and start < self.partitions[0][0]:
+            return None
+        
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        partitions = sorted(list(self.partitions) + [(start, bloom)], key=lambda p: p[0])
+        self.partitions = deque(partitions[-self.max_partitions:])
+        return bloom
+    
+    def add(self, target_user_id, tweet_id, account_id, replied_at=None):
+        """Record a reply in the index."""
+        key = self.make_key(target_user_id, tweet_id, account_id)
+        with self._lock:
+            bloom = self._partition_for(replied_at or datetime.utcnow())
+            if bloom is not None:
+                bloom.add(key)
+    
+    def might_contain(self, target_user_id, tweet_id, account_id):
+        """Check whether a reply may have been recorded.
+        
+        Returns:
+            False only if the reply was certainly not recorded in the window
+        """
+        if not self.ready:
+            return True
+        key = self.make_key(target_user_id, tweet_id, account_id)
+        return any(key in bloom for _, bloom in self.partitions)
+    
+    def add_on_commit(self, session, target_user_id, tweet_id, account_id):
+        """Record a reply once the session's transaction commits.
+        
+        A reply rolled back with its transaction never reaches the index.
+        """
+        session.info.setdefault('replied_tweet_keys', []).append(
+            (self, (target_user_id, tweet_id, account_id))
+        )
+    
+    def warm(self, since=None):
+        """Load replies recorded since a time from the database.
+        
+        Args:
+            since: Only load replies at or after this time; defaults to the
+                start of the window
+        """
+        from models.replied_tweet import RepliedTweet
+        from app import db
+        
+        since = max(since, self.window_start) if since else self.window_start
+        loaded_at = datetime.utcnow()
+        rows = db.session.query(
+            RepliedTweet.target_user_id, RepliedTweet.tweet_id,
+            RepliedTweet.account_id, RepliedTweet.replied_at
+        ).filter(RepliedTweet.replied_at >= since).execution_options(yield_per=10000)
+        
+        count = 0
+        for row in rows:
+            self.add(*row)
+            count += 1
+        self.loaded_at = loaded_at
+        self.ready = True
+        return count
+    
+    def refresh(self, overlap=timedelta(minutes=5)):
+        """Load the replies recorded since the last load, e.g. by other processes.
+        
+        Args:
+            overlap: Also reload this much before the last load, for replies
+                committed after the time they were stamped with
+        """
+        if not self.ready or self.loaded_at is None:
+            return 0
+        return self.warm(self.loaded_at - overlap)
+    
+    def save_snapshot(self, path):
+        """Write the index to disk (atomically replacing the previous one)."""
+        with self._lock:
+            partitions = list(self.partitions)
+            header = {
+                'version': 1,
+                'saved_at': datetime.utcnow().isoformat(),
+                'partition_hours': self.partition_hours,
+                'partitions': [
+                    {'start': start.isoformat(), 'size': bloom.size, 'hash_count': bloom.hash_count}
+                    for start, bloom in partitions
+                ]
+            }
+            blobs = [bytes(bloom.bits) for _, bloom in partitions]
+        
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(json.dumps(header).encode() + b'\n')
+            for blob in blobs:
+                f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    
+    def load_snapshot(self, path):
+        """Load the index from disk.
+        
+        Returns:
+            Time the snapshot was saved, or None if there was no usable one
+        """
+        if not os.path.exists(path):
+            return None
+        
+        try:
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline())
+                if header.get('version') != 1 or header.get('partition_hours') != self.partition_hours:
+                    return None
+                partitions = deque()
+                for meta in header['partitions']:
+                    bits = bytearray(f.read((meta['size'] + 7) // 8))
+                    bloom = BloomFilter(self.capacity, self.error_rate, meta['size'], meta['hash_count'], bits)
+                    partitions.append((datetime.fromisoformat(meta['start']), bloom))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable dedup snapshot {path}: {e}")
+            return None
+        
+        with self._lock:
+            while len(partitions) > self.max_partitions:
+                partitions.popleft()
+            self.partitions = partitions
+        return datetime.fromisoformat(header['saved_at'])
+
+
+# Process-wide index used by the monitor service
+replied_tweet_index = RepliedTweetIndex()
+
+
+@event.listens_for(Session, 'after_commit')
+def _add_committed_replies(session):
+    """Add the replies of the transaction that just committed to their index."""
+    for index, key in session.info.pop('replied_tweet_keys', ()):
+        index.add(*key)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_rolled_back_replies(session, previous_transaction):
+    """Drop the replies of the transaction that was rolled back."""
+    session.info.pop('replied_tweet_keys', None)
+
+
+def init_dedup_index(app):
+    """Size the index from config and warm it from the snapshot and database.
+    
+    Replies recorded after the snapshot was taken are replayed from the
+    database, so a stale or missing snapshot never hides a reply.
+    
+    Args:
+        app: Flask application instance
+    """
+    config = app.config
+    replied_tweet_index.configure(
+        config['DEDUP_PARTITION_HOURS'],
+        config['DEDUP_PARTITIONS'],
+        config['DEDUP_PARTITION_CAPACITY'],
+        config['DEDUP_ERROR_RATE']
+    )
+    
+    replied_tweet_index.snapshot_path = config['DEDUP_SNAPSHOT_PATH']
+    saved_at = replied_tweet_index.load_snapshot(replied_tweet_index.snapshot_path)
+    since = saved_at - timedelta(minutes=5) if saved_at else None
+    with app.app_context():
+        count = replied_tweet_index.warm(since)
+    logger.info(f"Dedup index warmed with {count} replies")
+
+
+def save_dedup_snapshot():
+    """Persist the index; called by the scheduler and at shutdown."""
+    if replied_tweet_index.ready and replied_tweet_index.snapshot_path:
+        replied_tweet_index.save_snapshot(replied_tweet_index.snapshot_path)
@@ -0,0 +1,97 @@
+"""Conditional GET support for collection list endpoints."""
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request
+from models.collection_version import CollectionVersion
+from services.compression import available_encodings, encoded_etag
+
+
+class PayloadCache:
+    """Serialized response bodies keyed by ETag, least recently used out."""
+    
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, etag):
+        """Get a cached body, or None."""
+        with self._lock:
+            body = self._entries.get(etag)
+            if body is not None:
+                self._entries.move_to_end(etag)
+            return body
+    
+    def put(self, etag, body):
+        """Store a body, evicting the least recently used entries."""
+        with self._lock:
+            self._entries[etag] = body
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop all cached bodies."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Process-wide cache; entries of old versions simply age out
+payload_cache = PayloadCache()
+
+
+def collection_etag(name, version):
+    """Build the strong ETag of a collection version for the current request.
+    
+    The query string is part of the tag, since filters change the body.
+    """
+    args = '&'.join(f'{key}={value}' for key, value in sorted(request.args.items(multi=True)))
+    digest = hashlib.blake2b(args.encode(), digest_size=6).hexdigest()
+    return f'{name}-{version}-{digest}'
+
+
+def conditional_collection(name):
+    """Serve a list view with an ETag derived from its collection version.
+    
+    A request whose ``If-None-Match`` matches gets ``304 Not Modified``
+    without the rows being queried; otherwise the body is served from the
+    payload cache when the version was already rendered.
+    
+    Args:
+        name: Collection name, see ``CollectionVersion.COLLECTIONS``
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # Read the version before the rows, so a body is never cached
+            # under a version older than its contents
+            etag = collection_etag(name, CollectionVersion.current(name))
+            
+            # A client holding a compressed copy sends that coding's tag
+            candidates = [etag] + [encoded_etag(etag, encoding) for encoding in available_encodings()]
+            matched = next((tag for tag in candidates if request.if_none_match.contains(tag)), None)
+            if matched:
+                response = current_app.response_class(status=304)
+                etag = matched
+            else:
+                body = payload_cache.get(etag)
+                if body is None:
+                    response = current_app.make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    payload_cache.put(etag, response.get_data())
+                else:
+                    response = current_app.response_class(body, mimetype='application/json')
+            
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+
+def init_http_cache(app):
+    """Size the payload cache from the app config."""
+    payload_cache.max_entries = app.config['ETAG_PAYLOAD_CACHE_ENTRIES']
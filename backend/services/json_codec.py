@@ -0,0 +1,74 @@
+"""JSON encoding and decoding with an optional fast backend."""
+import json
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the stdlib json module
+    orjson = None
+
+
+def loads(data):
+    """Decode JSON from bytes or str.
+    
+    Raises:
+        ValueError: If the data is not valid JSON
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj):
+    """Encode an object as compact JSON text, non-ASCII text left unescaped.
+    
+    Values JSON has no type for (dates, decimals) are written with ``str``.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                obj, default=str, option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+            ).decode()
+        except orjson.JSONEncodeError:
+            pass  # e.g. integers wider than 64 bits
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that uses orjson when it is installed.
+    
+    Output matches the default provider (sorted keys, the same handling of
+    dates and other types through ``default``), except that non-ASCII text
+    is written as UTF-8 instead of ``\\u`` escapes.
+    """
+    
+    def _orjson_dumps(self, obj, indent=False):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=self.default, option=option)
+        except orjson.JSONEncodeError:
+            # e.g. integers wider than 64 bits; the stdlib encoder handles
+            # them or raises the usual TypeError
+            kwargs = {'indent': 2} if indent else {'separators': (',', ':')}
+            return super().dumps(obj, **kwargs).encode()
+    
+    def dumps(self, obj, **kwargs):
+        if orjson is None or set(kwargs) - {'indent', 'separators'} or kwargs.get('indent') not in (None, 2):
+            return super().dumps(obj, **kwargs)
+        return self._orjson_dumps(obj, indent='indent' in kwargs).decode()
+    
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._orjson_dumps(obj, indent) + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,171 @@
+"""Shared filtering, sorting, field selection and pagination of list routes."""
+from datetime import datetime
+from flask import jsonify, request
+from sqlalchemy import func
+from sqlalchemy.orm import load_only
+from services.pagination import keyset_page
+
+# Sort key stand-ins for NULL, by column type: such rows sort first
+NULL_SORT_VALUES = {datetime: datetime(1970, 1, 1), int: 0, str: ''}
+
+
+class ListQueryError(ValueError):
+    """Raised for invalid list arguments; the message is shown to the client."""
+
+
+class ListSpec:
+    """What a list route may filter, sort and select.
+    
+    Request arguments understood by ``list_response``:
+    
+    - ``<filter>=value`` for each name in ``filters`` (equality)
+    - ``sort=name`` or ``sort=-name`` (descending) on a ``sortable`` column;
+      the primary key breaks ties
+    - ``fields=id,name,status`` to return only those fields and load only
+      the columns they need
+    - ``cursor`` (empty for the first page) and/or ``per_page`` to switch to
+      keyset pagination
+    
+    Without any of them the route returns every row as ``to_dict()`` in the
+    default order, as before.
+    """
+    
+    def __init__(self, model, fields, default_sort, sortable=(), filters=(), computed=None):
+        """Initialize a list specification.
+        
+        Args:
+            model: Model class listed by the route
+            fields: Names of the fields of ``to_dict()``, in order
+            default_sort: Sort used when none is requested, e.g. ``-created_at``
+            sortable: Names of columns that can be sorted on
+            filters: Names of columns that can be filtered on
+            computed: Dict of field name to (column names, function of the row)
+                for fields that are not plain columns
+        """
+        self.model = model
+        self.fields = tuple(fields)
+        self.default_sort = default_sort
+        self.sortable = set(sortable) | {default_sort.lstrip('-'), 'id'}
+        self.filters = tuple(filters)
+        self.computed = computed or {}
+    
+    def column(self, name):
+        return getattr(self.model, name)
+    
+    def filtered_query(self, args):
+        """Build the model query with the requested filters applied."""
+        query = self.model.query
+        for name in self.filters:
+            column = self.column(name)
+            value = args.get(name, type=column.type.python_type)
+            if value:
+                query = query.filter(column == value)
+        return query
+    
+    def sort_key(self, name):
+        """Get the sort key expression of a column.
+        
+        Nullable columns are coalesced, since keyset pagination cannot
+        compare NULLs.
+        """
+        column = self.column(name)
+        if not self.model.__table__.c[name].nullable:
+            return column
+        return func.coalesce(column, NULL_SORT_VALUES[column.type.python_type])
+    
+    def sort_columns(self, sort):
+        """Get the sort key columns and direction of a sort argument.
+        
+        Returns:
+            Tuple of (column names, sort key expressions, descending)
+        
+        Raises:
+            ListQueryError: If the column cannot be sorted on
+        """
+        descending = sort.startswith('-')
+        name = sort.lstrip('-')
+        if name not in self.sortable:
+            raise ListQueryError(f"Cannot sort by {name}")
+        names = [name] if name == 'id' else [name, 'id']
+        return names, [self.sort_key(name) for name in names], descending
+    
+    def selected_fields(self, fields):
+        """Validate a ``fields`` argument.
+        
+        Returns:
+            Tuple of field names
+        
+        Raises:
+            ListQueryError: If a field is unknown
+        """
+        names = tuple(name for name in fields.split(',') if name)
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ListQueryError(f"Unknown fields: {', '.join(unknown)}")
+        return names
+    
+    def load_columns(self, fields, sort_names):
+        """Get the columns needed to serialize fields and build cursors."""
+        names = {'id'} | set(sort_names)
+        for name in fields:
+            names.update(self.computed[name][0] if name in self.computed else (name,))
+        return [self.column(name) for name in sorted(names)]
+    
+    def serialize(self, obj, fields):
+        """Serialize the selected fields of a row like ``to_dict()`` would."""
+        data = {}
+        for name in fields:
+            if name in self.computed:
+                data[name] = self.computed[name][1](obj)
+            else:
+                value = getattr(obj, name)
+                data[name] = value.isoformat() if isinstance(value, datetime) else value
+        return data
+
+
+def list_response(spec):
+    """Build the response of a list route from the request arguments.
+    
+    Args:
+        spec: ListSpec of the route
+    
+    Returns:
+        JSON response, or an error tuple with status 400
+    """
+    args = request.args
+    try:
+        sort_names, columns, descending = spec.sort_columns(args.get('sort') or spec.default_sort)
+        fields = spec.selected_fields(args['fields']) if 'fields' in args else None
+        
+        query = spec.filtered_query(args)
+        if fields is not None:
+            query = query.options(load_only(*spec.load_columns(fields, sort_names)))
+        
+        pagination = None
+        if 'cursor' in args or 'per_page' in args:
+            per_page = max(1, min(args.get('per_page', 20, type=int), 100))
+            try:
+                items, next_cursor = keyset_page(query, columns, cursor=args.get('cursor'),
+                                                 limit=per_page, descending=descending)
+            except ValueError as e:
+                raise ListQueryError('Invalid cursor') from e
+            pagination = {
+                'per_page': per_page,
+                'next_cursor': next_cursor,
+                'has_next': next_cursor is not None
+            }
+        else:
+            items = query.order_by(*[c.desc() if descending else c.asc() for c in columns]).all()
+    except ListQueryError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    payload = {
+        'success': True,
+        'data': [item.to_dict() if fields is None else spec.serialize(item, fields) for item in items]
+    }
+    if pagination is not None:
+        payload['pagination'] = pagination
+    return jsonify(payload)
@@ -0,0 +1,309 @@
+"""Retention, archiving and compaction for the log tables."""
+import gzip
+import io
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, not_, or_, true
+from sqlalchemy.orm import joinedload
+from app import db
+from models.execution_log import ExecutionLog
+from models.replied_tweet import RepliedTweet
+from models.system_setting import SystemSetting
+from services.payload_store import delete_orphaned_payloads
+
+try:
+    import zstandard
+except ImportError:  # Optional: segments fall back to gzip
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Tables with retention, and the column their age is measured on
+ARCHIVED_TABLES = {
+    'execution_logs': (ExecutionLog, 'created_at'),
+    'replied_tweets': (RepliedTweet, 'replied_at'),
+}
+
+
+class RetentionPolicyError(ValueError):
+    """Raised for an invalid log_retention_policies setting."""
+
+
+def validate_retention_policies(policies):
+    """Check retention policies and normalize their ``days`` to integers.
+    
+    Args:
+        policies: Decoded value of the log_retention_policies setting
+    
+    Returns:
+        List of policy dicts
+    
+    Raises:
+        RetentionPolicyError: If a policy is malformed
+    """
+    if policies is None:
+        return []
+    if not isinstance(policies, list):
+        raise RetentionPolicyError("log_retention_policies must be a list of policies")
+    
+    validated = []
+    for i, policy in enumerate(policies):
+        if not isinstance(policy, dict):
+            raise RetentionPolicyError(f"log_retention_policies[{i}] must be an object")
+        if 'days' not in policy:
+            raise RetentionPolicyError(f"log_retention_policies[{i}] is missing 'days'")
+        try:
+            days = int(policy['days'])
+        except (TypeError, ValueError):
+            days = -1
+        if days < 0 or isinstance(policy['days'], bool):
+            raise RetentionPolicyError(
+                f"log_retention_policies[{i}]: 'days' must be a non-negative integer, got {policy['days']!r}"
+            )
+        for key in ('log_type', 'result'):
+            if not isinstance(policy.get(key, '*'), str):
+                raise RetentionPolicyError(f"log_retention_policies[{i}]: '{key}' must be a string")
+        validated.append({**policy, 'days': days})
+    return validated
+
+
+def get_retention_policies():
+    """Get the execution log retention policies from settings.
+    
+    Each policy is a dict with ``log_type`` and ``result`` (``*`` matches any
+    value) and ``days``. A log follows the first policy that matches it.
+    
+    Returns:
+        List of policy dicts
+    
+    Raises:
+        RetentionPolicyError: If the setting holds a malformed policy
+    """
+    setting = SystemSetting.query.filter_by(key='log_retention_policies').first()
+    return validate_retention_policies(setting.get_typed_value() if setting else None)
+
+
+def get_replied_tweet_retention_days():
+    """Get the replied tweet retention in days (0 keeps them forever)."""
+    setting = SystemSetting.query.filter_by(key='replied_tweet_retention_days').first()
+    return (setting.get_typed_value() if setting else None) or 0
+
+
+def _policy_condition(policy):
+    """Build the SQL condition selecting the logs a policy applies to."""
+    conditions = []
+    if policy.get('log_type', '*') != '*':
+        conditions.append(ExecutionLog.log_type == policy['log_type'])
+    if policy.get('result', '*') != '*':
+        conditions.append(ExecutionLog.result == policy['result'])
+    return and_(*conditions) if conditions else true()
+
+
+def _expired_conditions(now):
+    """Build one condition per table selecting the rows past retention.
+    
+    Returns:
+        dict of table name to condition, for tables with something to expire
+    """
+    conditions = {}
+    
+    expired = []
+    earlier = []
+    for policy in get_retention_policies():
+        matches = _policy_condition(policy)
+        cutoff = now - timedelta(days=policy['days'])
+        expired.append(and_(matches, ExecutionLog.created_at < cutoff, *[not_(c) for c in earlier]))
+        earlier.append(matches)
+    if expired:
+        conditions['execution_logs'] = or_(*expired)
+    
+    days = get_replied_tweet_retention_days()
+    if days:
+        conditions['replied_tweets'] = RepliedTweet.replied_at < now - timedelta(days=days)
+    
+    return conditions
+
+
+def _serialize_row(obj):
+    """Convert a model instance into a JSON-serializable dict of its columns.
+    
+    Logs carry their API response inline, since payloads are deleted with
+    the last log referencing them.
+    """
+    data = {}
+    for column in obj.__table__.columns:
+        value = getattr(obj, column.key)
+        data[column.name] = value.isoformat() if isinstance(value, datetime) else value
+    if isinstance(obj, ExecutionLog):
+        data['api_response'] = obj.get_api_response()
+    return data
+
+
+def _segment_extension():
+    """Get the file extension of new archive segments."""
+    return 'ndjson.zst' if zstandard else 'ndjson.gz'
+
+
+def write_segment(archive_dir, table_name, rows):
+    """Write rows to a new compressed NDJSON archive segment.
+    
+    The segment is written to a temporary file, synced to disk and then
+    renamed, so a segment either exists completely or not at all.
+    
+    Args:
+        archive_dir: Directory holding the segments
+        table_name: Name of the archived table
+        rows: List of row dicts, ordered by id
+    
+    Returns:
+        Path of the written segment
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    timestamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S')
+    name = f"{table_name}-{timestamp}-{rows[0]['id']}-{rows[-1]['id']}.{_segment_extension()}"
+    path = os.path.join(archive_dir, name)
+    tmp_path = path + '.tmp'
+    
+    payload = ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows).encode()
+    if zstandard:
+        payload = zstandard.ZstdCompressor(level=10).compress(payload)
+    else:
+        payload = gzip.compress(payload, compresslevel=6)
+    
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+
+def archive_expired(table_name, condition, archive_dir, batch_size, dry_run=False):
+    """Move expired rows of one table into archive segments.
+    
+    Each batch is archived before it is deleted, so a crash can at worst
+    leave rows both archived and still in the table - they are archived again
+    in a later segment and never lost.
+    
+    Returns:
+        Number of rows archived (or that would be archived with dry_run)
+    """
+    model, _ = ARCHIVED_TABLES[table_name]
+    
+    if dry_run:
+        return model.query.filter(condition).count()
+    
+    total = 0
+    while True:
+        query = model.query
+        if model is ExecutionLog:
+            query = query.options(joinedload(ExecutionLog.api_payload))
+        rows = query.filter(condition).order_by(model.id).limit(batch_size).all()
+        if not rows:
+            break
+        
+        write_segment(archive_dir, table_name, [_serialize_row(row) for row in rows])
+        
+        ids = [row.id for row in rows]
+        model.query.filter(model.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        db.session.expunge_all()
+        
+        total += len(rows)
+        if len(rows) < batch_size:
+            break
+    
+    return total
+
+
+def run_retention(dry_run=False):
+    """Archive and delete all rows past their retention period.
+    
+    This is called by the scheduler. Log statistics are kept in the rollups
+    and are not affected.
+    
+    Returns:
+        dict of table name to number of archived rows
+    """
+    archive_dir = current_app.config.get('LOG_ARCHIVE_DIR', 'archives')
+    batch_size = current_app.config.get('LOG_RETENTION_BATCH_SIZE', 1000)
+    
+    results = {}
+    for table_name, condition in _expired_conditions(datetime.utcnow()).items():
+        results[table_name] = archive_expired(table_name, condition, archive_dir, batch_size, dry_run)
+        if results[table_name]:
+            logger.info(f"Archived {results[table_name]} rows from {table_name}")
+    
+    if results.get('execution_logs') and not dry_run:
+        delete_orphaned_payloads()
+    return results
+
+
+def compact_database():
+    """Reclaim space freed by deleted rows and refresh planner statistics.
+    
+    VACUUM blocks writers for its duration on SQLite, so this is run on demand
+    rather than after every retention pass.
+    """
+    engine = db.engine
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        if engine.dialect.name == 'sqlite':
+            conn.exec_driver_sql('VACUUM')
+            conn.exec_driver_sql('PRAGMA optimize')
+        elif engine.dialect.name == 'postgresql':
+            for table_name in ARCHIVED_TABLES:
+                conn.exec_driver_sql(f'VACUUM ANALYZE {table_name}')
+
+
+def _open_segment(path):
+    """Open an archive segment for reading text lines."""
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError(f"zstandard is required to read {path}")
+        raw = open(path, 'rb')
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(raw), encoding='utf-8')
+    return gzip.open(path, 'rt', encoding='utf-8')
+
+
+def read_archive(archive_dir, table_name, filters=None, since=None, until=None):
+    """Read archived rows back from the segments of a table.
+    
+    Args:
+        archive_dir: Directory holding the segments
+        table_name: Name of the archived table
+        filters: Optional dict of column name to required value
+        since: Optional datetime; only rows at or after it
+        until: Optional datetime; only rows at or before it
+    
+    Yields:
+        Row dicts, in segment order
+    """
+    _, time_column = ARCHIVED_TABLES[table_name]
+    filters = filters or {}
+    
+    if not os.path.isdir(archive_dir):
+        return
+    
+    segments = sorted(
+        name for name in os.listdir(archive_dir)
+        if name.startswith(f"{table_name}-") and not name.endswith('.tmp')
+    )
+    for name in segments:
+        with _open_segment(os.path.join(archive_dir, name)) as f:
+            for line in f:
+                row = json.loads(line)
+                if any(row.get(key) != value for key, value in filters.items()):
+                    continue
+                if since or until:
+                    created = row.get(time_column)
+                    created = datetime.fromisoformat(created) if created else None
+                    if created is None:
+                        continue
+                    if since and created < since:
+                        continue
+                    if until and created > until:
+                        continue
+                yield row
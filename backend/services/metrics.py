@@ -0,0 +1,282 @@
+"""In-process metrics registry exposed in the Prometheus text format."""
+import math
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Default histogram buckets (seconds), from a millisecond up to a minute
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _format_value(value):
+    """Format a sample value for the text format."""
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names, values, extra=None):
+    """Format a label set as {a="1",b="2"}."""
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _escape(value):
+    """Escape a label value."""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class _Metric:
+    """Base class of metrics with an optional set of label names."""
+    kind = None
+    
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+    
+    def _key(self, labels):
+        """Build the label value tuple of a sample."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def render(self):
+        """Render the metric as text format lines."""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self._samples())
+        return lines
+
+
+class _ShardOwner:
+    """Sentinel kept in a thread's locals; collected when the thread exits."""
+    __slots__ = ('__weakref__',)
+
+
+class _Sharded(_Metric):
+    """Metric whose updates go to a per-thread shard.
+    
+    Each thread only ever writes its own shard, so updates take no lock; the
+    shards are summed when the metric is rendered. When a thread exits, its
+    shard is folded into a shared total of retired shards, so short-lived
+    threads do not accumulate.
+    """
+    
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._local = threading.local()
+        self._shards = []
+        self._retired = {}
+        self._shards_lock = threading.Lock()
+    
+    def _shard(self):
+        """Get the calling thread's shard, creating it on first use."""
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            owner = self._local.owner = _ShardOwner()
+            weakref.finalize(owner, self._retire, shard)
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+    
+    def _retire(self, shard):
+        """Fold the shard of an exited thread into the retired total."""
+        with self._shards_lock:
+            self._shards = [live for live in self._shards if live is not shard]
+            self._merge(self._retired, shard)
+    
+    def _merge(self, totals, shard):
+        """Add the values of a shard to a totals dict."""
+        raise NotImplementedError
+    
+    def _totals(self):
+        """Get the sum of the retired total and all live shards."""
+        totals = {}
+        with self._shards_lock:
+            self._merge(totals, self._retired)
+            shards = list(self._shards)
+        for shard in shards:
+            self._merge(totals, dict(shard))
+        return totals
+
+
+class Counter(_Sharded):
+    """Monotonically increasing count."""
+    kind = 'counter'
+    
+    def inc(self, amount=1, **labels):
+        """Add to the counter."""
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+    
+    def _merge(self, totals, shard):
+        for key, value in shard.items():
+            totals[key] = totals.get(key, 0) + value
+    
+    def _samples(self):
+        for key, value in sorted(self._totals().items()):
+            yield f'{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(value)}'
+
+
+class Gauge(_Metric):
+    """Value that is set to the current state of something."""
+    kind = 'gauge'
+    
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+    
+    def set(self, value, **labels):
+        """Set the gauge (a single dict store, atomic under the GIL)."""
+        self._values[self._key(labels)] = value
+    
+    def _samples(self):
+        for key, value in sorted(dict(self._values).items()):
+            yield f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+
+
+class Histogram(_Sharded):
+    """Distribution of observed values in cumulative buckets."""
+    kind = 'histogram'
+    
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value, **labels):
+        """Record one observation."""
+        shard = self._shard()
+        key = self._key(labels)
+        state = shard.get(key)
+        if state is None:
+            # Per-bucket counts, then the overflow count, the sum and the count
+            state = shard[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[i] += 1
+                break
+        else:
+            state[len(self.buckets)] += 1
+        state[-2] += value
+        state[-1] += 1
+    
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+    
+    def _merge(self, totals, shard):
+        for key, state in shard.items():
+            total = totals.setdefault(key, [0] * len(state))
+            for i, value in enumerate(list(state)):
+                total[i] += value
+    
+    def _samples(self):
+        for key, state in sorted(self._totals().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), state):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(bound)))
+                yield f'{self.name}_bucket{labels} {cumulative}'
+            labels = _format_labels(self.labelnames, key)
+            yield f'{self.name}_sum{labels} {_format_value(state[-2])}'
+            yield f'{self.name}_count{labels} {state[-1]}'
+
+
+class MetricsRegistry:
+    """Named collection of metrics."""
+    
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+    
+    def _register(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+    
+    def counter(self, name, documentation, labelnames=()):
+        """Get or create a counter."""
+        return self._register(Counter, name, documentation, labelnames)
+    
+    def gauge(self, name, documentation, labelnames=()):
+        """Get or create a gauge."""
+        return self._register(Gauge, name, documentation, labelnames)
+    
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Get or create a histogram."""
+        return self._register(Histogram, name, documentation, labelnames, buckets)
+    
+    def render(self):
+        """Render all metrics in the Prometheus text format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide registry
+registry = MetricsRegistry()
+
+# Twitter API
+API_REQUEST_SECONDS = registry.histogram(
+    'twitter_api_request_seconds', 'Twitter API request latency', ('method', 'endpoint', 'status'))
+API_DELAY_SECONDS = registry.histogram(
+    'twitter_api_delay_seconds', 'Random delay applied before Twitter API requests')
+
+# Database
+DB_COMMIT_SECONDS = registry.histogram(
+    'db_commit_seconds', 'Duration of ORM session commits')
+
+# Scheduler and monitor
+SCHEDULER_JOB_SECONDS = registry.histogram(
+    'scheduler_job_seconds', 'Duration of scheduled job runs', ('job',))
+SCHEDULER_JOB_LAG_SECONDS = registry.histogram(
+    'scheduler_job_lag_seconds', 'Delay between a job run being due and being submitted', ('job',))
+MONITOR_CYCLE_SECONDS = registry.histogram(
+    'monitor_cycle_seconds', 'Duration of a monitor check cycle')
+MONITOR_CYCLE_TARGETS = registry.gauge(
+    'monitor_cycle_targets', 'Targets checked in the last monitor cycle')
+MONITOR_TARGETS_CHECKED = registry.counter(
+    'monitor_targets_checked', 'Monitor target checks', ('result',))
+MONITOR_TARGET_LAG_SECONDS = registry.histogram(
+    'monitor_target_lag_seconds', 'Delay between a target being due and being checked')
+REPLIES_SENT = registry.counter(
+    'replies_sent', 'Replies sent to monitored tweets', ('result',))
+
+# Account pool
+ACCOUNTS_AVAILABLE = registry.gauge(
+    'accounts_available', 'Accounts usable for actions at the last selection')
+ACCOUNT_ACQUIRE_FAILURES = registry.counter(
+    'account_acquire_failures', 'Account acquisitions refused (busy or rate limited)', ('context',))
+
+
+@event.listens_for(Session, 'before_commit')
+def _start_commit_timer(session):
+    session.info['metrics_commit_start'] = time.perf_counter()
+
+
+@event.listens_for(Session, 'after_commit')
+def _observe_commit(session):
+    start = session.info.pop('metrics_commit_start', None)
+    if start is not None:
+        DB_COMMIT_SECONDS.observe(time.perf_counter() - start)
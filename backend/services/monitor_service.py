@@ -1,229 +1,340 @@
 """Monitor service for checking new tweets and triggering replies."""
+import time
 from datetime import datetime
+from flask import current_app
 from app import db
 from models.monitor_target import MonitorTarget
 from models.replied_tweet import RepliedTweet
 from models.execution_log import ExecutionLog
 from services.twitter_api import TwitterAPIClient
+from services.payload_store import capture_api_response
 from services.account_selector import AccountSelector
 from services.template_selector import TemplateSelector
+from services.unit_of_work import UnitOfWork
+from services.dedup_index import replied_tweet_index
+from services.tweet import Tweet
+from services.metrics import (
+    ACCOUNT_ACQUIRE_FAILURES, MONITOR_CYCLE_SECONDS, MONITOR_CYCLE_TARGETS,
+    MONITOR_TARGET_LAG_SECONDS, MONITOR_TARGETS_CHECKED, REPLIES_SENT
+)
+from services.tracing import set_attribute, span, traced
 
 
-def check_target_for_new_tweets(target_id):
+def _commit_batch_size():
+    """Get the number of failed reply attempts per commit (0 = one per check)."""
+    return current_app.config.get('MONITOR_COMMIT_BATCH_SIZE', 0)
+
+
+@traced('monitor.check_target')
+def check_target_for_new_tweets(target_id, prefetched=None):
     """Check a monitor target for new tweets.
     
+    Each sent reply is committed with its ``RepliedTweet`` row as soon as it
+    succeeds, so a crash never makes it be sent again. The rest of the
+    check (target state, failed attempts and logs) is written in a single
+    transaction (or one per ``MONITOR_COMMIT_BATCH_SIZE`` failed attempts).
+    
     Args:
         target_id: ID of the MonitorTarget to check
-        
+        prefetched: Optional get_user_tweets style result fetched by a batch
+            call; the tweets are fetched here when omitted
+    
     Returns:
         dict with check results
     """
+    set_attribute('target_id', target_id)
     target = MonitorTarget.query.get(target_id)
     if not target or target.status != 'active':
         return {'success': False, 'error': 'Target not found or disabled'}
     
     # Create API client (no auth token needed for reading public tweets)
     client = TwitterAPIClient()
+    uow = UnitOfWork(batch_size=_commit_batch_size())
     
     try:
-        # Fetch recent tweets
-        result = client.get_user_tweets(target.target_user_id, target.fetch_tweet_count)
-        
-        if not result.get('success'):
-            target.update_after_check(False, result.get('error', 'Failed to fetch tweets'))
-            db.session.commit()
-            
-            # Log the failure
-            log = ExecutionLog(
-                log_type='monitor',
-                target_id=target.id,
-                tweet_author_id=target.target_user_id,
-                result='failed',
-                error_message=result.get('error'),
-                execution_time_ms=result.get('execution_time_ms')
-            )
-            db.session.add(log)
-            db.session.commit()
-            
-            return result
-        
-        tweets = result.get('tweets', [])
-        
-        # Find new tweets (those with ID > last_seen_tweet_id)
-        new_tweets = []
-        latest_tweet_id = target.last_seen_tweet_id
-        
-        for tweet in tweets:
-            tweet_id = tweet.get('id') or tweet.get('id_str') or tweet.get('tweetId')
-            if not tweet_id:
-                continue
-            
-            # Check if this is a new tweet
-            if target.last_seen_tweet_id is None or tweet_id > target.last_seen_tweet_id:
-                new_tweets.append(tweet)
-                
-                # Track the latest tweet ID
-                if latest_tweet_id is None or tweet_id > latest_tweet_id:
-                    latest_tweet_id = tweet_id
-        
-        # Update watermark
-        if latest_tweet_id:
-            target.last_seen_tweet_id = latest_tweet_id
-        
-        # Limit number of new tweets to process
-        new_tweets = new_tweets[:target.max_new_tweets_per_check]
-        
-        # Process each new tweet
-        replies_sent = 0
-        for tweet in new_tweets:
-            tweet_id = tweet.get('id') or tweet.get('id_str') or tweet.get('tweetId')
-            reply_result = reply_to_tweet(target, tweet_id)
-            if reply_result.get('replies_sent', 0) > 0:
-                replies_sent += reply_result['replies_sent']
-        
-        target.update_after_check(True, tweets_found=len(new_tweets))
-        target.total_replies_sent += replies_sent
-        db.session.commit()
+        # Pending writes only reach the database on commit, so the write lock
+        # is not held across the API calls and random delays
+        with db.session.no_autoflush:
+            return _check_target(target, client, prefetched, uow)
+    except Exception as e:
+        # Discard the uncommitted batch so the watermark never moves past
+        # replies that were not recorded
+        uow.rollback()
+        target = MonitorTarget.query.get(target_id)
+        target.update_after_check(False, str(e))
         
-        # Log success
         log = ExecutionLog(
             log_type='monitor',
             target_id=target.id,
-            tweet_author_id=target.target_user_id,
-            result='success',
-            execution_time_ms=result.get('execution_time_ms')
+            result='failed',
+            error_message=str(e)
         )
-        db.session.add(log)
-        db.session.commit()
-        
-        return {
-            'success': True,
-            'new_tweets_found': len(new_tweets),
-            'replies_sent': replies_sent
-        }
+        uow.add(log)
+        uow.commit()
         
-    except Exception as e:
-        target.update_after_check(False, str(e))
-        db.session.commit()
+        return {'success': False, 'error': str(e)}
+
+
+def _follow_rename(target, tweets):
+    """Update the target's username from its tweets.
+    
+    Batched timeline searches match users by username, so a stale one after
+    a rename would make the target's tweets go missing from them.
+    """
+    for tweet in tweets:
+        if tweet.author_id == target.target_user_id and tweet.author_username:
+            if tweet.author_username.lower() != (target.target_username or '').lstrip('@').lower():
+                target.target_username = tweet.author_username
+            return
+
+
+def _check_target(target, client, prefetched, uow):
+    """Fetch, filter and reply to the new tweets of a target."""
+    # Fetch recent tweets
+    result = prefetched
+    if result is None:
+        result = client.get_user_tweets(target.target_user_id, target.fetch_tweet_count)
+    
+    if not result.get('success'):
+        target.update_after_check(False, result.get('error', 'Failed to fetch tweets'))
         
+        # Log the failure
         log = ExecutionLog(
             log_type='monitor',
             target_id=target.id,
+            tweet_author_id=target.target_user_id,
             result='failed',
-            error_message=str(e)
+            error_message=result.get('error'),
+            execution_time_ms=result.get('execution_time_ms')
         )
-        db.session.add(log)
-        db.session.commit()
+        uow.add(log)
+        uow.commit()
         
-        return {'success': False, 'error': str(e)}
+        return result
+    
+    tweets = result.get('tweets', [])
+    _follow_rename(target, tweets)
+    
+    # Find new tweets (those with ID > last_seen_tweet_id). Tweet IDs are
+    # compared as integers, so IDs of different lengths order correctly
+    new_tweets = []
+    seen_ids = set()
+    watermark = _watermark(target)
+    latest_tweet_id = watermark
+    
+    for tweet in tweets:
+        if tweet.id in seen_ids:
+            continue
+        seen_ids.add(tweet.id)
+        
+        # Check if this is a new tweet
+        if watermark is None or tweet.id > watermark:
+            new_tweets.append(tweet)
+            
+            # Track the latest tweet ID
+            if latest_tweet_id is None or tweet.id > latest_tweet_id:
+                latest_tweet_id = tweet.id
+    
+    # Limit number of new tweets to process
+    new_tweets = new_tweets[:target.max_new_tweets_per_check]
+    
+    # Process the oldest first and move the watermark past a tweet only once
+    # its replies are written, so a batch commit (MONITOR_COMMIT_BATCH_SIZE)
+    # never records a watermark ahead of unprocessed tweets
+    replies_sent = 0
+    for tweet in sorted(new_tweets, key=lambda t: t.id):
+        reply_result = reply_to_tweet(target, tweet, uow=uow)
+        replies_sent += reply_result.get('replies_sent', 0)
+        target.last_seen_tweet_id = str(tweet.id)
+    
+    # New tweets beyond max_new_tweets_per_check are skipped
+    if latest_tweet_id is not None:
+        target.last_seen_tweet_id = str(latest_tweet_id)
+    
+    target.update_after_check(True, tweets_found=len(new_tweets))
+    target.total_replies_sent += replies_sent
+    
+    # Log success
+    log = ExecutionLog(
+        log_type='monitor',
+        target_id=target.id,
+        tweet_author_id=target.target_user_id,
+        result='success',
+        execution_time_ms=result.get('execution_time_ms')
+    )
+    uow.add(log)
+    uow.commit()
+    
+    return {
+        'success': True,
+        'new_tweets_found': len(new_tweets),
+        'replies_sent': replies_sent
+    }
 
 
-def reply_to_tweet(target, tweet_id):
+def _watermark(target):
+    """Get the last seen tweet ID of a target as an integer (None if unset)."""
+    try:
+        return int(target.last_seen_tweet_id) if target.last_seen_tweet_id else None
+    except ValueError:
+        return None
+
+
+@traced('monitor.reply')
+def reply_to_tweet(target, tweet, uow=None):
     """Send replies to a tweet from all available accounts.
     
     Each account replies once to each tweet.
     
     Args:
         target: MonitorTarget instance
-        tweet_id: ID of the tweet to reply to
-        
+        tweet: Tweet to reply to (or its ID)
+        uow: Optional UnitOfWork to write into. When omitted, the replies are
+            committed before returning.
+    
     Returns:
         dict with reply results
     """
-    # Get all available accounts
-    accounts = AccountSelector.select_all_available()
+    if not isinstance(tweet, Tweet):
+        tweet = Tweet(int(tweet))
+    set_attribute('tweet_id', tweet.id)
+    
+    # Get all available accounts (without flushing the caller's pending writes)
+    with db.session.no_autoflush:
+        accounts = AccountSelector.select_all_available()
     
     if not accounts:
         return {'success': False, 'error': 'No available accounts', 'replies_sent': 0}
     
+    if uow is None:
+        with UnitOfWork(batch_size=_commit_batch_size()) as own_uow:
+            return _send_replies(target, tweet, accounts, own_uow)
+    return _send_replies(target, tweet, accounts, uow)
+
+
+def replied_account_ids(target_user_id, tweet_id, account_ids):
+    """Get the accounts that already replied to a tweet.
+    
+    Accounts the index rules out are not looked up; the others ("maybe")
+    are confirmed in ``replied_tweets`` with one query.
+    
+    Returns:
+        set of account IDs
+    """
+    maybe = [
+        account_id for account_id in account_ids
+        if replied_tweet_index.might_contain(target_user_id, tweet_id, account_id)
+    ]
+    if not maybe:
+        return set()
+    
+    with span('reply.dedup_lookup'):
+        rows = db.session.query(RepliedTweet.account_id).filter(
+            RepliedTweet.target_user_id == target_user_id,
+            RepliedTweet.tweet_id == str(tweet_id),
+            RepliedTweet.account_id.in_(maybe)
+        ).all()
+    return {row.account_id for row in rows}
+
+
+def _send_replies(target, tweet, accounts, uow):
+    """Reply to a tweet from each account, writing into the unit of work.
+    
+    Autoflush is disabled so pending writes only reach the database on
+    commit, instead of holding the write lock across the API calls.
+    """
     replies_sent = 0
     errors = []
+    tweet_id = str(tweet.id)
+    author_id = tweet.author_id or target.target_user_id
     
-    for account in accounts:
-        # Check if this account already replied to this tweet
-        existing = RepliedTweet.query.filter_by(
-            target_user_id=target.target_user_id,
-            tweet_id=tweet_id,
-            account_id=account.id
-        ).first()
-        
-        if existing:
-            continue  # Skip - already replied
-        
-        # Try to acquire the account
-        if not account.acquire():
-            continue  # Account busy or rate limited
+    with db.session.no_autoflush:
+        replied_ids = replied_account_ids(target.target_user_id, tweet.id, [account.id for account in accounts])
+        accounts = [account for account in accounts if account.id not in replied_ids]
         
-        try:
-            # Select a reply template
-            template = TemplateSelector.select_template(target_id=target.id)
-            
-            if not template:
-                account.release()
-                errors.append('No reply templates available')
-                continue
+        for account in accounts:
+            # Try to acquire the account
+            if not account.acquire():
+                ACCOUNT_ACQUIRE_FAILURES.inc(context='reply')
+                continue  # Account busy or rate limited
             
-            # Create API client with this account's token
-            client = TwitterAPIClient(auth_token=account.get_token())
-            
-            # Send reply
-            result = client.reply_to_tweet(tweet_id, template.content)
-            
-            if result.get('success'):
-                # Record success
-                account.record_success()
-                template.record_usage()
-                
-                # Record that we replied
-                replied = RepliedTweet(
-                    target_user_id=target.target_user_id,
-                    tweet_id=tweet_id,
-                    account_id=account.id,
-                    reply_tweet_id=result.get('reply_tweet_id')
-                )
-                db.session.add(replied)
+            sent = False
+            try:
+                # Select a reply template
+                with span('reply.select_template'):
+                    template = TemplateSelector.select_template(target_id=target.id)
                 
-                # Log success
-                log = ExecutionLog(
-                    log_type='reply',
-                    account_id=account.id,
-                    target_id=target.id,
-                    tweet_id=tweet_id,
-                    tweet_author_id=target.target_user_id,
-                    content_id=template.id,
-                    content_text=template.content,
-                    result='success',
-                    api_response=str(result.get('data')),
-                    execution_time_ms=result.get('execution_time_ms')
-                )
-                db.session.add(log)
+                if not template:
+                    errors.append('No reply templates available')
+                    continue
                 
-                replies_sent += 1
-            else:
-                # Record failure
-                error_msg = result.get('error', 'Unknown error')
-                account.record_failure(error_msg)
+                # Create API client with this account's token
+                client = TwitterAPIClient(auth_token=account.get_token())
                 
-                # Log failure
-                log = ExecutionLog(
-                    log_type='reply',
-                    account_id=account.id,
-                    target_id=target.id,
-                    tweet_id=tweet_id,
-                    tweet_author_id=target.target_user_id,
-                    content_id=template.id,
-                    content_text=template.content,
-                    result='failed',
-                    error_message=error_msg,
-                    api_response=str(result.get('data')),
-                    execution_time_ms=result.get('execution_time_ms')
-                )
-                db.session.add(log)
+                # Send reply
+                result = client.reply_to_tweet(tweet_id, template.content)
                 
-                errors.append(error_msg)
-        finally:
-            account.release()
-            db.session.commit()
+                if result.get('success'):
+                    # Record success
+                    account.record_success()
+                    template.record_usage()
+                    
+                    # Record that we replied
+                    replied = RepliedTweet(
+                        target_user_id=target.target_user_id,
+                        tweet_id=tweet_id,
+                        account_id=account.id,
+                        reply_tweet_id=result.get('reply_tweet_id')
+                    )
+                    uow.add(replied)
+                    replied_tweet_index.add_on_commit(db.session, target.target_user_id, tweet.id, account.id)
+                    
+                    # Log success
+                    log = ExecutionLog(
+                        log_type='reply',
+                        account_id=account.id,
+                        target_id=target.id,
+                        tweet_id=tweet_id,
+                        tweet_author_id=author_id,
+                        content_id=template.id,
+                        content_text=template.content,
+                        result='success',
+                        api_payload=capture_api_response(result),
+                        execution_time_ms=result.get('execution_time_ms')
+                    )
+                    uow.add(log)
+                    REPLIES_SENT.inc(result='success')
+                    
+                    replies_sent += 1
+                    sent = True
+                else:
+                    # Record failure
+                    error_msg = result.get('error', 'Unknown error')
+                    account.record_failure(error_msg)
+                    
+                    # Log failure
+                    log = ExecutionLog(
+                        log_type='reply',
+                        account_id=account.id,
+                        target_id=target.id,
+                        tweet_id=tweet_id,
+                        tweet_author_id=author_id,
+                        content_id=template.id,
+                        content_text=template.content,
+                        result='failed',
+                        error_message=error_msg,
+                        api_payload=capture_api_response(result),
+                        execution_time_ms=result.get('execution_time_ms')
+                    )
+                    uow.add(log)
+                    REPLIES_SENT.inc(result='failed')
+                    
+                    errors.append(error_msg)
+            finally:
+                account.release()
+            
+            # The reply is public now: record it before anything can roll it back
+            uow.step(durable=sent)
     
     return {
         'success': replies_sent > 0,
@@ -232,11 +343,13 @@ def reply_to_tweet(target, tweet_id):
     }
 
 
+@traced('monitor.cycle')
 def run_monitor_check():
     """Run monitor check for all active targets that are due.
     
     This is called by the scheduler.
     """
+    cycle_start = time.perf_counter()
     now = datetime.utcnow()
     
     # Get targets that are due for checking
@@ -245,13 +358,37 @@ def run_monitor_check():
         (MonitorTarget.next_check_at <= now)
     ).all()
     
+    for target in targets:
+        if target.next_check_at:
+            MONITOR_TARGET_LAG_SECONDS.observe((now - target.next_check_at).total_seconds())
+    
+    set_attribute('targets', len(targets))
+    
+    # Pick up the replies other processes recorded since the last cycle
+    replied_tweet_index.refresh()
+    
+    # Fetch the timelines of all due targets in as few calls as possible
+    with span('monitor.fetch_timelines'):
+        timelines = TwitterAPIClient().get_users_tweets([
+            {
+                'user_id': target.target_user_id,
+                'username': target.target_username,
+                'count': target.fetch_tweet_count,
+                'since': target.last_check_at
+            }
+            for target in targets
+        ]) if targets else {}
+    
     results = []
     for target in targets:
-        result = check_target_for_new_tweets(target.id)
+        result = check_target_for_new_tweets(target.id, prefetched=timelines.get(target.target_user_id))
+        MONITOR_TARGETS_CHECKED.inc(result='success' if result.get('success') else 'failed')
         results.append({
             'target_id': target.id,
             'target_user_id': target.target_user_id,
             'result': result
         })
     
+    MONITOR_CYCLE_TARGETS.set(len(targets))
+    MONITOR_CYCLE_SECONDS.observe(time.perf_counter() - cycle_start)
     return results
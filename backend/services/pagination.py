@@ -0,0 +1,108 @@
+"""Keyset (cursor) pagination helpers."""
+import base64
+import json
+from datetime import datetime
+from app import db
+
+
+def encode_cursor(values):
+    """Encode the sort key of the last row of a page into an opaque cursor.
+    
+    Args:
+        values: Sequence of sort key values (datetimes, ints or strings)
+    
+    Returns:
+        URL-safe cursor string
+    """
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    """Decode a cursor back into sort key values typed like the columns.
+    
+    Args:
+        cursor: Cursor string produced by encode_cursor
+        columns: Sort key columns the cursor was built from
+    
+    Returns:
+        List of sort key values
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError('Invalid cursor') from e
+    
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError('Invalid cursor')
+    
+    decoded = []
+    for column, value in zip(columns, values):
+        if value is not None and column.type.python_type is datetime:
+            try:
+                value = datetime.fromisoformat(value)
+            except (ValueError, TypeError) as e:
+                raise ValueError('Invalid cursor') from e
+        decoded.append(value)
+    return decoded
+
+
+def keyset_page(query, columns, cursor=None, limit=20, descending=True):
+    """Fetch one page of a query ordered by a unique sort key.
+    
+    The last column must make the key unique (usually the primary key). Pages
+    are located with a row-value comparison on the key instead of OFFSET, so
+    with an index on the key every page costs the same as the first one. The
+    key must not be NULL; wrap nullable columns in ``coalesce()``.
+    
+    Args:
+        query: Filtered query, without ordering
+        columns: Sort key columns or expressions, all sorted in the same
+            direction
+        cursor: Cursor returned with the previous page, or None for the first
+        limit: Page size
+        descending: Sort direction
+    
+    Returns:
+        Tuple of (items, next_cursor); next_cursor is None on the last page
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if cursor:
+        key = db.tuple_(*columns)
+        values = db.tuple_(*decode_cursor(cursor, columns))
+        query = query.filter(key < values if descending else key > values)
+    
+    # The key values are selected with the rows, since they may be
+    # expressions rather than attributes of the items
+    order = [c.desc() if descending else c.asc() for c in columns]
+    rows = query.add_columns(*columns).order_by(*order).limit(limit + 1).all()
+    items = [row[0] for row in rows]
+    
+    next_cursor = None
+    if len(rows) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(list(rows[limit - 1][1:]))
+    return items, next_cursor
+
+
+def approximate_count(query, cap):
+    """Count the rows of a query, stopping at a cap.
+    
+    Args:
+        query: Filtered query
+        cap: Maximum number of rows to count
+    
+    Returns:
+        Tuple of (count, exact); exact is False when the cap was reached
+    """
+    entity = query.column_descriptions[0]['entity']
+    capped = query.order_by(None).with_entities(*db.inspect(entity).primary_key).limit(cap).subquery()
+    count = db.session.query(db.func.count()).select_from(capped).scalar()
+    return count, count < cap
@@ -0,0 +1,149 @@
+"""Storage of API response payloads for execution logs."""
+import hashlib
+import json
+import random
+from datetime import datetime, timedelta
+from flask import current_app, g
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+from models.api_payload import ApiPayload
+from models.system_setting import SystemSetting
+
+CAPTURE_LEVELS = ('none', 'errors', 'sampled', 'full')
+
+
+def get_capture_settings():
+    """Get the API response capture level and sample percentage.
+    
+    The settings are read once per app context, i.e. once per request or
+    scheduler job run, not for every log written.
+    
+    Returns:
+        Tuple of (level, sample_percent)
+    """
+    if 'api_capture_settings' not in g:
+        g.api_capture_settings = _read_capture_settings()
+    return g.api_capture_settings
+
+
+def _read_capture_settings():
+    """Read the capture settings from the config and system settings."""
+    level = current_app.config.get('API_RESPONSE_CAPTURE', 'full')
+    percent = current_app.config.get('API_RESPONSE_SAMPLE_PERCENT', 10)
+    
+    settings = SystemSetting.query.filter(SystemSetting.key.in_(
+        ['api_response_capture', 'api_response_sample_percent']
+    )).all()
+    for setting in settings:
+        if setting.key == 'api_response_capture' and setting.value:
+            level = setting.get_typed_value()
+        elif setting.key == 'api_response_sample_percent' and setting.value:
+            percent = setting.get_typed_value()
+    
+    if level not in CAPTURE_LEVELS:
+        level = 'full'
+    return level, percent
+
+
+def should_capture(success):
+    """Decide whether the response of an API call is stored.
+    
+    ``errors`` stores failed calls only; ``sampled`` stores every failed call
+    and a percentage of successful ones.
+    """
+    level, percent = get_capture_settings()
+    if level == 'full':
+        return True
+    if success:
+        return level == 'sampled' and random.uniform(0, 100) < percent
+    return level in ('errors', 'sampled')
+
+
+def canonical_json(data):
+    """Serialize data to canonical JSON (sorted keys, no whitespace)."""
+    return json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def store_payload(data):
+    """Get or create the payload row for some response data.
+    
+    Payloads created earlier in the same session are reused too, so repeated
+    responses within one transaction are stored once. Stored payloads are
+    reused for half of ``API_PAYLOAD_GRACE_HOURS``.
+    
+    Args:
+        data: Decoded API response
+        
+    Returns:
+        ApiPayload instance (possibly pending) or None if data is None
+    """
+    if data is None:
+        return None
+    
+    text = canonical_json(data)
+    content_hash = hashlib.sha256(text.encode()).hexdigest()
+    
+    pending = db.session.info.setdefault('api_payloads', {})
+    payload = pending.get(content_hash)
+    if payload is None:
+        # Only recent payloads are reused: older ones may be deleted as
+        # orphans before this transaction commits
+        reusable_since = datetime.utcnow() - _grace_period() / 2
+        with db.session.no_autoflush:
+            payload = ApiPayload.query.filter_by(content_hash=content_hash).filter(
+                ApiPayload.created_at >= reusable_since
+            ).first()
+    if payload is None:
+        payload = ApiPayload.from_text(text, content_hash)
+        db.session.add(payload)
+    pending[content_hash] = payload
+    return payload
+
+
+def capture_api_response(result):
+    """Store the response of an API call according to the capture level.
+    
+    Args:
+        result: Result dict returned by TwitterAPIClient
+        
+    Returns:
+        ApiPayload to attach to the execution log, or None
+    """
+    if result.get('data') is None or not should_capture(bool(result.get('success'))):
+        return None
+    return store_payload(result['data'])
+
+
+def _grace_period():
+    """Get how long an unreferenced payload is kept."""
+    return timedelta(hours=current_app.config.get('API_PAYLOAD_GRACE_HOURS', 24))
+
+
+def delete_orphaned_payloads():
+    """Delete payloads no longer referenced by any execution log.
+    
+    Payloads younger than ``API_PAYLOAD_GRACE_HOURS`` are kept, since an
+    uncommitted transaction may have just reused them.
+    
+    Returns:
+        Number of deleted payloads
+    """
+    from models.execution_log import ExecutionLog
+    
+    referenced = db.session.query(ExecutionLog.api_payload_id).filter(
+        ExecutionLog.api_payload_id.isnot(None)
+    )
+    deleted = ApiPayload.query.filter(
+        ApiPayload.created_at < datetime.utcnow() - _grace_period(),
+        ~ApiPayload.id.in_(referenced)
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_soft_rollback')
+def _clear_pending_payloads(session, *args):
+    """Forget the payloads of the transaction that just ended."""
+    session.info.pop('api_payloads', None)
@@ -5,9 +5,13 @@ from models.post_job import PostJob
 from models.post_content import PostContent
 from models.execution_log import ExecutionLog
 from services.twitter_api import TwitterAPIClient
+from services.payload_store import capture_api_response
 from services.account_selector import AccountSelector
+from services.metrics import ACCOUNT_ACQUIRE_FAILURES
+from services.tracing import set_attribute, traced
 
 
+@traced('post.execute')
 def execute_post_job(job_id):
     """Execute a post job.
     
@@ -17,6 +21,7 @@ def execute_post_job(job_id):
     Returns:
         dict with execution results
     """
+    set_attribute('job_id', job_id)
     job = PostJob.query.get(job_id)
     if not job:
         return {'success': False, 'error': 'Job not found'}
@@ -49,6 +54,7 @@ def execute_post_job(job_id):
         
         # Try to acquire the account
         if not account.acquire():
+            ACCOUNT_ACQUIRE_FAILURES.inc(context='post')
             job.update_after_run(False, 'Account busy or rate limited', advance_pointer=False)
             db.session.commit()
             return {'success': False, 'error': 'Account busy or rate limited'}
@@ -80,7 +86,7 @@ def execute_post_job(job_id):
                     content_id=content.id,
                     content_text=tweet_text,
                     result='success',
-                    api_response=str(result.get('data')),
+                    api_payload=capture_api_response(result),
                     execution_time_ms=result.get('execution_time_ms')
                 )
                 db.session.add(log)
@@ -107,7 +113,7 @@ def execute_post_job(job_id):
                     content_text=tweet_text,
                     result='failed',
                     error_message=error_msg,
-                    api_response=str(result.get('data')),
+                    api_payload=capture_api_response(result),
                     execution_time_ms=result.get('execution_time_ms')
                 )
                 db.session.add(log)
@@ -136,6 +142,7 @@ def execute_post_job(job_id):
         return {'success': False, 'error': str(e)}
 
 
+@traced('post.cycle')
 def run_post_jobs():
     """Run all post jobs that are due.
     
@@ -0,0 +1,209 @@
+"""On-demand sampling profiler for scheduler jobs and single requests."""
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Threads currently running a scheduler job: thread ident -> job name
+_job_threads = {}
+
+# The running scheduler profile, if any
+_active = None
+_active_lock = threading.Lock()
+
+
+def _frame_name(frame):
+    """Describe a frame as ``function (file:line)`` for the collapsed stack."""
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(';', ':')
+
+
+class SamplingProfiler:
+    """Periodically samples the stacks of selected threads.
+    
+    Samples are aggregated as collapsed stacks (``root;outer;inner count``),
+    the input format of flamegraph.pl and speedscope. Sampling only reads
+    ``sys._current_frames()``, so the profiled threads are not slowed down
+    apart from the sampler's own share of the GIL.
+    """
+    
+    def __init__(self, threads, interval=0.01, duration=None):
+        """Initialize the profiler.
+        
+        Args:
+            threads: Callable returning a dict of thread ident to the stack
+                root label to sample
+            interval: Seconds between samples
+            duration: Optional maximum number of seconds to sample
+        """
+        self.threads = threads
+        self.interval = interval
+        self.duration = duration
+        self.samples = Counter()
+        self.sample_count = 0
+        self.started_at = None
+        self.path = None
+        self._lock = threading.Lock()  # Guards samples against concurrent readers
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def sample(self):
+        """Take one sample of every selected thread."""
+        frames = sys._current_frames()
+        stacks = []
+        for ident, root in self.threads().items():
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            stack.append(root)
+            stacks.append(';'.join(reversed(stack)))
+        with self._lock:
+            self.samples.update(stacks)
+            self.sample_count += 1
+    
+    def snapshot(self):
+        """Get a copy of the collapsed stack counts, safe while sampling."""
+        with self._lock:
+            return Counter(self.samples)
+    
+    def _run(self):
+        deadline = time.monotonic() + self.duration if self.duration else None
+        while not self._stop.wait(self.interval):
+            self.sample()
+            if deadline and time.monotonic() >= deadline:
+                break
+    
+    def start(self):
+        """Start sampling in a background thread."""
+        self.started_at = datetime.utcnow()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop sampling and wait for the sampler thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+    
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+    
+    def write(self, directory, label):
+        """Write the collapsed stacks to a new file.
+        
+        Returns:
+            Path of the written file
+        """
+        os.makedirs(directory, exist_ok=True)
+        timestamp = (self.started_at or datetime.utcnow()).strftime('%Y%m%dT%H%M%S%f')
+        self.path = os.path.join(directory, f"{label}-{timestamp}.collapsed")
+        with open(self.path, 'w') as f:
+            for stack, count in self.snapshot().most_common():
+                f.write(f"{stack} {count}\n")
+        return self.path
+    
+    def top_functions(self, limit=10):
+        """Get the functions most often on top of the stack (self time).
+        
+        Returns:
+            List of (function, samples) tuples
+        """
+        leaves = Counter()
+        for stack, count in self.snapshot().items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        return leaves.most_common(limit)
+
+
+@contextmanager
+def job_thread(name):
+    """Mark the current thread as running a scheduler job."""
+    ident = threading.get_ident()
+    _job_threads[ident] = name
+    try:
+        yield
+    finally:
+        _job_threads.pop(ident, None)
+
+
+def start_scheduler_profile(directory, duration, interval=0.01):
+    """Profile all scheduler jobs for a bounded time window.
+    
+    The collapsed stacks are written to ``directory`` when the window ends.
+    
+    Args:
+        directory: Directory for the output file
+        duration: Seconds to profile
+        interval: Seconds between samples
+    
+    Returns:
+        The started SamplingProfiler
+    
+    Raises:
+        RuntimeError: If a scheduler profile is already running
+    """
+    global _active
+    with _active_lock:
+        if _active is not None and _active.running:
+            raise RuntimeError('A profile is already running')
+        profiler = SamplingProfiler(lambda: dict(_job_threads), interval, duration)
+        _active = profiler
+    
+    def finish():
+        profiler._thread.join()
+        path = profiler.write(directory, 'scheduler')
+        logger.info(f"Scheduler profile written to {path} ({profiler.sample_count} samples)")
+    
+    profiler.start()
+    threading.Thread(target=finish, name='sampling-profiler-writer', daemon=True).start()
+    return profiler
+
+
+def stop_scheduler_profile():
+    """Stop the running scheduler profile early (its output is still written)."""
+    with _active_lock:
+        profiler = _active
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+def get_scheduler_profile():
+    """Get the running or last scheduler profile, or None."""
+    return _active
+
+
+@contextmanager
+def profile_current_thread(directory, label, interval=0.005):
+    """Profile the calling thread for the duration of a block.
+    
+    Yields:
+        The SamplingProfiler; its ``path`` is set once the block has exited
+    """
+    ident = threading.get_ident()
+    profiler = SamplingProfiler(lambda: {ident: label}, interval)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        profiler.write(directory, label)
+
+
+def list_profiles(directory):
+    """List the profile files in a directory, newest first."""
+    if not os.path.isdir(directory):
+        return []
+    names = [name for name in os.listdir(directory) if name.endswith('.collapsed')]
+    return sorted(names, key=lambda name: os.path.getmtime(os.path.join(directory, name)), reverse=True)
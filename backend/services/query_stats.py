@@ -0,0 +1,207 @@
+"""Per-request and per-task SQL query accounting."""
+import logging
+import os
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import g, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Root of the application code, used to find the call site of a query
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_current_scope = ContextVar('query_scope', default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a scope issues more queries than its budget allows."""
+
+
+class QueryScope:
+    """Queries issued by one request or task."""
+    __slots__ = ('name', 'count', 'total_ms', 'budget')
+    
+    def __init__(self, name, budget=0):
+        self.name = name
+        self.count = 0
+        self.total_ms = 0.0
+        self.budget = budget
+
+
+class QueryStats:
+    """Aggregated query counts and DB time per scope name."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+    
+    def record(self, scope):
+        """Add a finished scope to the aggregates."""
+        with self._lock:
+            stats = self._stats.get(scope.name)
+            if stats is None:
+                stats = self._stats[scope.name] = {
+                    'calls': 0, 'queries': 0, 'max_queries': 0, 'db_time_ms': 0.0, 'max_db_time_ms': 0.0
+                }
+            stats['calls'] += 1
+            stats['queries'] += scope.count
+            stats['max_queries'] = max(stats['max_queries'], scope.count)
+            stats['db_time_ms'] += scope.total_ms
+            stats['max_db_time_ms'] = max(stats['max_db_time_ms'], scope.total_ms)
+    
+    def snapshot(self):
+        """Get the aggregates, most queries per call first.
+        
+        Returns:
+            List of dicts with name, calls, queries, avg_queries, max_queries,
+            db_time_ms, avg_db_time_ms and max_db_time_ms
+        """
+        with self._lock:
+            items = [(name, dict(stats)) for name, stats in self._stats.items()]
+        result = []
+        for name, stats in items:
+            stats['name'] = name
+            stats['avg_queries'] = round(stats['queries'] / stats['calls'], 2)
+            stats['avg_db_time_ms'] = round(stats['db_time_ms'] / stats['calls'], 3)
+            stats['db_time_ms'] = round(stats['db_time_ms'], 3)
+            stats['max_db_time_ms'] = round(stats['max_db_time_ms'], 3)
+            result.append(stats)
+        return sorted(result, key=lambda s: s['avg_queries'], reverse=True)
+    
+    def reset(self):
+        """Clear all aggregates."""
+        with self._lock:
+            self._stats.clear()
+
+
+# Process-wide aggregates
+query_stats = QueryStats()
+
+# Settings, set by init_query_stats
+_settings = {'slow_ms': 200, 'mode': 'off', 'budgets': {}, 'default_budget': 0}
+
+
+def _call_site():
+    """Get the innermost application frame outside of this module."""
+    for frame in reversed(traceback.extract_stack()):
+        filename = os.path.abspath(frame.filename)
+        if filename.startswith(_APP_ROOT) and filename != os.path.abspath(__file__):
+            return f"{os.path.relpath(filename, _APP_ROOT)}:{frame.lineno} in {frame.name}"
+    return 'unknown'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+    
+    scope = _current_scope.get()
+    if scope is None:
+        return
+    scope.count += 1
+    if scope.budget and scope.count > scope.budget and _settings['mode'] == 'raise':
+        conn.info['query_start'].pop()
+        raise QueryBudgetExceeded(
+            f"{scope.name} exceeded its budget of {scope.budget} queries at {_call_site()}: {statement}"
+        )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info['query_start'].pop()) * 1000
+    
+    scope = _current_scope.get()
+    if scope is not None:
+        scope.total_ms += elapsed_ms
+    
+    if elapsed_ms >= _settings['slow_ms']:
+        logger.warning(
+            f"Slow query ({elapsed_ms:.1f} ms) at {_call_site()}"
+            f"{f' [{scope.name}]' if scope else ''}: {' '.join(statement.split())[:500]}"
+        )
+
+
+def _handle_error(context):
+    # The statement failed, so after_cursor_execute will not run for it
+    starts = context.connection.info.get('query_start') if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def budget_for(name):
+    """Get the query budget of a scope name (0 = unlimited)."""
+    if _settings['mode'] == 'off':
+        return 0
+    return _settings['budgets'].get(name, _settings['default_budget'])
+
+
+@contextmanager
+def query_scope(name, budget=None):
+    """Count the queries issued inside a block under a scope name.
+    
+    Scopes do not nest: an inner scope counts its own queries only.
+    
+    Args:
+        name: Aggregate name, e.g. ``GET /api/logs`` or ``job:run_monitor_check``
+        budget: Maximum number of queries; defaults to the configured budget
+    
+    Yields:
+        The QueryScope
+    """
+    scope = QueryScope(name, budget_for(name) if budget is None else budget)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+        _finish_scope(scope)
+
+
+def _finish_scope(scope):
+    """Record a scope and report a budget overrun in warn mode."""
+    query_stats.record(scope)
+    if scope.budget and scope.count > scope.budget and _settings['mode'] == 'warn':
+        logger.warning(f"{scope.name} issued {scope.count} queries (budget {scope.budget})")
+
+
+def init_query_stats(app, db):
+    """Attach query accounting to the app's engine and requests.
+    
+    Args:
+        app: Flask application instance
+        db: Flask-SQLAlchemy extension bound to the app
+    """
+    _settings.update({
+        'slow_ms': app.config['SLOW_QUERY_THRESHOLD_MS'],
+        'mode': app.config['QUERY_BUDGET_MODE'],
+        'budgets': dict(app.config['QUERY_BUDGETS']),
+        'default_budget': app.config['QUERY_BUDGET_DEFAULT'],
+    })
+    
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+    
+    @app.before_request
+    def start_request_scope():
+        if request.url_rule is None:
+            return
+        name = f"{request.method} {request.url_rule.rule}"
+        scope = QueryScope(name, budget_for(name))
+        g.query_scope = (scope, _current_scope.set(scope))
+    
+    @app.teardown_request
+    def finish_request_scope(exc):
+        entry = g.pop('query_scope', None)
+        if entry is None:
+            return
+        scope, token = entry
+        try:
+            _current_scope.reset(token)
+        except ValueError:
+            # Streaming responses finish in another context
+            _current_scope.set(None)
+        _finish_scope(scope)
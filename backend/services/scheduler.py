@@ -1,7 +1,14 @@
 """Scheduler service for periodic tasks."""
+from apscheduler.events import EVENT_JOB_SUBMITTED
+from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 import logging
+import time
+from datetime import datetime, timezone
+from services.metrics import SCHEDULER_JOB_LAG_SECONDS, SCHEDULER_JOB_SECONDS
+from services.profiler import job_thread
+from services.query_stats import query_scope
 
 logger = logging.getLogger(__name__)
 
@@ -18,17 +25,24 @@ def init_scheduler(app):
     def run_with_context(func):
         """Wrapper to run scheduled functions with app context."""
         def wrapper():
-            with app.app_context():
+            start = time.perf_counter()
+            with job_thread(func.__name__), app.app_context(), query_scope(f'job:{func.__name__}'):
                 try:
                     result = func()
                     logger.info(f"Scheduled task {func.__name__} completed: {result}")
                 except Exception as e:
                     logger.error(f"Scheduled task {func.__name__} failed: {e}")
+            SCHEDULER_JOB_SECONDS.observe(time.perf_counter() - start, job=func.__name__)
         return wrapper
     
     # Import services
     from services.monitor_service import run_monitor_check
     from services.post_service import run_post_jobs
+    from services.log_retention import run_retention
+    from services.dedup_index import init_dedup_index, save_dedup_snapshot
+    
+    # Load the replied tweet index before the first monitor check
+    init_dedup_index(app)
     
     # Add monitor check job (runs every minute to check if any targets are due)
     scheduler.add_job(
@@ -48,17 +62,50 @@ def init_scheduler(app):
         replace_existing=True
     )
     
+    # Archive and delete logs past their retention period
+    scheduler.add_job(
+        run_with_context(run_retention),
+        trigger=IntervalTrigger(minutes=app.config['LOG_RETENTION_INTERVAL_MINUTES']),
+        id='log_retention',
+        name='Log Retention',
+        replace_existing=True
+    )
+    
+    # Persist the replied tweet index
+    scheduler.add_job(
+        run_with_context(save_dedup_snapshot),
+        trigger=IntervalTrigger(minutes=app.config['DEDUP_SNAPSHOT_INTERVAL_MINUTES']),
+        id='dedup_snapshot',
+        name='Dedup Snapshot',
+        replace_existing=True
+    )
+    
     # Start the scheduler
     if not scheduler.running:
+        scheduler.add_listener(_record_job_lag, EVENT_JOB_SUBMITTED)
+        # Size the worker pool to match the connections reserved for it
+        scheduler.configure(executors={
+            'default': ThreadPoolExecutor(app.config['SCHEDULER_MAX_WORKERS'])
+        })
         scheduler.start()
         logger.info("Scheduler started")
 
 
+def _record_job_lag(event):
+    """Record how late a submitted job run is compared to its schedule."""
+    if event.scheduled_run_times:
+        lag = datetime.now(timezone.utc) - max(event.scheduled_run_times)
+        SCHEDULER_JOB_LAG_SECONDS.observe(max(lag.total_seconds(), 0), job=event.job_id)
+
+
 def shutdown_scheduler():
     """Shutdown the scheduler."""
     if scheduler.running:
         scheduler.shutdown()
         logger.info("Scheduler shutdown")
+        
+        from services.dedup_index import save_dedup_snapshot
+        save_dedup_snapshot()
 
 
 def get_scheduled_jobs():
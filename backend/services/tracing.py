@@ -0,0 +1,230 @@
+"""Lightweight in-process tracing of scheduler work."""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+logger = logging.getLogger(__name__)
+
+_current_span = ContextVar('current_span', default=None)
+
+
+class Span:
+    """One timed phase of a trace."""
+    __slots__ = ('trace_id', 'span_id', 'parent', 'name', 'attributes', 'start_ns',
+                 'end_ns', 'status', 'children')
+    
+    def __init__(self, name, parent=None, attributes=None):
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent = parent
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.status = 'ok'
+        self.children = []
+    
+    @property
+    def duration_ms(self):
+        """Duration in milliseconds (up to now while the span is open)."""
+        end_ns = self.end_ns or time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+    
+    def to_dict(self):
+        """Convert to a nested dictionary for the debug endpoint."""
+        return {
+            'span_id': self.span_id,
+            'name': self.name,
+            'start': self.start_ns / 1e9,
+            'duration_ms': round(self.duration_ms, 3),
+            'status': self.status,
+            'attributes': self.attributes,
+            'children': [child.to_dict() for child in self.children]
+        }
+    
+    def walk(self):
+        """Yield this span and all its descendants."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+class TraceBuffer:
+    """Ring buffer of the most recent finished traces (root spans)."""
+    
+    def __init__(self, size=200):
+        self._traces = deque(maxlen=size)
+        self._lock = threading.Lock()
+    
+    def resize(self, size):
+        """Change the number of traces kept."""
+        with self._lock:
+            self._traces = deque(self._traces, maxlen=size)
+    
+    def clear(self):
+        """Drop all traces."""
+        with self._lock:
+            self._traces.clear()
+    
+    def add(self, root):
+        """Add a finished trace."""
+        with self._lock:
+            self._traces.append(root)
+    
+    def list(self, name=None, slowest=False, limit=50):
+        """Get recent traces, newest (or slowest) first.
+        
+        Args:
+            name: Only traces whose root span has this name
+            slowest: Order by duration instead of recency
+            limit: Maximum number of traces
+        """
+        with self._lock:
+            traces = list(self._traces)
+        if name:
+            traces = [t for t in traces if t.name == name]
+        if slowest:
+            traces.sort(key=lambda t: t.duration_ms, reverse=True)
+        else:
+            traces.reverse()
+        return traces[:limit]
+    
+    def get(self, trace_id):
+        """Get a trace by ID, or None."""
+        with self._lock:
+            for root in self._traces:
+                if root.trace_id == trace_id:
+                    return root
+        return None
+
+
+class OTLPFileExporter:
+    """Append finished traces to a file as OTLP/JSON lines.
+    
+    Each line is an ``ExportTraceServiceRequest`` that OpenTelemetry
+    collectors can read with the ``otlpjsonfile`` receiver.
+    """
+    
+    def __init__(self, path, service_name='twitter-monitor'):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+    
+    def export(self, root):
+        """Write one trace."""
+        spans = [self._span(span) for span in root.walk()]
+        request = {'resourceSpans': [{
+            'resource': {'attributes': [_otlp_attribute('service.name', self.service_name)]},
+            'scopeSpans': [{'scope': {'name': __name__}, 'spans': spans}]
+        }]}
+        line = json.dumps(request, separators=(',', ':')) + '\n'
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line)
+    
+    @staticmethod
+    def _span(span):
+        data = {
+            'traceId': span.trace_id,
+            'spanId': span.span_id,
+            'name': span.name,
+            'kind': 1,  # SPAN_KIND_INTERNAL
+            'startTimeUnixNano': str(span.start_ns),
+            'endTimeUnixNano': str(span.end_ns),
+            'attributes': [_otlp_attribute(k, v) for k, v in span.attributes.items()],
+            'status': {'code': 2 if span.status == 'error' else 1}
+        }
+        if span.parent:
+            data['parentSpanId'] = span.parent.span_id
+        return data
+
+
+def _otlp_attribute(key, value):
+    """Convert an attribute into an OTLP key/value."""
+    if isinstance(value, bool):
+        return {'key': key, 'value': {'boolValue': value}}
+    if isinstance(value, int):
+        return {'key': key, 'value': {'intValue': str(value)}}
+    if isinstance(value, float):
+        return {'key': key, 'value': {'doubleValue': value}}
+    return {'key': key, 'value': {'stringValue': str(value)}}
+
+
+# Process-wide trace buffer and optional exporter
+trace_buffer = TraceBuffer()
+_exporter = None
+
+
+def init_tracing(app):
+    """Configure the trace buffer and exporter from the app config.
+    
+    Args:
+        app: Flask application instance
+    """
+    global _exporter
+    trace_buffer.resize(app.config['TRACE_BUFFER_SIZE'])
+    path = app.config.get('TRACE_EXPORT_PATH')
+    _exporter = OTLPFileExporter(path) if path else None
+
+
+@contextmanager
+def span(name, **attributes):
+    """Time a block as a span, nested under the current span if any.
+    
+    A span opened outside of any other span starts a new trace, which is
+    recorded in the trace buffer when the span ends.
+    
+    Args:
+        name: Span name, e.g. ``monitor.check_target``
+        **attributes: Initial span attributes
+    """
+    parent = _current_span.get()
+    current = Span(name, parent, attributes)
+    if parent:
+        parent.children.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = 'error'
+        current.attributes['error'] = str(e)
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+        if parent is None:
+            _finish_trace(current)
+
+
+def traced(name):
+    """Decorator running a function inside a span."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def set_attribute(key, value):
+    """Set an attribute on the current span (no-op outside of a span)."""
+    current = _current_span.get()
+    if current is not None:
+        current.attributes[key] = value
+
+
+def _finish_trace(root):
+    """Record a finished trace."""
+    trace_buffer.add(root)
+    if _exporter is not None:
+        try:
+            _exporter.export(root)
+        except OSError as e:
+            logger.warning(f"Failed to export trace {root.trace_id}: {e}")
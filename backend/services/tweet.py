@@ -0,0 +1,92 @@
+"""Compact tweet records parsed from API responses."""
+from datetime import datetime, timezone
+
+# Timestamp format of the provider's createdAt field
+CREATED_AT_FORMAT = '%a %b %d %H:%M:%S %z %Y'
+
+
+class Tweet:
+    """A tweet as used by the monitor pipeline.
+    
+    Only the fields the monitor, dedup and logging stages use are kept, in
+    ``__slots__``. The ID is an integer, so tweets and watermarks compare
+    numerically.
+    """
+    __slots__ = ('id', 'author_id', 'author_username', 'created_at')
+    
+    def __init__(self, id, author_id=None, author_username=None, created_at=None):
+        self.id = id
+        self.author_id = author_id
+        self.author_username = author_username
+        self.created_at = created_at
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Build a tweet from a provider tweet object.
+        
+        Returns:
+            Tweet, or None if the object has no numeric ID
+        """
+        if not isinstance(data, dict):
+            return None
+        try:
+            tweet_id = int(data.get('id') or data.get('id_str') or data.get('tweetId'))
+        except (TypeError, ValueError):
+            return None
+        
+        author = data.get('author') or data.get('user')
+        if not isinstance(author, dict):
+            author = {}
+        author_id = author.get('id') or author.get('id_str') or data.get('author_id')
+        username = author.get('userName') or author.get('username') or author.get('screen_name')
+        return cls(
+            tweet_id,
+            str(author_id) if author_id else None,
+            username,
+            parse_created_at(data.get('createdAt') or data.get('created_at'))
+        )
+    
+    def __repr__(self):
+        return f"<Tweet {self.id}>"
+
+
+def parse_created_at(value):
+    """Parse a tweet timestamp into a naive UTC datetime.
+    
+    Accepts the provider's ``Tue Dec 10 07:00:30 +0000 2024`` format and ISO
+    8601 strings.
+    
+    Returns:
+        datetime, or None if the value is missing or not understood
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.strptime(value, CREATED_AT_FORMAT)
+    except ValueError:
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_tweets(items):
+    """Parse a list of provider tweet objects, skipping malformed entries.
+    
+    Args:
+        items: Value of the response's tweets field
+    
+    Returns:
+        List of Tweet
+    """
+    if not isinstance(items, list):
+        return []
+    tweets = []
+    for item in items:
+        tweet = Tweet.from_dict(item)
+        if tweet is not None:
+            tweets.append(tweet)
+    return tweets
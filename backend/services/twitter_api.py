@@ -2,8 +2,104 @@
 import requests
 import time
 import random
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from flask import current_app
 from models.system_setting import SystemSetting
+from services.json_codec import loads
+from services.metrics import API_DELAY_SECONDS, API_REQUEST_SECONDS
+from services.tracing import span
+from services.tweet import parse_tweets
+
+
+class RequestCoalescer:
+    """Single-flight execution of identical calls, with a short TTL cache.
+    
+    Concurrent calls with the same key share one execution of the function
+    and its result. Successful results are also kept for ``ttl`` seconds so
+    bursts of repeated reads are answered without another call. A caller
+    that waited ``timeout`` seconds for a shared execution runs the function
+    itself, so a hung call cannot block every caller behind it.
+    """
+    
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> (Event, result holder)
+        self._cache = OrderedDict()  # key -> (expires_at, result), oldest first
+    
+    def do(self, key, func, ttl=0, timeout=None):
+        """Run func once for all concurrent callers with the same key.
+        
+        Args:
+            key: Hashable identity of the call
+            func: Callable returning a result dict
+            ttl: Seconds to cache a successful result (0 disables caching)
+            timeout: Seconds to wait for another caller's execution before
+                running func directly (None waits indefinitely)
+        
+        Returns:
+            Copy of the result dict
+        """
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] > time.monotonic():
+                return dict(cached[1])
+            
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = (threading.Event(), {})
+                self._inflight[key] = flight
+        
+        event, holder = flight
+        if not leader:
+            if event.wait(timeout):
+                return dict(holder['result'])
+            return self._call(func)
+        
+        result = {'success': False, 'error': 'Shared request was interrupted'}
+        try:
+            result = self._call(func)
+        finally:
+            # Even when interrupted (e.g. by SystemExit), release the waiting
+            # callers and let the next call start a new execution
+            with self._lock:
+                holder['result'] = result
+                del self._inflight[key]
+                if ttl and result.get('success'):
+                    self._store(key, result, ttl)
+            event.set()
+        return dict(result)
+    
+    @staticmethod
+    def _call(func):
+        """Run func, turning an exception into a failed result."""
+        try:
+            return func()
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+    
+    def _store(self, key, result, ttl):
+        """Cache a result, evicting expired and then oldest entries."""
+        now = time.monotonic()
+        self._cache.pop(key, None)
+        self._cache[key] = (now + ttl, result)
+        while self._cache:
+            oldest_key, (expires_at, _) = next(iter(self._cache.items()))
+            if expires_at > now and len(self._cache) <= self.max_entries:
+                break
+            del self._cache[oldest_key]
+    
+    def clear(self):
+        """Drop all cached results."""
+        with self._lock:
+            self._cache.clear()
+
+
+# Shared by all clients, so identical reads from concurrent checks coalesce
+_get_coalescer = RequestCoalescer()
 
 
 class TwitterAPIClient:
@@ -37,6 +133,11 @@ class TwitterAPIClient:
                 self._api_key = current_app.config.get('TWITTER_API_KEY', '')
         return self._api_key
     
+    @property
+    def request_timeout(self):
+        """Get the HTTP request timeout in seconds."""
+        return current_app.config.get('TWITTER_API_TIMEOUT_SECONDS', 30)
+    
     def _get_headers(self):
         """Build request headers."""
         headers = {
@@ -54,8 +155,8 @@ class TwitterAPIClient:
         
         return headers
     
-    def _apply_random_delay(self):
-        """Apply random delay before API call."""
+    def _random_delay_range(self):
+        """Get the (min, max) random delay before API calls in seconds."""
         min_delay = current_app.config.get('MIN_RANDOM_DELAY', 3)
         max_delay = current_app.config.get('MAX_RANDOM_DELAY', 20)
         
@@ -70,14 +171,56 @@ class TwitterAPIClient:
         except Exception:
             pass
         
-        delay = random.uniform(min_delay, max_delay)
+        return min_delay, max_delay
+    
+    def _apply_random_delay(self):
+        """Apply random delay before API call."""
+        delay = random.uniform(*self._random_delay_range())
+        API_DELAY_SECONDS.observe(delay)
         time.sleep(delay)
     
     def _make_request(self, method, endpoint, data=None, params=None, apply_delay=True):
-        """Make HTTP request to the API."""
-        if apply_delay:
-            self._apply_random_delay()
+        """Make HTTP request to the API.
         
+        Identical concurrent GETs (same URL, parameters and credentials) are
+        coalesced into one upstream call, and successful GET results are
+        reused for ``TWITTER_API_GET_CACHE_TTL_SECONDS``.
+        """
+        if method == 'GET':
+            key = (
+                self.base_url, endpoint, tuple(sorted((params or {}).items())),
+                self.api_key, self.auth_token
+            )
+            ttl = current_app.config.get('TWITTER_API_GET_CACHE_TTL_SECONDS', 0)
+            # The shared call includes the leader's random delay
+            timeout = self.request_timeout
+            if apply_delay:
+                timeout += max(self._random_delay_range())
+            return _get_coalescer.do(
+                key, lambda: self._send_request(method, endpoint, data, params, apply_delay), ttl,
+                timeout=timeout
+            )
+        return self._send_request(method, endpoint, data, params, apply_delay)
+    
+    def _send_request(self, method, endpoint, data=None, params=None, apply_delay=True):
+        """Send one HTTP request to the API."""
+        with span('twitter_api.request', method=method, endpoint=endpoint) as request_span:
+            if apply_delay:
+                with span('twitter_api.delay'):
+                    self._apply_random_delay()
+            
+            start_time = time.perf_counter()
+            with span('twitter_api.http'):
+                result = self._http_request(method, endpoint, data, params)
+            status = result.get('status_code', 'error')
+            request_span.attributes['status'] = status
+            API_REQUEST_SECONDS.observe(
+                time.perf_counter() - start_time, method=method, endpoint=endpoint, status=status
+            )
+            return result
+    
+    def _http_request(self, method, endpoint, data=None, params=None):
+        """Perform an HTTP request and convert the response into a result dict."""
         url = f"{self.base_url}{endpoint}"
         headers = self._get_headers()
         
@@ -85,9 +228,9 @@ class TwitterAPIClient:
         
         try:
             if method == 'GET':
-                response = requests.get(url, headers=headers, params=params, timeout=30)
+                response = requests.get(url, headers=headers, params=params, timeout=self.request_timeout)
             elif method == 'POST':
-                response = requests.post(url, headers=headers, json=data, timeout=30)
+                response = requests.post(url, headers=headers, json=data, timeout=self.request_timeout)
             else:
                 raise ValueError(f"Unsupported HTTP method: {method}")
             
@@ -96,7 +239,7 @@ class TwitterAPIClient:
             return {
                 'success': response.status_code < 400,
                 'status_code': response.status_code,
-                'data': response.json() if response.text else None,
+                'data': loads(response.content) if response.content else None,
                 'execution_time_ms': execution_time
             }
         except requests.exceptions.Timeout:
@@ -124,9 +267,9 @@ class TwitterAPIClient:
         Args:
             user_id: Twitter user ID
             count: Number of tweets to fetch
-            
+        
         Returns:
-            dict with success status and tweets data
+            dict with success status and tweets (list of Tweet)
         """
         endpoint = f"/twitter/user/last_tweets"
         params = {
@@ -138,7 +281,7 @@ class TwitterAPIClient:
         
         if result.get('success') and result.get('data'):
             # Extract tweets from response
-            tweets = result['data'].get('tweets', []) if isinstance(result['data'], dict) else []
+            tweets = parse_tweets(result['data'].get('tweets')) if isinstance(result['data'], dict) else []
             return {
                 'success': True,
                 'tweets': tweets,
@@ -147,13 +290,105 @@ class TwitterAPIClient:
         
         return result
     
+    def get_users_tweets(self, users, batch_size=None):
+        """Get recent tweets of many users with as few calls as possible.
+        
+        Users are grouped into "from:a OR from:b" searches on the provider's
+        batch search endpoint, and the results are split back per user. A
+        batch search only covers tweets since the last check of its users, so
+        it is only used for users with a username and a previous check; those
+        users, every group whose search fails or does not fit in
+        ``TWITTER_API_BATCH_MAX_PAGES`` pages, and users the search found no
+        tweets of (quiet, or renamed so ``from:`` no longer matches) fall back
+        to get_user_tweets, which looks the user up by ID.
+        
+        Args:
+            users: List of dicts with user_id, username, count and since
+                (datetime of the last check, or None)
+            batch_size: Users per search; defaults to the timeline_batch_size
+                setting, 0 disables batching
+        
+        Returns:
+            dict of user_id to a get_user_tweets style result
+        """
+        if batch_size is None:
+            setting = SystemSetting.query.filter_by(key='timeline_batch_size').first()
+            batch_size = setting.get_typed_value() if setting else 0
+        endpoint = current_app.config.get('TWITTER_API_BATCH_SEARCH_ENDPOINT')
+        
+        results = {}
+        batchable = []
+        for user in users:
+            if batch_size and endpoint and user.get('username') and user.get('since'):
+                batchable.append(user)
+            else:
+                results[user['user_id']] = None
+        
+        for i in range(0, len(batchable), batch_size or 1):
+            group = batchable[i:i + batch_size]
+            results.update(self._search_users_tweets(endpoint, group))
+        
+        # Per-user fallback
+        for user in users:
+            if results.get(user['user_id']) is None:
+                results[user['user_id']] = self.get_user_tweets(user['user_id'], user.get('count', 10))
+        return results
+    
+    def _search_users_tweets(self, endpoint, users):
+        """Fetch the tweets of a group of users with one search.
+        
+        Returns:
+            dict of user_id to result, or to None for users to fetch one by one
+            (including those without tweets in the search)
+        """
+        slack = current_app.config.get('TWITTER_API_BATCH_SINCE_SLACK_SECONDS', 300)
+        max_pages = current_app.config.get('TWITTER_API_BATCH_MAX_PAGES', 5)
+        since = min(user['since'] for user in users) - timedelta(seconds=slack)
+        since_ts = int((since - datetime(1970, 1, 1)).total_seconds())
+        query = ' OR '.join(f"from:{user['username'].lstrip('@')}" for user in users)
+        params = {'query': f"({query}) since_time:{since_ts}", 'queryType': 'Latest'}
+        
+        tweets = []
+        execution_time = 0
+        for _ in range(max_pages):
+            result = self._make_request('GET', endpoint, params=params)
+            execution_time += result.get('execution_time_ms') or 0
+            data = result.get('data')
+            if not result.get('success') or not isinstance(data, dict):
+                return {user['user_id']: None for user in users}
+            
+            tweets.extend(parse_tweets(data.get('tweets')))
+            if not data.get('has_next_page') or not data.get('next_cursor'):
+                break
+            params['cursor'] = data['next_cursor']
+        else:
+            # Window did not fit in the page budget: results may be partial
+            return {user['user_id']: None for user in users}
+        
+        by_id = {str(user['user_id']): user for user in users}
+        by_name = {user['username'].lstrip('@').lower(): user for user in users}
+        per_user = {user['user_id']: [] for user in users}
+        for tweet in tweets:
+            user = by_id.get(tweet.author_id) or by_name.get((tweet.author_username or '').lower())
+            if user:
+                per_user[user['user_id']].append(tweet)
+        
+        return {
+            user['user_id']: {
+                'success': True,
+                'tweets': per_user[user['user_id']][:user.get('count', 10)],
+                'execution_time_ms': execution_time
+            } if per_user[user['user_id']] else None
+            for user in users
+        }
+    
     def reply_to_tweet(self, tweet_id, text):
         """Reply to a tweet.
         
         Args:
             tweet_id: ID of the tweet to reply to
             text: Reply text content
-            
+        
         Returns:
             dict with success status and reply data
         """
@@ -186,7 +421,7 @@ class TwitterAPIClient:
         
         Args:
             text: Tweet content
-            
+        
         Returns:
             dict with success status and tweet data
         """
@@ -0,0 +1,65 @@
+"""Unit of work for grouping database writes into fewer transactions."""
+from app import db
+from services.tracing import span
+
+
+class UnitOfWork:
+    """Group the writes of a monitor check into as few commits as possible.
+    
+    All writes go through the regular ``db.session``; the unit of work only
+    decides when to commit. Everything written between two commits is applied
+    atomically, so a crash midway never leaves the watermark, the
+    ``RepliedTweet`` rows and the account/template counters out of step with
+    each other - the uncommitted batch is simply rolled back.
+    
+    Durable steps (a reply that was posted) commit at once: rolling back their
+    ``RepliedTweet`` row would make the reply be sent again. Only the other
+    steps are batched.
+    """
+    
+    def __init__(self, batch_size=0):
+        """Initialize the unit of work.
+        
+        Args:
+            batch_size: Number of steps after which the pending writes are
+                committed. 0 commits only when the unit of work ends (or
+                at a durable step).
+        """
+        self.batch_size = batch_size
+        self.pending_steps = 0
+    
+    def add(self, obj):
+        """Add an object to the current transaction."""
+        db.session.add(obj)
+    
+    def step(self, durable=False):
+        """Mark one unit of work as done, committing if the batch is full.
+        
+        Args:
+            durable: Commit now, e.g. after a side effect that must never be
+                repeated
+        """
+        self.pending_steps += 1
+        if durable or (self.batch_size and self.pending_steps >= self.batch_size):
+            self.commit()
+    
+    def commit(self):
+        """Commit all pending writes."""
+        with span('db.commit', steps=self.pending_steps):
+            db.session.commit()
+        self.pending_steps = 0
+    
+    def rollback(self):
+        """Discard all pending writes."""
+        db.session.rollback()
+        self.pending_steps = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
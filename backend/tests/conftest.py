@@ -0,0 +1,48 @@
+"""Shared fixtures: one app on a temporary SQLite file, emptied after each test."""
+import os
+import tempfile
+
+import pytest
+
+# The config reads DATABASE_URL when it is imported, so set it first
+_fd, DB_PATH = tempfile.mkstemp(suffix='.db')
+os.close(_fd)
+os.environ['DATABASE_URL'] = f'sqlite:///{DB_PATH}'
+# Requests over their QUERY_BUDGETS entry raise QueryBudgetExceeded
+os.environ.setdefault('QUERY_BUDGET_MODE', 'raise')
+
+from app import create_app, db  # noqa: E402
+from services.http_cache import payload_cache  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app()
+    app.config.update(
+        TESTING=True,
+        MIN_RANDOM_DELAY=0,
+        MAX_RANDOM_DELAY=0,
+        TWITTER_API_GET_CACHE_TTL_SECONDS=0,
+    )
+    yield app
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(DB_PATH + suffix):
+            os.remove(DB_PATH + suffix)
+
+
+@pytest.fixture(autouse=True)
+def app_context(app):
+    """Run each test in an app context and delete all rows afterwards."""
+    with app.app_context():
+        yield
+        db.session.rollback()
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+        db.session.remove()
+        payload_cache.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,52 @@
+"""Collection versions behind the list ETags."""
+from app import db
+from models import Account, CollectionVersion, MonitorTarget
+
+
+def test_scheduler_bookkeeping_bumps_the_version():
+    account = Account(name='a')
+    account.set_token('token')
+    target = MonitorTarget(target_user_id='42')
+    db.session.add_all([account, target])
+    db.session.commit()
+    versions = (CollectionVersion.current('accounts'), CollectionVersion.current('targets'))
+    
+    account.acquire()
+    account.record_success()
+    target.update_after_check(True, tweets_found=2)
+    target.last_seen_tweet_id = '101'
+    db.session.commit()
+    
+    assert CollectionVersion.current('accounts') > versions[0]
+    assert CollectionVersion.current('targets') > versions[1]
+
+
+def test_failed_check_changes_the_etag(client):
+    target = MonitorTarget(target_user_id='42')
+    db.session.add(target)
+    db.session.commit()
+    etag = client.get('/api/targets').headers['ETag']
+    
+    target.update_after_check(False, 'boom')
+    db.session.commit()
+    
+    response = client.get('/api/targets', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.get_json()['data'][0]['last_check_error'] == 'boom'
+
+
+def test_edit_bumps_the_version(client):
+    account = Account(name='a')
+    account.set_token('token')
+    db.session.add(account)
+    db.session.commit()
+    etag = client.get('/api/accounts').headers['ETag']
+    
+    account.last_used_at = None
+    account.name = 'b'
+    db.session.commit()
+    
+    response = client.get('/api/accounts', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['data'][0]['name'] == 'b'
@@ -0,0 +1,66 @@
+"""Shared list arguments of the collection routes."""
+import pytest
+
+from app import db
+from models import Account, ReplyTemplate
+
+
+@pytest.fixture
+def accounts():
+    for i in range(5):
+        account = Account(name=f'account-{i}')
+        account.set_token(f'token-{i}')
+        db.session.add(account)
+    db.session.commit()
+    # Rows written before the columns had defaults
+    db.session.execute(Account.__table__.update().where(Account.id % 2 == 0).values(created_at=None))
+    db.session.commit()
+
+
+def walk(client, url):
+    """Follow next_cursor through all pages; returns the names and page count."""
+    names, pages, cursor = [], 0, ''
+    while cursor is not None:
+        body = client.get(f'{url}&cursor={cursor}').get_json()
+        names += [row['name'] for row in body['data']]
+        cursor = body['pagination']['next_cursor']
+        pages += 1
+    return names, pages
+
+
+def test_per_page_alone_returns_the_first_page(client, accounts):
+    body = client.get('/api/accounts?per_page=2').get_json()
+    
+    assert len(body['data']) == 2
+    assert body['pagination']['has_next'] is True
+
+
+@pytest.mark.parametrize('per_page', [0, -1])
+def test_per_page_below_one_returns_one_row(client, accounts, per_page):
+    response = client.get(f'/api/accounts?per_page={per_page}')
+    
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body['data']) == 1
+    assert body['pagination']['per_page'] == 1
+    names, pages = walk(client, f'/api/accounts?per_page={per_page}')
+    assert pages == 5
+
+
+@pytest.mark.parametrize('sort', ['-created_at', 'created_at', 'updated_at', 'name'])
+def test_pages_cover_rows_with_null_sort_values(client, accounts, sort):
+    names, pages = walk(client, f'/api/accounts?per_page=2&sort={sort}')
+    
+    assert sorted(names) == [f'account-{i}' for i in range(5)]
+    assert pages == 3
+    assert names == [row['name'] for row in client.get(f'/api/accounts?sort={sort}').get_json()['data']]
+
+
+def test_null_sort_order_pages(client):
+    # NULL sorts as 0, ties broken by id
+    db.session.add_all([ReplyTemplate(content=f'reply {i}', sort_order=None if i % 2 else i) for i in range(5)])
+    db.session.commit()
+    
+    body = client.get('/api/reply-templates?per_page=10&fields=content').get_json()
+    
+    assert [row['content'] for row in body['data']] == ['reply 0', 'reply 1', 'reply 3', 'reply 2', 'reply 4']
@@ -0,0 +1,48 @@
+"""Log retention policies."""
+import pytest
+
+from app import db
+from models import SystemSetting
+from services.log_retention import RetentionPolicyError, get_retention_policies
+
+
+def set_policies(value):
+    db.session.add(SystemSetting(key='log_retention_policies', value=value, value_type='json'))
+    db.session.commit()
+
+
+def test_policies_are_normalized():
+    set_policies('[{"log_type": "monitor", "days": "7"}, {"days": 90}]')
+    
+    assert get_retention_policies() == [{'log_type': 'monitor', 'days': 7}, {'days': 90}]
+
+
+@pytest.mark.parametrize('value, error', [
+    ('[{"log_type": "monitor"}]', "log_retention_policies[0] is missing 'days'"),
+    ('[{"days": 7}, {"days": "a week"}]', "log_retention_policies[1]: 'days' must be a non-negative integer"),
+    ('{"days": 7}', "must be a list"),
+])
+def test_malformed_policy_is_reported(value, error):
+    set_policies(value)
+    
+    with pytest.raises(RetentionPolicyError, match=error.replace('[', r'\[').replace(']', r'\]')):
+        get_retention_policies()
+
+
+def test_malformed_policy_is_rejected_by_the_settings_route(client):
+    set_policies('[]')
+    
+    response = client.put('/api/settings/log_retention_policies', json={'value': [{'log_type': 'monitor'}]})
+    
+    assert response.status_code == 400
+    assert "missing 'days'" in response.get_json()['error']
+    assert get_retention_policies() == []
+
+
+def test_malformed_policy_fails_the_retention_command(app):
+    set_policies('[{"result": "success"}]')
+    
+    result = app.test_cli_runner().invoke(args=['apply-retention', '--dry-run'])
+    
+    assert result.exit_code == 1
+    assert "Error: log_retention_policies[0] is missing 'days'" in result.output
@@ -0,0 +1,77 @@
+"""Execution log routes."""
+import pytest
+from sqlalchemy import event
+
+from app import db
+from models import Account, ExecutionLog, MonitorTarget, PostJob
+from routes.logs import list_logs
+from services import json_codec
+from services.payload_store import store_payload
+from services.query_stats import query_scope
+
+
+@pytest.fixture
+def logs():
+    """Create 30 logs, each with its own account, target, job and payload."""
+    for i in range(30):
+        account = Account(name=f'account-{i}')
+        account.set_token(f'token-{i}')
+        db.session.add(ExecutionLog(
+            log_type='reply', result='success', account=account,
+            target=MonitorTarget(target_user_id=str(i), target_username=f'user{i}'),
+            job=PostJob(name=f'job-{i}'), api_payload=store_payload({'id': i})
+        ))
+    db.session.commit()
+    # Start from an empty identity map, as a request would
+    db.session.remove()
+
+
+def count_queries(app, url):
+    with app.test_request_context(url), query_scope('test') as scope:
+        response = list_logs()
+        assert len(response.get_json()['data']) > 0
+    db.session.remove()
+    return scope.count
+
+
+@pytest.mark.parametrize('paging', ['', '&cursor='])
+def test_list_logs_query_count_does_not_grow_with_page_size(app, logs, paging):
+    counts = {per_page: count_queries(app, f'/api/logs?per_page={per_page}{paging}')
+              for per_page in (1, 10, 30)}
+    assert len(set(counts.values())) == 1, counts
+
+
+@pytest.mark.parametrize('paging', ['', '&cursor='])
+@pytest.mark.parametrize('per_page', [0, -1])
+def test_list_logs_per_page_below_one_returns_one_row(client, logs, paging, per_page):
+    response = client.get(f'/api/logs?per_page={per_page}{paging}')
+    
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body['data']) == 1
+    assert body['pagination']['per_page'] == 1
+
+
+def test_export_streams_rows_with_their_related_names(app, client, logs):
+    app.config['LOGS_EXPORT_CHUNK_SIZE'] = 4
+    statements = []
+    
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = client.get('/api/logs/export')
+        chunks = list(response.response)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+        app.config['LOGS_EXPORT_CHUNK_SIZE'] = 1000
+    
+    assert response.is_streamed
+    assert len(chunks) == 8  # 30 rows in chunks of 4
+    rows = [json_codec.loads(line) for line in b''.join(chunks).splitlines()]
+    assert sorted(row['account_name'] for row in rows) == sorted(f'account-{i}' for i in range(30))
+    assert {row['api_response'] for row in rows} == {f'{{"id":{i}}}' for i in range(30)}
+    # One SELECT with the joined loads, read in batches: no lazy loads per row
+    assert len(statements) == 1
+    assert 'JOIN accounts' in statements[0] and 'JOIN api_payloads' in statements[0]
@@ -0,0 +1,30 @@
+"""In-process metrics registry."""
+import threading
+
+from services.metrics import Counter, Histogram
+
+
+def run_threads(count, func):
+    threads = [threading.Thread(target=func) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_exited_threads_are_folded_into_the_total():
+    counter = Counter('test_events', 'Test events', ['kind'])
+    histogram = Histogram('test_seconds', 'Test durations', buckets=(1,))
+    
+    def work():
+        counter.inc(kind='a')
+        histogram.observe(0.5)
+    
+    run_threads(50, work)
+    counter.inc(kind='a')
+    
+    assert len(counter._shards) == 1  # This thread's
+    assert len(histogram._shards) == 0
+    assert 'test_events_total{kind="a"} 51' in counter.render()
+    assert 'test_seconds_count 50' in histogram.render()
+    assert 'test_seconds_bucket{le="1"} 50' in histogram.render()
@@ -0,0 +1,224 @@
+"""Transaction boundaries of monitor checks."""
+import sqlite3
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from models import Account, ExecutionLog, MonitorTarget, RepliedTweet, ReplyTemplate
+from services import monitor_service
+from services.dedup_index import RepliedTweetIndex
+from services.tweet import Tweet
+from services.twitter_api import TwitterAPIClient
+
+
+@pytest.fixture
+def target():
+    target = MonitorTarget(target_user_id='42', target_username='user42', last_seen_tweet_id='100',
+                           max_new_tweets_per_check=10)
+    account = Account(name='a', max_concurrent_usage=10)
+    account.set_token('token-a')
+    db.session.add_all([target, account, ReplyTemplate(content='hi')])
+    db.session.commit()
+    return target.id
+
+
+def timeline(*ids):
+    return {'success': True, 'tweets': [Tweet(tweet_id, author_id='42') for tweet_id in ids]}
+
+
+def test_failure_between_batches_keeps_unprocessed_tweets(app, target, monkeypatch):
+    app.config['MONITOR_COMMIT_BATCH_SIZE'] = 1
+    calls = []
+    
+    def flaky_reply(self, tweet_id, text):
+        calls.append(tweet_id)
+        if tweet_id == '102':
+            raise RuntimeError('connection reset')
+        return {'success': True, 'reply_tweet_id': f'r{tweet_id}'}
+    
+    monkeypatch.setattr(TwitterAPIClient, 'reply_to_tweet', flaky_reply)
+    try:
+        result = monitor_service.check_target_for_new_tweets(target, prefetched=timeline(103, 102, 101))
+    finally:
+        app.config['MONITOR_COMMIT_BATCH_SIZE'] = 0
+    
+    assert result['success'] is False
+    db.session.expire_all()
+    # The reply to 101 was committed by its batch, but the watermark never
+    # moved past 102 and 103
+    assert MonitorTarget.query.get(target).last_seen_tweet_id in ('100', '101')
+    assert [r.tweet_id for r in RepliedTweet.query.all()] == ['101']
+    
+    monkeypatch.setattr(TwitterAPIClient, 'reply_to_tweet',
+                        lambda self, tweet_id, text: calls.append(tweet_id) or {'success': True})
+    result = monitor_service.check_target_for_new_tweets(target, prefetched=timeline(103, 102, 101))
+    
+    assert result['replies_sent'] == 2
+    assert calls == ['101', '102', '102', '103']
+    assert MonitorTarget.query.get(target).last_seen_tweet_id == '103'
+    assert sorted(r.tweet_id for r in RepliedTweet.query.all()) == ['101', '102', '103']
+
+
+def test_sent_reply_survives_a_failure_later_in_the_check(target, monkeypatch):
+    calls = []
+    
+    def flaky_reply(self, tweet_id, text):
+        calls.append(tweet_id)
+        if tweet_id == '102':
+            raise RuntimeError('connection reset')
+        return {'success': True, 'reply_tweet_id': f'r{tweet_id}'}
+    
+    monkeypatch.setattr(TwitterAPIClient, 'reply_to_tweet', flaky_reply)
+    result = monitor_service.check_target_for_new_tweets(target, prefetched=timeline(102, 101))
+    
+    assert result['success'] is False
+    db.session.expire_all()
+    assert [r.tweet_id for r in RepliedTweet.query.all()] == ['101']
+    assert MonitorTarget.query.get(target).last_seen_tweet_id == '100'
+    
+    monkeypatch.setattr(TwitterAPIClient, 'reply_to_tweet',
+                        lambda self, tweet_id, text: calls.append(tweet_id) or {'success': True})
+    monitor_service.check_target_for_new_tweets(target, prefetched=timeline(102, 101))
+    
+    assert calls == ['101', '102', '102']
+
+
+def test_failed_attempts_are_batched(target, monkeypatch):
+    monkeypatch.setattr(TwitterAPIClient, 'reply_to_tweet',
+                        lambda self, tweet_id, text: {'success': False, 'error': 'rate limited'})
+    commits = []
+    original_commit = monitor_service.UnitOfWork.commit
+    
+    def counting_commit(self):
+        commits.append(self.pending_steps)
+        original_commit(self)
+    
+    monkeypatch.setattr(monitor_service.UnitOfWork, 'commit', counting_commit)
+    
+    monitor_service.check_target_for_new_tweets(target, prefetched=timeline(103, 102, 101))
+    
+    assert commits == [3]
+    assert ExecutionLog.query.filter_by(log_type='reply', result='failed').count() == 3
+
+
+def test_database_stays_writable_during_reply_calls(target, monkeypatch):
+    def reply_while_writing(self, tweet_id, text):
+        # Another connection (an API request) must not find the database locked
+        conn = sqlite3.connect(db.engine.url.database, timeout=0)
+        try:
+            conn.execute("INSERT INTO reply_templates (content, status, scope, sort_order, usage_count) "
+                         "VALUES ('other', 'disabled', 'global', 0, 0)")
+            conn.commit()
+        finally:
+            conn.close()
+        return {'success': True}
+    
+    monkeypatch.setattr(TwitterAPIClient, 'reply_to_tweet', reply_while_writing)
+    result = monitor_service.check_target_for_new_tweets(target, prefetched=timeline(102, 101))
+    
+    assert result['replies_sent'] == 2
+    assert ExecutionLog.query.filter_by(log_type='reply', result='success').count() == 2
+    assert ReplyTemplate.query.filter_by(content='other').count() == 2
+
+
+@pytest.fixture
+def dedup_index(monkeypatch):
+    index = RepliedTweetIndex()
+    index.ready = True
+    monkeypatch.setattr(monitor_service, 'replied_tweet_index', index)
+    return index
+
+
+def test_reply_recorded_by_another_worker_is_not_repeated(target, monkeypatch):
+    # Written by another process; the index is not warmed, so every account
+    # is a "maybe" confirmed against the database
+    account = Account.query.one()
+    db.session.add(RepliedTweet(target_user_id='42', tweet_id='101', account_id=account.id))
+    db.session.commit()
+    calls = []
+    monkeypatch.setattr(TwitterAPIClient, 'reply_to_tweet',
+                        lambda self, tweet_id, text: calls.append(tweet_id) or {'success': True})
+    
+    monitor_service.check_target_for_new_tweets(target, prefetched=timeline(102, 101))
+    
+    assert calls == ['102']
+
+
+def test_refresh_loads_replies_of_other_workers(target, dedup_index):
+    account = Account.query.one()
+    dedup_index.warm()
+    db.session.add(RepliedTweet(target_user_id='42', tweet_id='101', account_id=account.id))
+    db.session.commit()
+    assert not dedup_index.might_contain('42', 101, account.id)
+    
+    dedup_index.refresh()
+    
+    assert dedup_index.might_contain('42', 101, account.id)
+
+
+def test_false_positive_is_confirmed_against_the_database(target, dedup_index, monkeypatch):
+    account = Account.query.one()
+    dedup_index.add('42', 101, account.id)  # no replied_tweets row: a false positive
+    calls = []
+    monkeypatch.setattr(TwitterAPIClient, 'reply_to_tweet',
+                        lambda self, tweet_id, text: calls.append(tweet_id) or {'success': True})
+    statements = []
+    
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        result = monitor_service.reply_to_tweet(MonitorTarget.query.get(target), Tweet(101, author_id='42'))
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    
+    assert result['replies_sent'] == 1
+    assert calls == ['101']
+    assert any(s.startswith('SELECT') and 'FROM replied_tweets' in s for s in statements)
+
+
+def test_definite_negative_skips_the_lookup(target, dedup_index, monkeypatch):
+    account = Account.query.one()
+    monkeypatch.setattr(TwitterAPIClient, 'reply_to_tweet', lambda self, tweet_id, text: {'success': True})
+    statements = []
+    
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        result = monitor_service.reply_to_tweet(MonitorTarget.query.get(target), Tweet(101, author_id='42'))
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    
+    assert result['replies_sent'] == 1
+    assert not any(s.startswith('SELECT') and 'FROM replied_tweets' in s for s in statements)
+    assert dedup_index.might_contain('42', 101, account.id)
+
+
+def test_rolled_back_reply_is_not_added_to_the_index(target, dedup_index, monkeypatch):
+    account = Account.query.one()
+    monkeypatch.setattr(TwitterAPIClient, 'reply_to_tweet', lambda self, tweet_id, text: {'success': True})
+    
+    def broken_capture(data):
+        raise RuntimeError('payload store unavailable')
+    
+    monkeypatch.setattr(monitor_service, 'capture_api_response', broken_capture)
+    
+    result = monitor_service.check_target_for_new_tweets(target, prefetched=timeline(101))
+    
+    assert result['success'] is False
+    assert RepliedTweet.query.count() == 0
+    assert not dedup_index.might_contain('42', 101, account.id)
+
+
+def test_renamed_target_follows_its_new_username(target, monkeypatch):
+    monkeypatch.setattr(TwitterAPIClient, 'reply_to_tweet', lambda self, tweet_id, text: {'success': True})
+    
+    monitor_service.check_target_for_new_tweets(
+        target, prefetched={'success': True, 'tweets': [Tweet(101, author_id='42', author_username='renamed')]}
+    )
+    
+    assert MonitorTarget.query.get(target).target_username == 'renamed'
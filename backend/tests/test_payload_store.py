@@ -0,0 +1,59 @@
+"""Storage of API response payloads."""
+from datetime import datetime, timedelta
+
+from app import db
+from models import ApiPayload, ExecutionLog, SystemSetting
+from services.payload_store import delete_orphaned_payloads, should_capture, store_payload
+from services.query_stats import query_scope
+
+
+def orphan(data, age_hours):
+    payload = store_payload(data)
+    payload.created_at = datetime.utcnow() - timedelta(hours=age_hours)
+    db.session.commit()
+    return payload.id
+
+
+def test_recent_orphan_is_reused_and_kept():
+    payload_id = orphan({'id': 1}, age_hours=2)
+    log = ExecutionLog(log_type='reply', result='success', api_payload=store_payload({'id': 1}))
+    
+    # Retention runs before the log's transaction commits
+    assert delete_orphaned_payloads() == 0
+    db.session.add(log)
+    db.session.commit()
+    
+    assert log.api_payload_id == payload_id
+    assert log.get_api_response() == '{"id":1}'
+
+
+def test_old_orphan_is_not_reused_and_deleted():
+    old_id = orphan({'id': 1}, age_hours=20)
+    payload = store_payload({'id': 1})
+    
+    assert payload.id != old_id
+    assert delete_orphaned_payloads() == 0
+    
+    db.session.get(ApiPayload, old_id).created_at = datetime.utcnow() - timedelta(hours=30)
+    db.session.commit()
+    assert delete_orphaned_payloads() == 1
+
+
+def test_log_without_its_payload_row():
+    log = ExecutionLog(log_type='reply', result='success', api_payload_id=12345, api_response='legacy')
+    db.session.add(log)
+    db.session.commit()
+    
+    assert log.get_api_response() == 'legacy'
+    assert log.to_dict()['api_response'] == 'legacy'
+
+
+def test_capture_settings_are_read_once_per_context():
+    db.session.add(SystemSetting(key='api_response_capture', value='errors'))
+    db.session.commit()
+    
+    with query_scope('test') as scope:
+        decisions = [should_capture(success) for success in (True, False, True, False)]
+    
+    assert decisions == [False, True, False, True]
+    assert scope.count == 1
@@ -0,0 +1,35 @@
+"""Sampling profiler."""
+import itertools
+import threading
+import time
+
+from services.profiler import SamplingProfiler
+
+
+def test_top_functions_while_sampling():
+    stop = threading.Event()
+    
+    def busy():
+        while not stop.is_set():
+            time.sleep(0.0001)
+    
+    workers = [threading.Thread(target=busy) for _ in range(8)]
+    for worker in workers:
+        worker.start()
+    # A new root label per sample, so every sample inserts new stacks
+    labels = itertools.count()
+    profiler = SamplingProfiler(lambda: {worker.ident: f'root-{next(labels)}' for worker in workers},
+                                interval=0)
+    profiler.start()
+    try:
+        deadline = time.monotonic() + 0.5
+        while time.monotonic() < deadline:
+            profiler.top_functions()
+    finally:
+        profiler.stop()
+        stop.set()
+        for worker in workers:
+            worker.join()
+    
+    assert profiler.sample_count > 0
+    assert sum(count for _, count in profiler.top_functions()) == sum(profiler.snapshot().values())
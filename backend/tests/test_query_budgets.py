@@ -0,0 +1,34 @@
+"""Query budgets of the API endpoints."""
+import pytest
+
+from app import db
+from models import Account, ExecutionLog, MonitorTarget, PostContent, PostJob, ReplyTemplate
+from services import query_stats
+from services.query_stats import QueryBudgetExceeded
+
+
+@pytest.fixture
+def rows():
+    for i in range(5):
+        account = Account(name=f'account-{i}')
+        account.set_token(f'token-{i}')
+        db.session.add_all([
+            account,
+            MonitorTarget(target_user_id=str(i), target_username=f'user{i}'),
+            PostJob(name=f'job-{i}'),
+            PostContent(text=f'post {i}'),
+            ReplyTemplate(content=f'reply {i}'),
+            ExecutionLog(log_type='reply', result='success', account=account),
+        ])
+    db.session.commit()
+
+
+def test_list_endpoints_stay_within_their_budgets(app, rows):
+    result = app.test_cli_runner().invoke(args=['check-query-budgets'])
+    assert result.exit_code == 0, result.output
+
+
+def test_request_over_budget_fails(client, rows, monkeypatch):
+    monkeypatch.setitem(query_stats._settings['budgets'], 'GET /api/accounts', 1)
+    with pytest.raises(QueryBudgetExceeded):
+        client.get('/api/accounts')
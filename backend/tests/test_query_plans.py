@@ -0,0 +1,34 @@
+"""Index coverage of the hot-path queries."""
+from app import db
+from database import check_query_plans, schema_migrations, upgrade_schema
+
+
+def test_hot_queries_are_index_backed():
+    scans = {result['name']: result['plan'] for result in check_query_plans(db) if not result['ok']}
+    assert scans == {}
+
+
+def test_missing_index_is_reported_and_recreated():
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql('DROP INDEX ix_accounts_status')
+    # Pooled connections cache the plans prepared before the schema change
+    db.engine.dispose()
+    try:
+        results = {result['name']: result['ok'] for result in check_query_plans(db)}
+        assert results['active_accounts'] is False
+    finally:
+        assert 'ix_accounts_status' in upgrade_schema(db)
+    assert all(result['ok'] for result in check_query_plans(db))
+
+
+def test_schema_changes_are_recorded():
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql('DROP INDEX ix_accounts_status')
+    db.engine.dispose()
+    
+    upgrade_schema(db)
+    
+    with db.engine.connect() as conn:
+        changes = [row.change for row in conn.execute(schema_migrations.select())]
+    assert 'create index ix_accounts_status on accounts' in changes
+    assert upgrade_schema(db) == []
@@ -0,0 +1,102 @@
+"""Twitter API client."""
+import threading
+from datetime import datetime
+
+from services.tweet import Tweet
+from services.twitter_api import RequestCoalescer, TwitterAPIClient
+
+
+def test_waiting_caller_falls_back_to_its_own_call():
+    coalescer = RequestCoalescer()
+    started, release = threading.Event(), threading.Event()
+    leader_result = {}
+    
+    def hung_call():
+        started.set()
+        release.wait(5)
+        return {'success': True, 'caller': 'leader'}
+    
+    leader = threading.Thread(target=lambda: leader_result.update(coalescer.do('key', hung_call)))
+    leader.start()
+    try:
+        started.wait(5)
+        result = coalescer.do('key', lambda: {'success': True, 'caller': 'follower'}, timeout=0.05)
+    finally:
+        release.set()
+        leader.join()
+    
+    assert result['caller'] == 'follower'
+    assert leader_result['caller'] == 'leader'
+
+
+def test_waiting_caller_shares_a_prompt_result():
+    coalescer = RequestCoalescer()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+    
+    def call():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {'success': True}
+    
+    leader = threading.Thread(target=lambda: coalescer.do('key', call))
+    leader.start()
+    started.wait(5)
+    threading.Timer(0.05, release.set).start()
+    
+    assert coalescer.do('key', call, timeout=5) == {'success': True}
+    leader.join()
+    assert len(calls) == 1
+
+
+def test_interrupted_call_releases_waiting_callers():
+    coalescer = RequestCoalescer()
+    started, release = threading.Event(), threading.Event()
+    
+    class Interrupted(BaseException):
+        pass
+    
+    def interrupted_call():
+        started.set()
+        release.wait(5)
+        raise Interrupted()
+    
+    def lead():
+        try:
+            coalescer.do('key', interrupted_call)
+        except Interrupted:
+            pass
+    
+    leader = threading.Thread(target=lead)
+    leader.start()
+    started.wait(5)
+    threading.Timer(0.05, release.set).start()
+    
+    result = coalescer.do('key', lambda: {'success': True}, timeout=5)
+    leader.join()
+    
+    assert result['success'] is False
+    assert coalescer.do('key', lambda: {'success': True}) == {'success': True}
+
+
+def test_user_missing_from_the_batched_search_is_fetched_by_id(monkeypatch):
+    # 'old' was renamed: from:old matches nothing
+    monkeypatch.setattr(TwitterAPIClient, '_make_request', lambda self, method, endpoint, **kwargs: {
+        'success': True,
+        'data': {'tweets': [{'id': '5', 'author': {'id': '1', 'userName': 'active'}}], 'has_next_page': False}
+    })
+    fetched = []
+    monkeypatch.setattr(TwitterAPIClient, 'get_user_tweets', lambda self, user_id, count=10: fetched.append(user_id) or {
+        'success': True, 'tweets': [Tweet(6, author_id=user_id, author_username='new')]
+    })
+    since = datetime.utcnow()
+    
+    results = TwitterAPIClient().get_users_tweets([
+        {'user_id': '1', 'username': 'active', 'count': 10, 'since': since},
+        {'user_id': '2', 'username': 'old', 'count': 10, 'since': since},
+    ], batch_size=10)
+    
+    assert fetched == ['2']
+    assert [tweet.id for tweet in results['1']['tweets']] == [5]
+    assert [tweet.id for tweet in results['2']['tweets']] == [6]
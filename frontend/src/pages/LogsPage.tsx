@@ -119,9 +119,9 @@ export default function LogsPage() {
   const fetchFilterData = async () => {
     try {
       const [accountsRes, targetsRes, jobsRes] = await Promise.all([
-        accountsApi.list(),
-        targetsApi.list(),
-        postJobsApi.list(),
+        accountsApi.list({ fields: 'id,name' }),
+        targetsApi.list({ fields: 'id,target_username' }),
+        postJobsApi.list({ fields: 'id,name' }),
       ])
       setAccounts(accountsRes.data.data)
       setTargets(targetsRes.data.data)
@@ -7,9 +7,13 @@ const api = axios.create({
   },
 })
 
+// Shared list arguments: filters, sort, fields, and cursor/per_page for
+// keyset pagination (every row when neither is given)
+export type ListParams = Record<string, string | number | undefined>
+
 // Account API
 export const accountsApi = {
-  list: () => api.get('/accounts'),
+  list: (params?: ListParams) => api.get('/accounts', { params }),
   get: (id: number) => api.get(`/accounts/${id}`),
   create: (data: Record<string, unknown>) => api.post('/accounts', data),
   update: (id: number, data: Record<string, unknown>) => api.put(`/accounts/${id}`, data),
@@ -19,7 +23,7 @@ export const accountsApi = {
 
 // Targets API
 export const targetsApi = {
-  list: () => api.get('/targets'),
+  list: (params?: ListParams) => api.get('/targets', { params }),
   get: (id: number) => api.get(`/targets/${id}`),
   create: (data: Record<string, unknown>) => api.post('/targets', data),
   update: (id: number, data: Record<string, unknown>) => api.put(`/targets/${id}`, data),
@@ -29,7 +33,7 @@ export const targetsApi = {
 
 // Reply Templates API
 export const replyTemplatesApi = {
-  list: () => api.get('/reply-templates'),
+  list: (params?: ListParams) => api.get('/reply-templates', { params }),
   get: (id: number) => api.get(`/reply-templates/${id}`),
   create: (data: Record<string, unknown>) => api.post('/reply-templates', data),
   update: (id: number, data: Record<string, unknown>) => api.put(`/reply-templates/${id}`, data),
@@ -40,7 +44,7 @@ export const replyTemplatesApi = {
 
 // Post Jobs API
 export const postJobsApi = {
-  list: () => api.get('/post-jobs'),
+  list: (params?: ListParams) => api.get('/post-jobs', { params }),
   get: (id: number) => api.get(`/post-jobs/${id}`),
   create: (data: Record<string, unknown>) => api.post('/post-jobs', data),
   update: (id: number, data: Record<string, unknown>) => api.put(`/post-jobs/${id}`, data),
@@ -51,7 +55,7 @@ export const postJobsApi = {
 
 // Post Contents API
 export const postContentsApi = {
-  list: () => api.get('/post-contents'),
+  list: (params?: ListParams) => api.get('/post-contents', { params }),
   get: (id: number) => api.get(`/post-contents/${id}`),
   create: (data: Record<string, unknown>) => api.post('/post-contents', data),
   update: (id: number, data: Record<string, unknown>) => api.put(`/post-contents/${id}`, data),
@@ -69,7 +73,7 @@ export const logsApi = {
 
 // Settings API
 export const settingsApi = {
-  list: () => api.get('/settings'),
+  list: (params?: ListParams) => api.get('/settings', { params }),
   get: (key: string) => api.get(`/settings/${key}`),
   update: (key: string, data: Record<string, unknown>) => api.put(`/settings/${key}`, data),
   updateBatch: (settings: Record<string, unknown>) => api.put('/settings/batch', { settings }),